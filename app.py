@@ -3,17 +3,30 @@ import requests
 from dotenv import load_dotenv
 import base64
 from datetime import datetime, timedelta
+from collections import namedtuple
 from io import BytesIO
 import re
+import json
+import sqlite3
 import random # 최신상품 랜덤 노출을 위해 추가
 
 import pandas as pd
-from flask import Flask, render_template_string, request, redirect, url_for, session, send_file, flash, jsonify, send_from_directory
+import click
+from flask import Flask, request, redirect, url_for, session, send_file, flash, jsonify, send_from_directory, g, make_response
+from markupsafe import Markup
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
-from sqlalchemy import text
+from sqlalchemy import text, case, or_, and_, event, insert as sa_insert, table as sa_table, column as sa_column, inspect as sa_inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import selectinload, load_only, defer
+from template_registry import render_template_string, get_template_stats
+from local_cache import LocalCache
+from query_profiler import init_query_profiler
+from asset_pipeline import AssetManifest
+from image_pipeline import ImagePipeline, DerivativeStore, ResizeCache, InvalidImageError, RESIZE_SIZES, RESIZE_MAX_AGE, DERIVED_MAX_AGE
+from service_worker import build_service_worker
 
 load_dotenv()
 
@@ -27,7 +40,7 @@ load_dotenv()
 # db = SQLAlchemy(app)
 
 # --- 수정 후 (이 부분으로 교체하세요) ---
-from delivery_system import logi_bp, db_delivery
+from delivery_system import logi_bp, db_delivery, logi_migrate_proof_photos, logi_init_storage, logi_start_scheduler, logi_consume_outbox
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 db_path = os.path.join(BASE_DIR, 'direct_trade_mall.db')
@@ -119,8 +132,23 @@ app.config['SQLALCHEMY_BINDS'] = {
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 # DB 객체 초기화
+# SQLite 커넥션 공통 설정 (풀에서 새 커넥션이 만들어질 때 1회)
+# WAL: 읽기와 쓰기가 서로 막지 않음 / busy_timeout: 잠금 시 즉시 실패 대신 대기 / NORMAL: WAL 에서 안전한 동기화 수준
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragmas(dbapi_conn, connection_record):
+    if not isinstance(dbapi_conn, sqlite3.Connection): return
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
 db = db_delivery 
 db.init_app(app)
+init_query_profiler(app, db)  # QUERY_PROFILE=1 일 때 요청별 쿼리 수/시간/바이트 로그
+assets = AssetManifest(app)  # static/src 공통 CSS/JS -> /assets/<이름>.<해시>.<확장자> (+ .gz/.br)
+# 서비스 워커는 해시된 자산 주소를 사전 캐시하므로 자산 빌드 후 생성 (자산이 바뀌면 워커 버전도 바뀜)
+SW_VERSION, SW_SCRIPT = build_service_worker([assets.asset_url(n) for n in ('app.css', 'header.js', 'footer.js')] + ['/static/logo/side1.jpg'])
 
 def run_initialization():
     with app.app_context():
@@ -250,6 +278,7 @@ class Product(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     tax_type = db.Column(db.String(20), default='과세') 
     badge = db.Column(db.String(50), default='')
+    __table_args__ = (db.Index('ix_product_category_active_id', 'category', 'is_active', 'id'),)
 
 class Cart(db.Model):
     """장바구니 모델"""
@@ -281,6 +310,28 @@ class Order(db.Model):
     delivery_address = db.Column(db.String(500))
     request_memo = db.Column(db.String(500))
     created_at = db.Column(db.DateTime, default=datetime.now)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, index=True)  # 배송 동기화 워터마크 기준
+    items = db.relationship('OrderItem', backref='order', lazy=True, order_by='OrderItem.id')
+
+class OrderItem(db.Model):
+    """주문 품목 모델 (결제 시점의 품목/단가/수량 기록)"""
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False, index=True)
+    product_id = db.Column(db.Integer, index=True)
+    category = db.Column(db.String(50), index=True)
+    name = db.Column(db.String(200))
+    unit_price = db.Column(db.Integer, default=0)
+    qty = db.Column(db.Integer, default=1)
+
+class DeliveryOutbox(db.Model):
+    """배송 시스템 전달 대기열 (주문 상태 변경과 같은 트랜잭션에 기록, 주문당 한 번만)"""
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.String(100), nullable=False)  # Order.order_id
+    event = db.Column(db.String(20), nullable=False, default='배송요청')
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    claimed_at = db.Column(db.DateTime, nullable=True)  # 처리 중 점유 시각 (만료되면 다른 워커가 다시 점유)
+    processed_at = db.Column(db.DateTime, nullable=True, index=True)  # 배송 시스템에서 작업 생성 완료 시각
+    __table_args__ = (db.UniqueConstraint('order_id', 'event', name='uq_delivery_outbox_order_event'),)
 
 class Review(db.Model):
     """사진 리뷰 모델"""
@@ -318,29 +369,225 @@ from PIL import Image # 이미지 처리를 위해 상단에 추가
 
 from PIL import Image, ImageOps # 상단 import문에 추가하세요
 
+# 업로드 이미지는 프로세스 풀에서 변환 (회전 보정 -> 800x800 중앙 크롭 -> WebP + 200/400/800 파생본), 테스트 시에는 동기 처리
+image_store = DerivativeStore(app.static_folder)
+image_pipeline = ImagePipeline(app.config['UPLOAD_FOLDER'], sync=os.getenv('IMAGE_PIPELINE_SYNC', '0') in ('1', 'true', 'True'), derivatives=image_store)
+
+# static/derived 파생본은 내용 해시 파일명이라 1년 immutable 캐시 (기본 정적 파일은 Flask 기본값 no-cache 유지)
+_default_send_file_max_age = app.get_send_file_max_age
+
+def _static_send_file_max_age(filename):
+    if filename and filename.startswith('derived/') and filename.endswith('.webp'): return DERIVED_MAX_AGE
+    return _default_send_file_max_age(filename)
+
+app.get_send_file_max_age = _static_send_file_max_age
+
+@app.after_request
+def _mark_derived_immutable(response):
+    if request.path.startswith(image_store.derived_url + '/') and request.path.endswith('.webp') and response.status_code in (200, 304):
+        response.cache_control.immutable = True
+    return response
+
+# 상품 카드 기본 표시 폭 (모바일 2열 / PC 4열)
+CARD_IMG_SIZES = '(min-width: 1024px) 25vw, 50vw'
+
+@app.template_global()
+def img_srcset(url, sizes=CARD_IMG_SIZES):
+    """<img> 의 src/srcset/sizes 속성 문자열 (파생본이 없는 외부/처리중 이미지는 src 만)"""
+    srcset = image_store.srcset(url)
+    if not srcset: return Markup('src="%s"') % (url or '')
+    return Markup('src="%s" srcset="%s" sizes="%s"') % (url, srcset, sizes)
+
+@app.cli.command('images-backfill')
+@click.option('--force', is_flag=True, help='이미 만든 파생본도 다시 생성')
+def images_backfill(force):
+    """static/uploads, static/product_images 기존 이미지의 해상도별 파생본 생성 (flask --app app images-backfill)"""
+    urls = []
+    for sub in ('uploads', 'product_images'):
+        folder = os.path.join(app.static_folder, sub)
+        if not os.path.isdir(folder): continue
+        for name in sorted(os.listdir(folder)):
+            url = f"/static/{sub}/{name}"
+            if image_store.source_path(url) and (force or not image_store.is_fresh(url)): urls.append(url)
+    print(f"🔄 [Images] 파생본 생성 대상 {len(urls)}건")
+    done, failed = image_pipeline.build_derivatives(urls) if urls else (0, [])
+    for url, err in failed: print(f"⚠️ [Images] {url}: {err}")
+    print(f"✅ [Images] 파생본 생성 완료 {done}건, 실패 {len(failed)}건")
+
 def save_uploaded_file(file):
-    """핸드폰 사진 공백 제거(중앙 크롭) 및 WebP 변환"""
+    """핸드폰 사진 공백 제거(중앙 크롭) 및 WebP 변환 접수 -> 임시 주소(변환 완료 시 최종 주소로 교체) 반환"""
     if file and file.filename != '':
-        # 파일명 설정 (.webp로 통일하여 용량 절감)
-        new_filename = f"uncle_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.webp"
-        save_path = os.path.join(app.config['UPLOAD_FOLDER'], new_filename)
+        return image_pipeline.submit(file, sync=app.testing)
+    return None
 
-        # 1. 이미지 열기
-        img = Image.open(file)
+@app.errorhandler(InvalidImageError)
+def handle_invalid_image(e):
+    """깨진/이미지가 아닌 업로드는 저장하지 않고 이전 화면으로"""
+    db.session.rollback()
+    flash(str(e))
+    return redirect(request.referrer or '/')
+
+def swap_pending_image_url(pending_url, final_url):
+    """상품/후기에 저장된 임시 이미지 주소를 최종 주소로 교체"""
+    params = {"p": pending_url, "f": final_url, "like": f"%{pending_url}%"}
+    db.session.execute(text("UPDATE product SET image_url = REPLACE(image_url, :p, :f), detail_image_url = REPLACE(detail_image_url, :p, :f) "
+                            "WHERE image_url LIKE :like OR detail_image_url LIKE :like"), params)
+    db.session.execute(text("UPDATE review SET image_url = :f WHERE image_url = :p"), params)
+    db.session.commit()
+    invalidate_home_cache()
 
-        # 2. 핸드폰 사진 회전 방지 (EXIF 정보 바탕으로 방향 바로잡기)
-        img = ImageOps.exif_transpose(img)
+def pending_image_referenced(pending_url):
+    """임시 이미지 주소를 아직 쓰는 상품/후기가 있는지 (읽기만)"""
+    params = {"p": pending_url, "like": f"%{pending_url}%"}
+    return db.session.execute(text("SELECT 1 FROM product WHERE image_url LIKE :like OR detail_image_url LIKE :like "
+                                   "UNION ALL SELECT 1 FROM review WHERE image_url = :p LIMIT 1"), params).first() is not None
 
-        # 3. 정사각형으로 중앙 크롭 (가로세로 800px)
-        # ImageOps.fit은 이미지의 중심을 기준으로 비율에 맞춰 꽉 채워 자릅니다.
-        size = (800, 800)
-        img = ImageOps.fit(img, size, Image.Resampling.LANCZOS)
+@image_pipeline.on_complete
+def _on_image_processed(pending_url, final_url):
+    with app.app_context():
+        swap_pending_image_url(pending_url, final_url)
+
+def parse_product_details(details):
+    """'[카테고리] 상품명(수량), ... | [카테고리] ...' 문자열을 (카테고리, 상품명, 수량) 목록으로 변환"""
+    lines = []
+    for part in (details or "").split(' | '):
+        match = re.search(r'\[(.*?)\] (.*)', part)
+        if not match: continue
+        cat_n, items_str = match.group(1).strip(), match.group(2).strip()
+        for item in items_str.split(', '):
+            it_match = re.search(r'(.*?)\((\d+)\)', item)
+            if it_match:
+                lines.append((cat_n, it_match.group(1).strip(), int(it_match.group(2))))
+    return lines
+
+# 품목 문자열을 파싱할 수 없는 주문은 품목 행이 끝내 생기지 않으므로, 확인한 마지막 주문 id 를 기록해 다음 시작부터 건너뜀
+ORDER_ITEMS_BACKFILL_MARKER = os.path.join(app.instance_path, 'order_items_backfill.marker')
+
+def _order_items_checked_until():
+    try:
+        with open(ORDER_ITEMS_BACKFILL_MARKER, encoding='utf-8') as f: return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
 
-        # 4. WebP로 저장 (용량 최적화)
-        img.save(save_path, "WEBP", quality=85)
-        
-        return f"/static/uploads/{new_filename}"
-    return None
+def _mark_order_items_checked(order_id):
+    try:
+        os.makedirs(os.path.dirname(ORDER_ITEMS_BACKFILL_MARKER), exist_ok=True)
+        tmp_path = f"{ORDER_ITEMS_BACKFILL_MARKER}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f: f.write(str(order_id))
+        os.replace(tmp_path, ORDER_ITEMS_BACKFILL_MARKER)
+    except OSError as e:
+        print(f"⚠️ [Migration] 주문 품목 확인 위치 기록 실패: {e}")
+
+def backfill_order_items():
+    """OrderItem 도입 이전 주문의 품목 행 일괄 생성 (품목 행이 이미 있는 주문, 이미 확인한 주문은 건너뜀)
+    워커 여러 개가 동시에 시작해도 한 번만 생성되도록 쓰기 잠금(BEGIN IMMEDIATE)을 먼저 잡고 대상을 조회합니다."""
+    checked = _order_items_checked_until()
+    if not db.session.query(Order.id).filter(Order.id > checked, ~Order.items.any()).first(): return 0  # 대상 없음 (잠금 없이 확인)
+    db.session.commit()
+    db.session.execute(text('BEGIN IMMEDIATE'))  # 다른 워커는 여기서 대기 후, 이미 생성된 주문을 건너뜀
+    pending = Order.query.filter(Order.id > checked, ~Order.items.any()).all()
+    parsed = {o.id: parse_product_details(o.product_details) for o in pending}
+    names = {name for lines in parsed.values() for _, name, _ in lines}
+    if not names:
+        db.session.rollback()
+        if parsed: _mark_order_items_checked(max(parsed))
+        return 0
+
+    # 과거 주문은 단가 기록이 없으므로 현재 상품 정보로 보정 (동명 상품은 먼저 등록된 상품 기준)
+    products = {}
+    for p in Product.query.filter(Product.name.in_(names)).order_by(Product.id.desc()).all():
+        products[p.name] = p
+
+    count = 0
+    for oid, lines in parsed.items():
+        for cat_n, name, qty in lines:
+            p = products.get(name)
+            db.session.add(OrderItem(order_id=oid, product_id=p.id if p else None, category=cat_n, name=name, unit_price=p.price if p else 0, qty=qty))
+            count += 1
+    db.session.commit()
+    _mark_order_items_checked(max(parsed))
+    return count
+
+# --------------------------------------------------------------------------------
+# 상품 검색 색인 (SQLite FTS5 + 2-gram 토큰)
+# --------------------------------------------------------------------------------
+# 한글은 띄어쓰기 단위 토큰화로는 부분 검색('코트' -> '울코트')이 안 되므로,
+# 단어를 2글자씩 겹쳐 자른 토큰(울코, 코트)을 색인하고 검색어도 같은 방식으로 잘라 AND 매칭합니다.
+# 상품 저장/삭제 시 매퍼 이벤트로 색인을 갱신하며, FTS5 를 쓸 수 없는 DB 에서는 LIKE 검색으로 동작합니다.
+SEARCH_FTS = {"ready": False}
+
+def search_ngrams(value):
+    """문자열 -> 2-gram 토큰 목록 (1글자 단어는 그대로)"""
+    grams = []
+    for word in re.findall(r'\w+', (value or '').lower()):
+        if len(word) == 1: grams.append(word)
+        else: grams.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return grams
+
+def _search_doc(p):
+    return {"id": p.id, "name": " ".join(search_ngrams(p.name)),
+            "body": " ".join(search_ngrams(" ".join(filter(None, [p.category, p.description, p.spec]))))}
+
+def init_search_index():
+    """FTS5 테이블 생성, 상품 수와 색인 수가 다르면 전체 재색인"""
+    if db.engine.dialect.name != 'sqlite': return
+    try:
+        db.session.execute(text("CREATE VIRTUAL TABLE IF NOT EXISTS product_fts USING fts5(name, body, tokenize='unicode61')"))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"⚠️ [Search] FTS5 사용 불가, LIKE 검색으로 동작: {e}")
+        return
+    SEARCH_FTS["ready"] = True
+    indexed = db.session.execute(text("SELECT COUNT(*) FROM product_fts")).scalar()
+    if indexed != Product.query.count(): rebuild_search_index()
+
+def rebuild_search_index():
+    if not SEARCH_FTS["ready"]: return
+    db.session.execute(text("DELETE FROM product_fts"))
+    docs = [_search_doc(p) for p in Product.query.with_entities(Product.id, Product.name, Product.category, Product.description, Product.spec)]
+    if docs: db.session.execute(text("INSERT INTO product_fts(rowid, name, body) VALUES (:id, :name, :body)"), docs)
+    db.session.commit()
+
+SEARCH_DOC_FIELDS = ('name', 'category', 'description', 'spec')
+
+@event.listens_for(Product, 'after_insert')
+def _product_search_upsert(mapper, connection, target):
+    if not SEARCH_FTS["ready"]: return
+    connection.execute(text("INSERT OR REPLACE INTO product_fts(rowid, name, body) VALUES (:id, :name, :body)"), _search_doc(target))
+
+@event.listens_for(Product, 'after_update')
+def _product_search_update(mapper, connection, target):
+    # 재고 차감 등 검색 문서와 무관한 변경이면 색인을 건드리지 않음
+    state = sa_inspect(target)
+    if not any(state.attrs[f].history.has_changes() for f in SEARCH_DOC_FIELDS): return
+    _product_search_upsert(mapper, connection, target)
+
+@event.listens_for(Product, 'after_delete')
+def _product_search_delete(mapper, connection, target):
+    if not SEARCH_FTS["ready"]: return
+    connection.execute(text("DELETE FROM product_fts WHERE rowid = :id"), {"id": target.id})
+
+PRODUCT_FTS = sa_table('product_fts', sa_column('rowid'))
+SEARCH_RESULT_LIMIT = 200  # 검색 페이지 최대 노출 수 (관련도 상위)
+
+def search_catalog(keyword, limit=None, exclude_id=None, in_stock=False, offset=0):
+    """판매중 상품 검색 (FTS 관련도 순, FTS 미사용/1글자 검색어는 LIKE)"""
+    grams = search_ngrams(keyword)
+    base = Product.query.filter(Product.is_active == True)
+    if exclude_id: base = base.filter(Product.id != exclude_id)
+    if in_stock: base = base.filter(Product.stock > 0)
+
+    if SEARCH_FTS["ready"] and grams and any(len(g) > 1 for g in grams):
+        # FTS 테이블과 조인해 정렬/LIMIT 까지 DB 에서 처리 (일치 건수가 많아도 필요한 행만 읽음)
+        match = " ".join('"%s"' % g for g in dict.fromkeys(grams))
+        query = base.join(PRODUCT_FTS, PRODUCT_FTS.c.rowid == Product.id) \
+            .filter(text("product_fts MATCH :q").bindparams(q=match)).order_by(text("bm25(product_fts, 10.0, 1.0)"))
+    else:
+        like = f"%{keyword}%"
+        query = base.filter(or_(Product.name.like(like), Product.description.like(like), Product.spec.like(like), Product.category.like(like))).order_by(Product.id.desc())
+    if offset: query = query.offset(offset)
+    return query.limit(limit).all() if limit else query.all()
 
 def check_admin_permission(category_name=None):
     """관리자 권한 체크"""
@@ -368,89 +615,7 @@ HEADER_HTML = """
     <script src="https://cdn.tailwindcss.com"></script>
     <script src="//t1.daumcdn.net/mapjsapi/bundle/postcode/prod/postcode.v2.js"></script>
     <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Cormorant+Garamond:ital,wght@0,300;0,400;0,500;0,600;0,700&family=Noto+Sans+KR:wght@300;400;500;600&family=Noto+Serif+KR:wght@300;400;500;600&family=Outfit:wght@300;400;500;600&display=swap');
-    
-    :root {
-        --luxe-black: #0a0a0a;
-        --luxe-cream: #faf9f7;
-        --luxe-gold: #c9a962;
-        --luxe-gold-light: #e8dcc4;
-        --luxe-charcoal: #2c2c2c;
-    }
-    
-    body { 
-        font-family: 'Outfit', 'Noto Sans KR', -apple-system, sans-serif; 
-        background-color: var(--luxe-cream);
-        color: var(--luxe-black); 
-        -webkit-tap-highlight-color: transparent; 
-        overflow-x: hidden; 
-        line-height: 1.6;
-        -webkit-font-smoothing: antialiased;
-        letter-spacing: 0.02em;
-    }
-    
-    .font-serif { font-family: 'Cormorant Garamond', 'Noto Serif KR', serif; }
-    
-    .item-badge {
-        display: inline-block;
-        padding: 4px 10px;
-        border-radius: 2px;
-        font-weight: 500;
-        font-size: 0.7rem;
-        letter-spacing: 0.15em;
-        text-transform: uppercase;
-        white-space: nowrap;
-    }
-
-    .sold-out { filter: grayscale(100%); opacity: 0.6; transition: 0.3s; }
-    .sold-out-badge { 
-        position: absolute; top: 50%; left: 50%; transform: translate(-50%, -50%);
-        background: var(--luxe-black); color: white; 
-        padding: 12px 28px; letter-spacing: 0.2em; font-size: 0.7rem;
-        z-index: 10; font-family: 'Outfit', sans-serif;
-    }
-    .no-scrollbar::-webkit-scrollbar { display: none; }
-    
-    .horizontal-scroll {
-        display: flex; overflow-x: auto; scroll-snap-type: x mandatory; 
-        gap: 24px; padding: 0 0 40px 0; 
-        -webkit-overflow-scrolling: touch;
-    }
-    .horizontal-scroll > div { scroll-snap-align: start; flex-shrink: 0; }
-    
-    #sidebar {
-        position: fixed; top: 0; left: -320px; width: 300px; height: 100%;
-        background: var(--luxe-cream); z-index: 5001; 
-        transition: all 0.5s cubic-bezier(0.16, 1, 0.3, 1);
-        box-shadow: 40px 0 80px rgba(0,0,0,0.08); overflow-y: auto;
-        border-right: 1px solid rgba(0,0,0,0.06);
-    }
-    #sidebar.open { left: 0; }
-    #sidebar-overlay {
-        position: fixed; top: 0; left: 0; width: 100%; height: 100%;
-        background: rgba(10,10,10,0.4); z-index: 5000; display: none; backdrop-filter: blur(8px);
-    }
-    #sidebar-overlay.show { display: block; }
-
-    #toast {
-        visibility: hidden; min-width: 80%; background: var(--luxe-black); color: #fff; 
-        text-align: center; letter-spacing: 0.1em;
-        padding: 18px 24px; position: fixed; z-index: 9999; left: 50%; bottom: 40px;
-        transform: translateX(-50%) translateY(20px); font-size: 12px; font-weight: 500; 
-        transition: 0.4s cubic-bezier(0.16, 1, 0.3, 1); opacity: 0;
-    }
-    #toast.show { visibility: visible; opacity: 1; transform: translateX(-50%) translateY(0); }
-
-    #term-modal { display:none; position:fixed; top:0; left:0; width:100%; height:100%; background:rgba(10,10,10,0.6); z-index:6000; align-items:center; justify-content:center; padding:16px; backdrop-filter: blur(8px); }
-    #term-modal-content { background: var(--luxe-cream); width:100%; max-width:520px; max-height:85vh; overflow:hidden; display:flex; flex-direction:column; border: 1px solid rgba(0,0,0,0.08); }
-    #term-modal-body { overflow-y:auto; padding:2.5rem; font-size:0.9rem; line-height:1.8; color: var(--luxe-charcoal); }
-    
-    .luxe-card { transition: all 0.5s cubic-bezier(0.16, 1, 0.3, 1); }
-    .luxe-card:hover { transform: translateY(-6px); }
-    .luxe-card:hover .luxe-card-img { transform: scale(1.03); }
-    .luxe-card-img { transition: transform 0.6s cubic-bezier(0.16, 1, 0.3, 1); }
-</style>
+<link rel="stylesheet" href="{{ asset_url('app.css') }}">
 <link rel="manifest" href="/static/manifest.json">
     <meta name="theme-color" content="#0a0a0a">
     <meta name="mobile-web-app-capable" content="yes">
@@ -462,14 +627,14 @@ HEADER_HTML = """
     <script>
         if ('serviceWorker' in navigator) {
             window.addEventListener('load', () => {
-                navigator.serviceWorker.register('/static/sw.js')
+                navigator.serviceWorker.register('/sw.js')
                     .then(reg => console.log('서비스 워커 등록 완료!'))
                     .catch(err => console.log('등록 실패:', err));
             });
         }
     </script>
 </head>
-<body class="text-left font-black">
+<body class="text-left font-black" data-auth="{{ '1' if current_user.is_authenticated else '0' }}">
     <div id="toast">메시지가 표시됩니다.</div>
 
     <div id="logout-warning-modal" class="fixed inset-0 bg-black/50 z-[9999] hidden flex items-center justify-center p-4 backdrop-blur-md">
@@ -554,84 +719,7 @@ HEADER_HTML = """
         </div>
     </nav>
     <main class="min-h-screen">
-    <script>
-    // Flask에서 설정한 세션 타임아웃 시간 (초 단위, 예: 30분 = 1800초)
-    const SESSION_TIMEOUT = 30 * 60; 
-    const WARNING_TIME = 60; // 로그아웃 60초 전에 경고창 표시
-    
-    let warningTimer;
-    let countdownInterval;
-
-    function startLogoutTimer() {
-        // 1. 기존 타이머가 있다면 제거
-        clearTimeout(warningTimer);
-        
-        // 2. 경고창을 띄울 시간 계산 (전체 시간 - 60초)
-        warningTimer = setTimeout(() => {
-            showLogoutWarning();
-        }, (SESSION_TIMEOUT - WARNING_TIME) * 1000);
-    }
-
-    function showLogoutWarning() {
-        const modal = document.getElementById('logout-warning-modal');
-        const timerDisplay = document.getElementById('logout-timer');
-        let timeLeft = WARNING_TIME;
-
-        modal.classList.remove('hidden');
-        
-        // 1초마다 숫자를 깎는 카운트다운 시작
-        countdownInterval = setInterval(() => {
-            timeLeft -= 1;
-            timerDisplay.innerText = timeLeft;
-            
-            if (timeLeft <= 0) {
-                clearInterval(countdownInterval);
-                location.href = '/logout'; // 0초가 되면 로그아웃 실행
-            }
-        }, 1000);
-    }
-
-    function extendSession() {
-        // 서버에 가벼운 요청을 보내 세션을 연장시킵니다 (가장 간단한 방법)
-        fetch('/').then(() => {
-            // 경고창 숨기기 및 타이머 리셋
-            document.getElementById('logout-warning-modal').classList.add('hidden');
-            clearInterval(countdownInterval);
-            startLogoutTimer(); 
-            showToast("로그인 시간이 연장되었습니다. 😊");
-        });
-    }
-
-    // 사용자가 로그인한 상태일 때만 타이머 작동
-    {% if current_user.is_authenticated %}
-    startLogoutTimer();
-    {% endif %}
-    let deferredPrompt;
-    window.addEventListener('beforeinstallprompt', (e) => {
-        e.preventDefault();
-        deferredPrompt = e;
-        // 버튼이 있는 바를 화면에 표시
-        const installBar = document.getElementById('pwa-install-bar');
-        if (installBar) installBar.classList.remove('hidden');
-    });
-
-    function triggerPWAInstall() {
-        const installBar = document.getElementById('pwa-install-bar');
-        if (!deferredPrompt) return;
-        deferredPrompt.prompt();
-        deferredPrompt.userChoice.then((choiceResult) => {
-            if (choiceResult.outcome === 'accepted') {
-                if (installBar) installBar.classList.add('hidden');
-            }
-            deferredPrompt = null;
-        });
-    }
-
-    function hideInstallBar() {
-        const installBar = document.getElementById('pwa-install-bar');
-        if (installBar) installBar.classList.add('hidden');
-    }
-</script>
+    <script src="{{ asset_url('header.js') }}"></script>
 
 """
 
@@ -700,255 +788,7 @@ FOOTER_HTML = """
 </div>
 <!-- ✅ 여기까지 -->
 
-    <script>
-        function toggleSidebar() {
-            const sidebar = document.getElementById('sidebar');
-            const overlay = document.getElementById('sidebar-overlay');
-            sidebar.classList.toggle('open');
-            overlay.classList.toggle('show');
-        }
-
-        const UNCLE_TERMS = {
-    'terms': {
-        'title': 'DOVE 서비스 이용약관',
-        'content': `
-            <b>제1조 (목적)</b><br>
-            본 약관은 (주)DOVE(이하 “회사”)이 제공하는 구매대행 및 물류·배송 관리 서비스의 이용과 관련하여 회사와 이용자 간의 권리, 의무 및 책임사항을 규정함을 목적으로 합니다.<br><br>
-            <b>제2조 (서비스의 성격 및 정의)</b><br>
-            ① 회사는 이용자의 요청에 따라 상품을 대신 구매하고, 결제, 배송 관리, 고객 응대, 환불 처리 등 거래 전반을 회사가 직접 관리·운영하는 구매대행 서비스를 제공합니다.<br>
-            ② 본 서비스는 <b>통신판매중개업(오픈마켓)이 아니며</b>, 회사가 거래 및 운영의 주체로서 서비스를 제공합니다.<br><br>
-            <b>제4조 (회사의 역할 및 책임)</b><br>
-            회사는 구매대행 과정에서 발생하는 주문, 결제, 배송, 환불 등 거래 전반에 대해 관계 법령에 따라 책임을 부담합니다.`
-    },
-    'privacy': {
-        'title': '개인정보처리방침',
-        'content': '<b>개인정보 수집 및 이용</b><br>수집항목: 이름, 연락처, 주소, 결제정보<br>이용목적: 상품 구매대행 및 송도 지역 직영 배송 서비스 제공<br>보관기간: 관련 법령에 따른 보존 기간 종료 후 즉시 파기'
-    },
-            'privacy': {
-                'title': '개인정보처리방침',
-                'content': '<b>개인정보의 수집 및 이용</b><br>DOVE는 주문 처리, 상품 배송, 고객 상담을 위해 필수적인 개인정보를 수집하며, 관계 법령에 따라 안전하게 보호합니다.'
-            },
-            'agency': {
-                'title': '서비스 이용 안내',
-                'content': '<b>서비스 지역:</b> 인천광역시 연수구 송도동 일대 (인천대입구역 중심 동선)<br><b>운영 시간:</b> 평일 오전 9시 ~ 오후 6시<br><b>배송 원칙:</b> 신속하고 정확한 근거리 직접 배송'
-            },
-            'e_commerce': {
-                'title': '전자상거래 이용자 유의사항',
-                'content': '<b>거래 형태:</b> 본 서비스는 물류 인프라를 활용한 통합 유통 모델입니다.<br><b>환불 및 취소:</b> 상품 특성(신선식품 등)에 따라 환불이 제한될 수 있으며, 취소 시 이미 발생한 배송 비용이 청구될 수 있습니다.'
-            }
-        };
-
-        function openUncleModal(type) {
-            const data = UNCLE_TERMS[type];
-            if(!data) return;
-            document.getElementById('term-title').innerText = data.title;
-            document.getElementById('term-modal-body').innerHTML = data.content;
-            document.getElementById('term-modal').style.display = 'flex';
-            document.body.style.overflow = 'hidden';
-        }
-
-        function closeUncleModal() {
-            document.getElementById('term-modal').style.display = 'none';
-            document.body.style.overflow = 'auto';
-        }
-
-        async function addToCart(productId) {
-            try {
-                const response = await fetch(`/cart/add/${productId}`, {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' }
-                });
-                if (response.redirected) { window.location.href = response.url; return; }
-                const result = await response.json();
-                if (result.success) {
-                    showToast("장바구니에 상품을 담았습니다! 🧺");
-                    const badge = document.getElementById('cart-count-badge');
-                    if(badge) badge.innerText = result.cart_count;
-                    if(window.location.pathname === '/cart') location.reload();
-                } else { 
-                    showToast(result.message || "추가 실패");
-                }
-            } catch (error) { 
-                console.error('Error:', error); 
-                showToast("일시적인 오류가 발생했습니다.");
-            }
-        }
-
-        async function minusFromCart(productId) {
-            try {
-                const response = await fetch(`/cart/minus/${productId}`, {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' }
-                });
-                const result = await response.json();
-                if (result.success) {
-                    const badge = document.getElementById('cart-count-badge');
-                    if(badge) badge.innerText = result.cart_count;
-                    location.reload(); 
-                } else { alert(result.message); }
-            } catch (error) { console.error('Error:', error); }
-        }
-
-        function showToast(msg) {
-            const t = document.getElementById("toast");
-            if(!t) return;
-            t.innerText = msg;
-            t.className = "show";
-            setTimeout(() => { t.className = t.className.replace("show", ""); }, 2500);
-        }
-
-        function updateCountdowns() {
-            const timers = document.querySelectorAll('.countdown-timer');
-            const now = new Date().getTime();
-            timers.forEach(timer => {
-                if(!timer.dataset.deadline) { timer.innerText = "📅 상시판매"; return; }
-                const deadline = new Date(timer.dataset.deadline).getTime();
-                const diff = deadline - now;
-                if (diff <= 0) {
-                    timer.innerText = "판매마감";
-                    const card = timer.closest('.product-card');
-                    if (card && !card.classList.contains('sold-out')) { card.classList.add('sold-out'); }
-                } else {
-                    const h = Math.floor(diff / (1000 * 60 * 60));
-                    const m = Math.floor((diff % (1000 * 60 * 60)) / (1000 * 60));
-                    const s = Math.floor((diff % (1000 * 60)) / 1000);
-                    timer.innerText = `📦 ${h.toString().padStart(2, '0')}:${m.toString().padStart(2, '0')}:${s.toString().padStart(2, '0')} 남음`;
-                }
-            });
-        }
-        setInterval(updateCountdowns, 1000);
-        updateCountdowns();
-        
-        function execDaumPostcode() {
-            new daum.Postcode({
-                oncomplete: function(data) {
-                    document.getElementById('address').value = data.address;
-                    document.getElementById('address_detail').focus();
-                }
-            }).open();
-        }
-        
-    </script>
-<script>
-function openUncleModal(type) {
-  const title = document.getElementById('uncleModalTitle');
-  const content = document.getElementById('uncleModalContent');
-
-  const data = {
-    terms: {
-      title: '이용약관',
-      content: `
-      <p><strong>제1조 (목적)</strong><br>
-      본 약관은 (주)DOVE(이하 "회사")이 제공하는 구매대행 및 배송 중개 서비스의 이용과 관련하여
-      회사와 이용자 간의 권리, 의무 및 책임사항을 규정함을 목적으로 합니다.</p>
-
-      <p><strong>제2조 (서비스의 정의)</strong><br>
-      회사는 상품을 직접 판매하지 않으며,
-      소비자의 요청에 따라 판매자(산지, 도매처 등)와 소비자를 연결하는
-      구매대행 및 배송 중개 서비스를 제공합니다.</p>
-
-      <p><strong>제3조 (서비스 이용 계약)</strong><br>
-      이용자는 본 약관에 동의함으로써 서비스 이용 계약이 성립되며,
-      결제 완료 시 구매대행 서비스 이용에 동의한 것으로 간주합니다.</p>
-
-      <p><strong>제4조 (책임의 구분)</strong><br>
-      상품의 품질, 원산지, 유통기한, 하자에 대한 책임은 판매자에게 있으며,
-      회사는 주문 접수, 결제 처리, 배송 중개 및 고객 응대에 대한 책임을 집니다.</p>
-
-      <p><strong>제5조 (면책 조항)</strong><br>
-      천재지변, 배송사 사정, 판매자 사정 등 회사의 합리적인 통제 범위를 벗어난 사유로
-      발생한 손해에 대하여 회사는 책임을 지지 않습니다.</p>
-      `
-    },
-
-    privacy: {
-      title: '개인정보처리방침',
-      content: `
-      <p><strong>1. 개인정보 수집 항목</strong><br>
-      회사는 서비스 제공을 위해 다음과 같은 개인정보를 수집합니다.<br>
-      - 필수항목: 이름, 휴대전화번호, 배송지 주소, 결제 정보</p>
-
-      <p><strong>2. 개인정보 이용 목적</strong><br>
-      수집된 개인정보는 다음 목적에 한하여 이용됩니다.<br>
-      - 주문 처리 및 배송<br>
-      - 고객 상담 및 민원 처리<br>
-      - 결제 및 환불 처리</p>
-
-      <p><strong>3. 개인정보 보관 및 이용 기간</strong><br>
-      개인정보는 수집 및 이용 목적 달성 시까지 보관하며,
-      관계 법령에 따라 일정 기간 보관 후 안전하게 파기합니다.</p>
-
-      <p><strong>4. 개인정보 제3자 제공</strong><br>
-      회사는 배송 및 주문 처리를 위해 판매자 및 배송업체에 한해
-      최소한의 개인정보를 제공합니다.</p>
-
-      <p><strong>5. 개인정보 보호</strong><br>
-      회사는 개인정보 보호를 위해 기술적·관리적 보호 조치를 취하고 있습니다.</p>
-      `
-    },
-
-    agency: {
-      title: '이용안내',
-      content: `
-      <p><strong>서비스 안내</strong><br>
-      DOVE는 상품을 직접 보유하거나 판매하지 않는
-      구매대행 및 배송 중개 플랫폼입니다.</p>
-
-      <p><strong>주문 절차</strong><br>
-      ① 이용자가 상품 선택 및 결제<br>
-      ② 회사가 판매자에게 구매 요청<br>
-      ③ 판매자가 상품 준비<br>
-      ④ 배송을 통해 고객에게 전달</p>
-
-      <p><strong>결제 안내</strong><br>
-      결제 금액은 상품 대금과 배송비로 구성되며,
-      구매대행 수수료는 별도로 청구되지 않습니다.</p>
-
-      <p><strong>유의사항</strong><br>
-      상품 정보는 판매자가 제공하며,
-      실제 상품은 이미지와 다소 차이가 있을 수 있습니다.</p>
-      `
-    },
-
-    e_commerce: {
-      title: '전자상거래 유의사항',
-      content: `
-      <p><strong>1. 청약 철회 및 환불</strong><br>
-      일반 상품의 경우 전자상거래법에 따라
-      상품 수령 후 7일 이내 청약 철회가 가능합니다.</p>
-
-      <p><strong>2. 농산물 및 신선식품</strong><br>
-      농산물·신선식품은 특성상 단순 변심에 의한
-      환불이 제한될 수 있습니다.</p>
-
-      <p><strong>3. 환불 가능 사유</strong><br>
-      - 상품 하자<br>
-      - 오배송<br>
-      - 상품 훼손</p>
-
-      <p><strong>4. 환불 절차</strong><br>
-      고객센터 접수 후 확인 절차를 거쳐
-      결제 수단으로 환불 처리됩니다.</p>
-
-      <p><strong>5. 분쟁 처리</strong><br>
-      분쟁 발생 시 전자상거래 관련 법령 및
-      소비자 분쟁 해결 기준을 따릅니다.</p>
-      `
-    }
-  };
-
-  title.innerText = data[type].title;
-  content.innerHTML = data[type].content;
-  document.getElementById('uncleModal').classList.remove('hidden');
-  document.getElementById('uncleModal').classList.add('flex');
-}
-
-function closeUncleModal() {
-  document.getElementById('uncleModal').classList.add('hidden');
-  document.getElementById('uncleModal').classList.remove('flex');
-}
-
-</script>
+    <script src="{{ asset_url('footer.js') }}"></script>
 
 </body>
 
@@ -1002,7 +842,7 @@ def admin_order_print():
         return "권한이 없습니다.", 403
 
     order_ids = request.args.get('ids', '').split(',')
-    target_orders = Order.query.filter(Order.order_id.in_(order_ids)).all()
+    target_orders = Order.query.options(selectinload(Order.items)).filter(Order.order_id.in_(order_ids)).all()
 
     # 데이터 가공 (마스킹 및 요약)
     processed_orders = []
@@ -1015,14 +855,8 @@ def admin_order_print():
         phone_parts = phone.split('-')
         masked_phone = f"{phone_parts[0]}-****-{phone_parts[2]}" if len(phone_parts) == 3 else "****"
 
-        # ✅ 품목 전체 리스트화 (카테고리 기호 제거 및 깔끔하게 정리)
-        raw_items = o.product_details.split('|')
-        all_items = []
-        for item in raw_items:
-            # '[카테고리] 상품명(수량)'에서 상품명(수량)만 추출
-            clean_item = item.split(']')[-1].strip() if ']' in item else item.strip()
-            if clean_item:
-                all_items.append(clean_item)
+        # ✅ 품목 전체 리스트화 (카테고리 기호 없이 상품명(수량))
+        all_items = [f"{it.name}({it.qty})" for it in o.items]
 
         # ✅ 현관 비밀번호 제외 로직 (숫자 포함 단어 필터링 강화)
         raw_memo = o.request_memo or ""
@@ -1142,16 +976,41 @@ def admin_order_print():
     </html>
     """
     return render_template_string(invoice_html, orders=processed_orders)
+# --------------------------------------------------------------------------------
+# 카테고리 캐시 (워커당 1회 로드, 카테고리 변경 시 무효화)
+# --------------------------------------------------------------------------------
+# 세션이 끝나도 안전하게 쓸 수 있도록 ORM 객체 대신 컬럼 값만 담은 스냅샷을 보관합니다.
+CategorySnapshot = namedtuple('CategorySnapshot', [c.name for c in Category.__table__.columns])
+app_cache = LocalCache(default_ttl=600, marker_path=os.path.join(app.instance_path, 'cache.marker'))
+
+def get_categories():
+    """전체 카테고리 (order, id 순) - 요청 내 1회, 워커 내 변경 전까지 재사용"""
+    if 'categories' not in g:
+        g.categories = app_cache.get('categories', lambda: [
+            CategorySnapshot(*(getattr(c, col) for col in CategorySnapshot._fields))
+            for c in Category.query.order_by(Category.order.asc(), Category.id.asc()).all()
+        ])
+    return g.categories
+
+def invalidate_category_cache():
+    app_cache.invalidate('categories', 'home:grids')
+    g.pop('categories', None)
+
+def get_cart_count():
+    """장바구니 수량 합계 (요청당 1회 조회)"""
+    if 'cart_count' not in g:
+        total_qty = 0
+        if current_user.is_authenticated:
+            total_qty = db.session.query(db.func.sum(Cart.quantity)).filter(Cart.user_id == current_user.id).scalar()
+        g.cart_count = total_qty or 0
+    return g.cart_count
+
 @app.context_processor
 def inject_globals():
     """전역 템플릿 변수 주입"""
-    cart_count = 0
-    if current_user.is_authenticated:
-        total_qty = db.session.query(db.func.sum(Cart.quantity)).filter(Cart.user_id == current_user.id).scalar()
-        cart_count = total_qty if total_qty else 0
-    categories = Category.query.order_by(Category.order.asc(), Category.id.asc()).all()
+    categories = get_categories()
     managers = [c.manager_email for c in categories if c.manager_email]
-    return dict(cart_count=cart_count, now=datetime.now(), managers=managers, nav_categories=categories)
+    return dict(cart_count=get_cart_count(), now=datetime.now(), managers=managers, nav_categories=categories)
 
 @app.route('/search')
 def search_view():
@@ -1161,14 +1020,14 @@ def search_view():
         return redirect(url_for('index'))
 
     # 1. 검색 결과 및 카테고리 그룹화
-    search_products = Product.query.filter(Product.is_active == True, Product.name.contains(query)).all()
+    search_products = search_catalog(query, limit=SEARCH_RESULT_LIMIT)
     grouped_search = {}
     for p in search_products:
         if p.category not in grouped_search: grouped_search[p.category] = []
         grouped_search[p.category].append(p)
 
     # 2. 하단 노출용 데이터
-    recommend_cats = Category.query.order_by(Category.order.asc()).limit(3).all()
+    recommend_cats = get_categories()[:3]
     cat_previews = {cat: Product.query.filter_by(category=cat.name, is_active=True).limit(4).all() for cat in recommend_cats}
 
     content = """
@@ -1185,7 +1044,7 @@ def search_view():
                     {% for p in products %}
                     <div class="product-card luxe-card group flex flex-col {% if p.stock <= 0 %}sold-out{% endif %}">
                         <a href="/product/{{p.id}}" class="relative aspect-[3/4] block overflow-hidden bg-[#f5f4f2] mb-4">
-                            <img src="{{ p.image_url }}" loading="lazy" class="w-full h-full object-cover transition-transform duration-500 group-hover:scale-105">
+                            <img {{ img_srcset(p.image_url) }} loading="lazy" class="w-full h-full object-cover transition-transform duration-500 group-hover:scale-105">
                             {% if p.stock <= 0 %}<div class="sold-out-badge">SOLD OUT</div>{% endif %}
                         </a>
                         <div class="flex flex-col flex-1">
@@ -1214,7 +1073,7 @@ def search_view():
                     <h3 class="font-medium text-[#0a0a0a] mb-6 text-sm tracking-wide">{{ cat.name }} <a href="/category/{{ cat.name }}" class="text-[#c9a962] ml-2 hover:underline">View All</a></h3>
                     <div class="grid grid-cols-2 gap-4">
                         {% for cp in prods %}
-                        <a href="/product/{{ cp.id }}" class="block aspect-square overflow-hidden bg-[#f5f4f2] hover:opacity-90 transition"><img src="{{ cp.image_url }}" class="w-full h-full object-cover"></a>
+                        <a href="/product/{{ cp.id }}" class="block aspect-square overflow-hidden bg-[#f5f4f2] hover:opacity-90 transition"><img {{ img_srcset(cp.image_url, '(min-width: 768px) 12vw, 25vw') }} loading="lazy" class="w-full h-full object-cover"></a>
                         {% endfor %}
                     </div>
                 </div>
@@ -1229,53 +1088,14 @@ def search_view():
     """
     return render_template_string(HEADER_HTML + content + FOOTER_HTML, **locals())
 
-@app.route('/')
-def index():
-    """메인 페이지 (디자인 유지)"""
-    categories = Category.query.order_by(Category.order.asc()).all()
-    grouped_products = {}
-    order_logic = (Product.stock <= 0) | (Product.deadline < datetime.now())
-    
-    latest_all = Product.query.filter_by(is_active=True).order_by(Product.id.desc()).limit(20).all()
-    random_latest = random.sample(latest_all, min(len(latest_all), 30)) if latest_all else []
-    
-    today_end = datetime.now().replace(hour=23, minute=59, second=59)
-    closing_today = Product.query.filter(Product.is_active == True, Product.deadline > datetime.now(), Product.deadline <= today_end).order_by(Product.deadline.asc()).all()
-    latest_reviews = Review.query.order_by(Review.created_at.desc()).limit(4).all()
-
-    for cat in categories:
-        prods = Product.query.filter_by(category=cat.name, is_active=True).order_by(order_logic, Product.id.desc()).all()
-        if prods: grouped_products[cat] = prods
-    
-    content = """
-<style>
-    .luxe-hero { min-height: 70vh; min-height: 70dvh; display: flex; align-items: center; justify-content: center; background: #0a0a0a; color: #faf9f7; position: relative; overflow: hidden; }
-    .luxe-hero::before { content: ''; position: absolute; inset: 0; background: radial-gradient(ellipse 80% 50% at 50% 50%, rgba(201,169,98,0.08) 0%, transparent 70%); pointer-events: none; }
-    .luxe-card { transition: all 0.5s cubic-bezier(0.16, 1, 0.3, 1); }
-    .luxe-card:hover { transform: translateY(-6px); }
-    .luxe-card:hover .luxe-card-img { transform: scale(1.03); }
-    .luxe-card-img { transition: transform 0.6s cubic-bezier(0.16, 1, 0.3, 1); }
-    .luxe-divider { width: 40px; height: 1px; background: #c9a962; }
-</style>
-
-<section class="luxe-hero">
-    <div class="max-w-4xl mx-auto px-8 md:px-12 text-center relative z-10">
-        <p class="text-[#c9a962] text-[11px] md:text-xs font-medium tracking-[0.4em] uppercase mb-8">New Season</p>
-        <p class="font-serif text-5xl md:text-7xl lg:text-8xl font-light tracking-[0.25em] mb-4 text-[#faf9f7]">DOVE</p>
-        <h1 class="font-serif text-2xl md:text-3xl lg:text-4xl font-light tracking-[0.15em] mb-6 leading-[1.2] text-[#faf9f7]/90">
-            순수한 순간을 담다
-        </h1>
-        <div class="luxe-divider mx-auto mb-8"></div>
-        <p class="text-[#faf9f7]/80 text-sm md:text-base font-light max-w-xl mx-auto mb-12 leading-relaxed tracking-wide">
-            감각적인 디자인과 완벽한 품질. 당신만의 스타일을 완성하세요.
-        </p>
-        <a href="#products" class="inline-block border border-[#faf9f7]/60 text-[#faf9f7] px-10 py-4 text-xs font-medium tracking-[0.2em] uppercase hover:bg-[#faf9f7] hover:text-[#0a0a0a] transition-all duration-300">
-            컬렉션 보기
-        </a>
-    </div>
-</section>
+# --------------------------------------------------------------------------------
+# 메인 화면 조각 캐시 (후기 스트립 / 카테고리별 상품 그리드)
+# --------------------------------------------------------------------------------
+# 사용자와 무관한 부분만 렌더링된 HTML 로 보관하고, 상품/재고/후기/카테고리 변경 시 무효화합니다.
+# 품절/마감 정렬이 시간에 따라 바뀌므로 TTL 을 짧게 둡니다.
+HOME_FRAGMENT_TTL = 60
 
-<div id="products" class="max-w-[1400px] mx-auto px-5 md:px-10 py-16 md:py-24">
+HOME_REVIEWS_HTML = """
     {% if latest_reviews %}
     <section class="mb-24">
         <div class="flex justify-between items-end mb-12">
@@ -1285,7 +1105,7 @@ def index():
             {% for r in latest_reviews %}
             <div class="luxe-card group">
                 <div class="aspect-square overflow-hidden bg-[#f5f4f2] mb-4">
-                    <img src="{{ r.image_url }}" class="luxe-card-img w-full h-full object-cover" alt="후기">
+                    <img {{ img_srcset(r.image_url) }} loading="lazy" class="luxe-card-img w-full h-full object-cover" alt="후기">
                 </div>
                 <p class="text-[10px] text-[#2c2c2c]/60 font-medium tracking-[0.1em] mb-1">{{ r.user_name[:1] }}** · {{ r.product_name }}</p>
                 <p class="text-[11px] font-light text-[#0a0a0a] line-clamp-2 leading-relaxed">{{ r.content }}</p>
@@ -1294,7 +1114,9 @@ def index():
         </div>
     </section>
     {% endif %}
+"""
 
+HOME_GRIDS_HTML = """
     {% for cat, products in grouped_products.items() %}
     <section class="mb-24">
         <div class="flex justify-between items-end mb-12">
@@ -1314,7 +1136,7 @@ def index():
                 </div>
                 {% endif %}
                 <a href="/product/{{p.id}}" class="relative aspect-[3/4] block overflow-hidden bg-[#f5f4f2] mb-4">
-                    <img src="{{ p.image_url }}" loading="lazy" class="luxe-card-img w-full h-full object-cover" alt="{{ p.name }}">
+                    <img {{ img_srcset(p.image_url) }} loading="lazy" class="luxe-card-img w-full h-full object-cover" alt="{{ p.name }}">
                     {% if p.stock <= 0 %}<div class="sold-out-badge">SOLD OUT</div>{% endif %}
                 </a>
                 <div class="flex flex-col flex-1">
@@ -1336,13 +1158,65 @@ def index():
         </div>
     </section>
     {% endfor %}
+"""
+
+def render_home_reviews():
+    latest_reviews = Review.query.order_by(Review.created_at.desc()).limit(4).all()
+    return Markup(render_template_string(HOME_REVIEWS_HTML, latest_reviews=latest_reviews))
+
+def render_home_grids():
+    order_logic = (Product.stock <= 0) | (Product.deadline < datetime.now())
+    grouped_products = {}
+    for cat in get_categories():
+        prods = Product.query.filter_by(category=cat.name, is_active=True).order_by(order_logic, Product.id.desc()).all()
+        if prods: grouped_products[cat] = prods
+    return Markup(render_template_string(HOME_GRIDS_HTML, grouped_products=grouped_products))
+
+def invalidate_home_cache():
+    """메인 화면 조각 캐시 삭제 (상품/재고/후기/카테고리 변경 시 호출)"""
+    app_cache.invalidate('home:reviews', 'home:grids')
+
+@app.route('/')
+def index():
+    """메인 페이지 (디자인 유지)"""
+    reviews_html = app_cache.get('home:reviews', render_home_reviews, ttl=HOME_FRAGMENT_TTL)
+    grids_html = app_cache.get('home:grids', render_home_grids, ttl=HOME_FRAGMENT_TTL)
+    
+    content = """
+<style>
+    .luxe-hero { min-height: 70vh; min-height: 70dvh; display: flex; align-items: center; justify-content: center; background: #0a0a0a; color: #faf9f7; position: relative; overflow: hidden; }
+    .luxe-hero::before { content: ''; position: absolute; inset: 0; background: radial-gradient(ellipse 80% 50% at 50% 50%, rgba(201,169,98,0.08) 0%, transparent 70%); pointer-events: none; }
+    .luxe-card { transition: all 0.5s cubic-bezier(0.16, 1, 0.3, 1); }
+    .luxe-card:hover { transform: translateY(-6px); }
+    .luxe-card:hover .luxe-card-img { transform: scale(1.03); }
+    .luxe-card-img { transition: transform 0.6s cubic-bezier(0.16, 1, 0.3, 1); }
+    .luxe-divider { width: 40px; height: 1px; background: #c9a962; }
+</style>
+
+<section class="luxe-hero">
+    <div class="max-w-4xl mx-auto px-8 md:px-12 text-center relative z-10">
+        <p class="text-[#c9a962] text-[11px] md:text-xs font-medium tracking-[0.4em] uppercase mb-8">New Season</p>
+        <p class="font-serif text-5xl md:text-7xl lg:text-8xl font-light tracking-[0.25em] mb-4 text-[#faf9f7]">DOVE</p>
+        <h1 class="font-serif text-2xl md:text-3xl lg:text-4xl font-light tracking-[0.15em] mb-6 leading-[1.2] text-[#faf9f7]/90">
+            순수한 순간을 담다
+        </h1>
+        <div class="luxe-divider mx-auto mb-8"></div>
+        <p class="text-[#faf9f7]/80 text-sm md:text-base font-light max-w-xl mx-auto mb-12 leading-relaxed tracking-wide">
+            감각적인 디자인과 완벽한 품질. 당신만의 스타일을 완성하세요.
+        </p>
+        <a href="#products" class="inline-block border border-[#faf9f7]/60 text-[#faf9f7] px-10 py-4 text-xs font-medium tracking-[0.2em] uppercase hover:bg-[#faf9f7] hover:text-[#0a0a0a] transition-all duration-300">
+            컬렉션 보기
+        </a>
+    </div>
+</section>
+
+<div id="products" class="max-w-[1400px] mx-auto px-5 md:px-10 py-16 md:py-24">
+    {{ reviews_html }}
+
+    {{ grids_html }}
 </div>
     """
-    return render_template_string(HEADER_HTML + content + FOOTER_HTML, 
-                                  grouped_products=grouped_products, 
-                                  random_latest=random_latest, 
-                                  closing_today=closing_today, 
-                                  latest_reviews=latest_reviews)
+    return render_template_string(HEADER_HTML + content + FOOTER_HTML, reviews_html=reviews_html, grids_html=grids_html)
 
 @app.route('/about')
 def about_page():
@@ -1556,24 +1430,79 @@ def about_page():
     </div>
     """
     return render_template_string(HEADER_HTML + content + FOOTER_HTML)
-# [추가] 무한 스크롤을 위한 상품 데이터 제공 API
-@app.route('/api/category_products/<string:cat_name>')
-def api_category_products(cat_name):
-    """무한 스크롤용 데이터 제공 API (20개 단위 고정)"""
-    page = int(request.args.get('page', 1))
-    per_page = 20  # 요청하신 대로 20개씩 나눕니다.
-    offset = (page - 1) * per_page
-    
-    query = Product.query.filter_by(is_active=True)
+# --------------------------------------------------------------------------------
+# 상품 목록 키셋(커서) 페이지네이션
+# --------------------------------------------------------------------------------
+# OFFSET 대신 마지막 상품의 정렬 키를 커서로 넘겨 깊게 스크롤해도 속도가 일정하고,
+# 첫 화면(category_view)과 무한 스크롤 API 가 같은 정렬/조건을 공유해 중복/누락이 없습니다.
+PRODUCT_PAGE_SIZE = 20
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(',', ':')).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, types):
+    """커서 -> 키 리스트, 길이/자료형이 types 와 다르거나 깨진 커서면 None (첫 페이지)"""
+    if not cursor: return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(key, list) or len(key) != len(types): return None
+    if not all(isinstance(v, t) and not isinstance(v, bool) for v, t in zip(key, types)): return None
+    return key
+
+def fetch_product_page(cat_name, cursor=None, per_page=PRODUCT_PAGE_SIZE):
+    """카테고리(최신상품/오늘마감 포함) 상품 한 페이지와 다음 커서 반환"""
+    now = datetime.now()
+    query = Product.query.filter(Product.is_active == True)
+
     if cat_name == '최신상품':
+        key = decode_cursor(cursor, (int,))
+        if key: query = query.filter(Product.id < key[0])
         query = query.order_by(Product.id.desc())
+        sort_key = lambda p: [p.id]
     elif cat_name == '오늘마감':
-        today_end = datetime.now().replace(hour=23, minute=59, second=59)
-        query = query.filter(Product.deadline > datetime.now(), Product.deadline <= today_end).order_by(Product.deadline.asc())
+        today_end = now.replace(hour=23, minute=59, second=59)
+        query = query.filter(Product.deadline > now, Product.deadline <= today_end)
+        key = decode_cursor(cursor, (str, int))
+        try:
+            last_deadline = datetime.fromisoformat(key[0]) if key else None
+        except ValueError:
+            last_deadline = None
+        if last_deadline:
+            query = query.filter(or_(Product.deadline > last_deadline, and_(Product.deadline == last_deadline, Product.id > key[1])))
+        query = query.order_by(Product.deadline.asc(), Product.id.asc())
+        sort_key = lambda p: [p.deadline.isoformat(), p.id]
     else:
-        query = query.filter_by(category=cat_name).order_by(Product.id.desc())
-    
-    products = query.offset(offset).limit(per_page).all()
+        # 판매중(0) -> 품절/마감(1) 순, 같은 그룹 안에서는 최신순
+        # 두 구간을 차례로 (category, is_active, id) 인덱스 역순으로 읽어, 카테고리 전체를 정렬하지 않음 (커서: [구간, 마지막 id])
+        query = query.filter(Product.category == cat_name)
+        in_stock = and_(or_(Product.stock == None, Product.stock > 0), or_(Product.deadline == None, Product.deadline >= now))
+        sold_out = or_(Product.stock <= 0, and_(Product.deadline != None, Product.deadline < now))
+        key = decode_cursor(cursor, (int, int)) or [0, None]
+        rows = []
+        for phase, cond in ((0, in_stock), (1, sold_out)):
+            if phase < key[0]: continue
+            phase_query = query.filter(cond)
+            if phase == key[0] and key[1] is not None: phase_query = phase_query.filter(Product.id < key[1])
+            rows += [(phase, p) for p in phase_query.order_by(Product.id.desc()).limit(per_page + 1 - len(rows)).all()]
+            if len(rows) > per_page: break
+        if len(rows) > per_page:
+            phase, last = rows[per_page - 1]
+            next_cursor = encode_cursor([phase, last.id])
+        else:
+            next_cursor = None
+        return [p for _, p in rows[:per_page]], next_cursor
+
+    products = query.limit(per_page + 1).all()
+    next_cursor = encode_cursor(sort_key(products[per_page - 1])) if len(products) > per_page else None
+    return products[:per_page], next_cursor
+
+# [추가] 무한 스크롤을 위한 상품 데이터 제공 API
+@app.route('/api/category_products/<string:cat_name>')
+def api_category_products(cat_name):
+    """무한 스크롤용 데이터 제공 API (20개 단위, cursor 기반)"""
+    products, next_cursor = fetch_product_page(cat_name, request.args.get('cursor'))
     
     res_data = []
     for p in products:
@@ -1582,35 +1511,31 @@ def api_category_products(cat_name):
             "name": p.name,
             "price": p.price,
             "image_url": p.image_url,
+            "image_srcset": image_store.srcset(p.image_url),
             "description": p.description or "",
             "spec": p.spec or "One Size",
             "stock": p.stock,
             "is_sold_out": (p.deadline and p.deadline < datetime.now()) or p.stock <= 0,
             "deadline": p.deadline.strftime('%Y-%m-%dT%H:%M:%S') if p.deadline else ""
         })
-    return jsonify(res_data)
+    return jsonify({"products": res_data, "next_cursor": next_cursor})
 @app.route('/category/<string:cat_name>')
 def category_view(cat_name):
     """카테고리별 상품 목록 뷰 (무한 스크롤 및 상세페이지 연결 완전 복구본)"""
-    order_logic = (Product.stock <= 0) | (Product.deadline < datetime.now())
     cat = None
-    limit_num = 20  # 요청하신 20개 단위 로딩 설정
     
     if cat_name == '최신상품':
-        products = Product.query.filter_by(is_active=True).order_by(Product.id.desc()).limit(limit_num).all()
         display_name = "✨ 최신 상품"
     elif cat_name == '오늘마감':
-        today_end = datetime.now().replace(hour=23, minute=59, second=59)
-        products = Product.query.filter(Product.is_active == True, Product.deadline > datetime.now(), Product.deadline <= today_end).order_by(Product.deadline.asc()).limit(limit_num).all()
         display_name = "🔥 오늘 마감 임박!"
     else:
         cat = Category.query.filter_by(name=cat_name).first_or_404()
-        products = Product.query.filter_by(category=cat_name, is_active=True).order_by(order_logic, Product.id.desc()).limit(limit_num).all()
         display_name = f"{cat_name} 상품 리스트"
+    products, next_cursor = fetch_product_page(cat_name)
 
     # 하단 추천 섹션 데이터
     latest_all = Product.query.filter(Product.is_active == True, Product.category != cat_name).order_by(Product.id.desc()).limit(10).all()
-    recommend_cats = Category.query.filter(Category.name != cat_name).order_by(Category.order.asc()).limit(3).all()
+    recommend_cats = [c for c in get_categories() if c.name != cat_name][:3]
     cat_previews = {c: Product.query.filter_by(category=c.name, is_active=True).limit(4).all() for c in recommend_cats}
 
     content = """
@@ -1629,7 +1554,7 @@ def category_view(cat_name):
                 </div>
                 {% endif %}
                 <a href="/product/{{p.id}}" class="relative aspect-[3/4] block overflow-hidden bg-[#f5f4f2] mb-4">
-                    <img src="{{ p.image_url }}" loading="lazy" class="luxe-card-img w-full h-full object-cover" alt="{{ p.name }}">
+                    <img {{ img_srcset(p.image_url) }} loading="lazy" class="luxe-card-img w-full h-full object-cover" alt="{{ p.name }}">
                     {% if p.stock <= 0 %}<div class="sold-out-badge">SOLD OUT</div>{% endif %}
                 </a>
                 <div class="flex flex-col flex-1">
@@ -1662,7 +1587,7 @@ def category_view(cat_name):
                         {% for cp in c_prods %}
                         <a href="/product/{{ cp.id }}" class="group block">
                             <div class="aspect-[3/4] overflow-hidden bg-[#f5f4f2] mb-2">
-                                <img src="{{ cp.image_url }}" class="w-full h-full object-cover group-hover:scale-105 transition duration-500">
+                                <img {{ img_srcset(cp.image_url, '(min-width: 768px) 12vw, 25vw') }} loading="lazy" class="w-full h-full object-cover group-hover:scale-105 transition duration-500">
                             </div>
                             <p class="text-[11px] font-medium text-[#0a0a0a] truncate">{{ cp.name }}</p>
                             <p class="text-[10px] text-[#2c2c2c]/60">{{ "{:,}".format(cp.price) }}원</p>
@@ -1680,20 +1605,22 @@ def category_view(cat_name):
     </div>
 
     <script>
-    let page = 1;
+    let nextCursor = {{ next_cursor|tojson }};
     let loading = false;
-    let hasMore = true;
+    let hasMore = nextCursor !== null;
     const catName = "{{ cat_name }}";
+    if (!hasMore) document.getElementById('end-message').classList.remove('hidden');
 
     async function loadMore() {
         if (loading || !hasMore) return;
         loading = true;
         document.getElementById('spinner').classList.remove('hidden');
 
-        page++;
         try {
-            const res = await fetch(`/api/category_products/${encodeURIComponent(catName)}?page=${page}&per_page=20`);
-            const data = await res.json();
+            const res = await fetch(`/api/category_products/${encodeURIComponent(catName)}?cursor=${encodeURIComponent(nextCursor)}`);
+            const body = await res.json();
+            const data = body.products;
+            nextCursor = body.next_cursor;
 
             if (!data || data.length === 0) {
                 hasMore = false;
@@ -1712,7 +1639,7 @@ def category_view(cat_name):
                     <div class="product-card luxe-card relative flex flex-col ${soldOutClass}">
                         ${deliveryBadge}
                         <a href="/product/${p.id}" class="relative aspect-[3/4] block overflow-hidden bg-[#f5f4f2] mb-4">
-                            <img src="${p.image_url}" loading="lazy" class="luxe-card-img w-full h-full object-cover" alt="${p.name}">
+                            <img src="${p.image_url}" ${p.image_srcset ? `srcset="${p.image_srcset}" sizes="(min-width: 1024px) 25vw, 50vw"` : ''} loading="lazy" class="luxe-card-img w-full h-full object-cover" alt="${p.name}">
                             ${soldOutBadge}
                         </a>
                         <div class="flex flex-col flex-1">
@@ -1727,7 +1654,7 @@ def category_view(cat_name):
                 grid.insertAdjacentHTML('beforeend', html);
             });
 
-            if (data.length < 20) {
+            if (!nextCursor) {
                 hasMore = false;
                 document.getElementById('end-message').classList.remove('hidden');
             }
@@ -1753,22 +1680,17 @@ def product_detail(pid):
     p = Product.query.get_or_404(pid)
     is_expired = (p.deadline and p.deadline < datetime.now())
     detail_images = p.detail_image_url.split(',') if p.detail_image_url else []
-    cat_info = Category.query.filter_by(name=p.category).first()
+    cat_info = next((c for c in get_categories() if c.name == p.category), None)
     
     # 1. 연관 추천 상품: 키워드(상품명 첫 단어) 기반
     keyword = p.name.split()[0] if p.name else ""
-    keyword_recommends = Product.query.filter(
-        Product.name.contains(keyword),
-        Product.id != pid,
-        Product.is_active == True,
-        Product.stock > 0
-    ).limit(10).all()
+    keyword_recommends = search_catalog(keyword, limit=10, exclude_id=pid, in_stock=True) if keyword else []
 
     # 2. 최근 등록 상품 10개 (이 데이터가 정상적으로 전달되어야 합니다)
     latest_all = Product.query.filter(Product.is_active == True, Product.id != pid).order_by(Product.id.desc()).limit(10).all()
     
     # 3. 하단 노출용 추천 카테고리 3개 및 미리보기 상품
-    recommend_cats_detail = Category.query.filter(Category.name != p.category).order_by(Category.order.asc()).limit(3).all()
+    recommend_cats_detail = [c for c in get_categories() if c.name != p.category][:3]
     cat_previews_detail = {c: Product.query.filter_by(category=c.name, is_active=True).limit(4).all() for c in recommend_cats_detail}
     
     # 4. 리뷰 리스트
@@ -1783,7 +1705,7 @@ def product_detail(pid):
                     <span class="px-4 py-1.5 text-[10px] font-medium text-white tracking-[0.15em] uppercase bg-[#0a0a0a]">{{ p.description }}</span>
                 </div>
                 {% endif %}
-                <img src="{{ p.image_url }}" class="w-full h-full object-cover" loading="lazy">
+                <img {{ img_srcset(p.image_url, '(min-width: 768px) 50vw, 100vw') }} class="w-full h-full object-cover" loading="lazy">
                 {% if is_expired or p.stock <= 0 %}
                 <div class="absolute inset-0 bg-black/40 flex items-center justify-center">
                     <span class="sold-out-badge">SOLD OUT</span>
@@ -1848,7 +1770,7 @@ def product_detail(pid):
                 <div class="space-y-4 max-w-4xl mx-auto">
                     {% if detail_images %}
                         {% for img in detail_images %}
-                        <img src="{{ img.strip() }}" class="w-full" loading="lazy" alt="상세 {{ loop.index }}">
+                        <img {{ img_srcset(img.strip(), '(min-width: 768px) 768px, 100vw') }} class="w-full" loading="lazy" alt="상세 {{ loop.index }}">
                         {% endfor %}
                     {% endif %}
                 </div>
@@ -1861,7 +1783,7 @@ def product_detail(pid):
             <div class="grid grid-cols-1 md:grid-cols-2 gap-8">
                 {% for r in product_reviews %}
                 <div class="border border-black/5 p-8 flex flex-col sm:flex-row gap-6">
-                    <img src="{{ r.image_url }}" class="w-full sm:w-28 h-28 object-cover flex-shrink-0 bg-[#f5f4f2]">
+                    <img {{ img_srcset(r.image_url, '(min-width: 640px) 112px, 100vw') }} loading="lazy" class="w-full sm:w-28 h-28 object-cover flex-shrink-0 bg-[#f5f4f2]">
                     <div class="flex-1">
                         <div class="flex items-center justify-between mb-2">
                             <span class="text-xs font-medium text-[#0a0a0a]">{{ r.user_name[:1] }}**</span>
@@ -1886,7 +1808,7 @@ def product_detail(pid):
                 {% for rp in keyword_recommends %}
                 <a href="/product/{{rp.id}}" class="flex-shrink-0 w-44 md:w-56 group">
                     <div class="aspect-[3/4] overflow-hidden bg-[#f5f4f2] mb-4">
-                        <img src="{{ rp.image_url }}" class="w-full h-full object-cover group-hover:scale-105 transition duration-500">
+                        <img {{ img_srcset(rp.image_url) }} loading="lazy" class="w-full h-full object-cover group-hover:scale-105 transition duration-500">
                     </div>
                     <p class="text-xs font-medium text-[#0a0a0a] truncate">{{ rp.name }}</p>
                     <p class="text-[10px] text-[#2c2c2c]/60">{{ "{:,}".format(rp.price) }}원</p>
@@ -1904,7 +1826,7 @@ def product_detail(pid):
                 {% for rp in latest_all %}
                 <a href="/product/{{rp.id}}" class="flex-shrink-0 w-44 md:w-56 group">
                     <div class="aspect-[3/4] overflow-hidden bg-[#f5f4f2] mb-4">
-                        <img src="{{ rp.image_url }}" class="w-full h-full object-cover group-hover:scale-105 transition duration-500">
+                        <img {{ img_srcset(rp.image_url) }} loading="lazy" class="w-full h-full object-cover group-hover:scale-105 transition duration-500">
                     </div>
                     <p class="text-xs font-medium text-[#0a0a0a] truncate">{{ rp.name }}</p>
                     <p class="text-[10px] text-[#2c2c2c]/60">{{ "{:,}".format(rp.price) }}원</p>
@@ -1928,7 +1850,7 @@ def product_detail(pid):
                         {% for cp in cat_previews_detail[c_info] %}
                         <a href="/product/{{ cp.id }}" class="group block">
                             <div class="aspect-[3/4] overflow-hidden bg-[#f5f4f2] mb-2">
-                                <img src="{{ cp.image_url }}" class="w-full h-full object-cover group-hover:scale-105 transition duration-500">
+                                <img {{ img_srcset(cp.image_url, '(min-width: 768px) 12vw, 25vw') }} loading="lazy" class="w-full h-full object-cover group-hover:scale-105 transition duration-500">
                             </div>
                             <p class="text-[11px] font-medium text-[#0a0a0a] truncate">{{ cp.name }}</p>
                             <p class="text-[10px] text-[#2c2c2c]/60">{{ "{:,}".format(cp.price) }}원</p>
@@ -2082,7 +2004,13 @@ def serve_manifest():
 
 @app.route('/sw.js')
 def serve_sw():
-    return send_from_directory('static', 'sw.js', mimetype='application/javascript')
+    """시작 시 생성한 버전 포함 서비스 워커 (루트 범위, 브라우저가 매번 갱신 여부 확인하도록 no-cache)"""
+    response = make_response(SW_SCRIPT)
+    response.headers['Content-Type'] = 'application/javascript; charset=utf-8'
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Service-Worker-Allowed'] = '/'
+    response.set_etag(SW_VERSION)
+    return response.make_conditional(request)
 # 2440번째 줄 근처 (PWA 서빙 코드 있는 곳)에 추가
 # app.py 내 serve_logo 함수를 아래처럼 더 명확하게 수정
 @app.route('/static/logo/<filename>')
@@ -2124,25 +2052,27 @@ def update_address():
 def mypage():
     """마이페이지 (최종 완성본: 폰트 최적화 및 한글화 버전)"""
     db.session.refresh(current_user)
-    orders = Order.query.filter_by(user_id=current_user.id).order_by(Order.created_at.desc()).all()
-    
-    # ✅ 품목별 금액을 포함한 상세 텍스트 생성 로직 유지
+    per_page = 20
+    before_id = request.args.get('before', type=int)
+
+    # ✅ 커서 기반 페이지네이션 (주문 id 내림차순, before=마지막 주문 id)
+    query = Order.query.options(selectinload(Order.items)).filter_by(user_id=current_user.id)
+    if before_id:
+        query = query.filter(Order.id < before_id)
+    orders = query.order_by(Order.id.desc()).limit(per_page + 1).all()
+    next_cursor = orders[per_page - 1].id if len(orders) > per_page else None
+    orders = orders[:per_page]
+
+    # ✅ 후기 작성 여부는 현재 페이지 주문에 대해 한 번에 조회
+    order_ids = [o.id for o in orders]
+    reviewed_ids = {r[0] for r in db.session.query(Review.order_id).filter(Review.order_id.in_(order_ids)).all()} if order_ids else set()
+
+    # ✅ 품목별 금액을 포함한 상세 텍스트 생성 (주문 시점 단가 스냅샷 기준, Product 조회 없음)
     enhanced_orders = []
     for o in orders:
-        details_with_price = []
-        parts = o.product_details.split(' | ')
-        for part in parts:
-            match = re.search(r'\[(.*?)\] (.*?)\((\d+)\)', part)
-            if match:
-                cat_n, p_name, qty = match.groups()
-                p_obj = Product.query.filter_by(name=p_name.strip()).first()
-                price = p_obj.price if p_obj else 0
-                line_total = price * int(qty)
-                details_with_price.append(f"{p_name.strip()}({qty}개) --- {line_total:,}원")
-            else:
-                details_with_price.append(part)
-        
-        o.enhanced_details = "\\n".join(details_with_price)
+        details_with_price = [f"{it.name}({it.qty}개) --- {(it.unit_price or 0) * it.qty:,}원" for it in o.items]
+        o.enhanced_details = "\\n".join(details_with_price or [o.product_details or ""])
+        o.has_review = o.id in reviewed_ids
         enhanced_orders.append(o)
 
     content = """
@@ -2232,8 +2162,7 @@ def mypage():
                         <div class="flex gap-2">
                             <button onclick='openReceiptModal({{ o.id }}, "{{ o.enhanced_details }}", "{{ o.total_price }}", "{{ o.delivery_address }}", "{{ o.order_id }}", "{{ o.delivery_fee }}")' class="text-xs font-medium text-[#2c2c2c]/60 border border-black/10 px-4 py-2.5 hover:border-[#0a0a0a] hover:text-[#0a0a0a] transition">영수증</button>
                             {% if o.status == '결제완료' %}
-                                {% set existing_review = Review.query.filter_by(order_id=o.id).first() %}
-                                {% if existing_review %}
+                                {% if o.has_review %}
                                     <button class="text-xs font-medium text-[#2c2c2c]/40 border border-black/5 px-4 py-2.5 cursor-not-allowed" disabled>작성완료</button>
                                 {% else %}
                                     <button onclick='openReviewModal({{ o.id }}, "{{ o.product_details.split("(")[0] }}")' class="text-xs font-medium text-[#c9a962] border border-[#c9a962]/50 px-4 py-2.5 hover:bg-[#c9a962]/10 transition">후기작성</button>
@@ -2249,6 +2178,11 @@ def mypage():
                 </div>
             {% endif %}
         </div>
+        {% if next_cursor %}
+        <div class="text-center mt-10">
+            <a href="/mypage?before={{ next_cursor }}" class="inline-block border border-black/10 px-8 py-3 text-xs font-medium text-[#2c2c2c]/60 tracking-[0.1em] hover:border-[#0a0a0a] hover:text-[#0a0a0a] transition">이전 주문 더보기</a>
+        </div>
+        {% endif %}
     </div>
 
     <div id="receipt-modal" class="fixed inset-0 bg-black/60 z-[6000] hidden flex items-center justify-center p-4 backdrop-blur-sm">
@@ -2381,7 +2315,7 @@ def mypage():
         function closeReviewModal() { document.getElementById('review-modal').classList.add('hidden'); }
     </script>
     """
-    return render_template_string(HEADER_HTML + content + FOOTER_HTML, orders=enhanced_orders, Review=Review)
+    return render_template_string(HEADER_HTML + content + FOOTER_HTML, orders=enhanced_orders, next_cursor=next_cursor)
 @app.route('/order/cancel/<int:oid>', methods=['POST'])
 @login_required
 def order_cancel(oid):
@@ -2394,19 +2328,18 @@ def order_cancel(oid):
     # 1. 상태 변경
     order.status = '결제취소'
     
-    # 2. 재고 복구 (주문 상세 텍스트 파싱)
+    # 2. 재고 복구 (주문 품목 기준)
     try:
-        parts = order.product_details.split(' | ')
-        for part in parts:
-            item_match = re.search(r'\] (.*?)\((\d+)\)', part)
-            if item_match:
-                p_name, qty = item_match.groups()
-                p = Product.query.filter_by(name=p_name.strip()).first()
-                if p: p.stock += int(qty)
+        product_ids = [it.product_id for it in order.items if it.product_id]
+        products = {p.id: p for p in Product.query.filter(Product.id.in_(product_ids)).all()} if product_ids else {}
+        for it in order.items:
+            p = products.get(it.product_id) or (Product.query.filter_by(name=it.name).first() if not it.product_id else None)
+            if p: p.stock += it.qty
     except Exception as e:
         print(f"Stock recovery error: {str(e)}")
             
     db.session.commit()
+    invalidate_home_cache()
     flash("결제가 성공적으로 취소되었습니다. 환불은 카드사 정책에 따라 3~7일 소요될 수 있습니다."); 
     return redirect('/mypage')
 
@@ -2431,13 +2364,10 @@ def review_add():
     if not img_path: 
         flash("후기 사진 등록은 필수입니다."); return redirect('/mypage')
     
-    # 리뷰 대상 상품 정보 파싱
-    p_name = order.product_details.split('(')[0].split(']')[-1].strip()
-    match = re.search(r'\[(.*?)\] (.*?)\(', order.product_details)
-    p_id = 0
-    if match:
-        first_p = Product.query.filter_by(name=match.group(2).strip()).first()
-        if first_p: p_id = first_p.id
+    # 리뷰 대상 상품 정보 (주문의 첫 번째 품목)
+    first_item = order.items[0] if order.items else None
+    p_name = first_item.name if first_item else order.product_details.split('(')[0].split(']')[-1].strip()
+    p_id = (first_item.product_id or 0) if first_item else 0
 
     # 2. [저장] Review 생성 시 order_id를 함께 기록 (필수)
     new_review = Review(
@@ -2451,6 +2381,7 @@ def review_add():
     )
     db.session.add(new_review)
     db.session.commit()
+    invalidate_home_cache()
     flash("소중한 후기가 등록되었습니다. 감사합니다!"); 
     return redirect('/mypage')
 
@@ -2783,7 +2714,10 @@ def payment_success():
         delivery_fee = sum([( (amt_ // 50001) + 1) * 1900 for amt_ in cat_price_sums.values()])
 
         # 주문 데이터 저장
-        db.session.add(Order(user_id=current_user.id, customer_name=current_user.name, customer_phone=current_user.phone, customer_email=current_user.email, product_details=details, total_price=int(amt), delivery_fee=delivery_fee, tax_free_amount=sum(i.price * i.quantity for i in items if i.tax_type == '면세'), order_id=oid, payment_key=pk, delivery_address=f"({current_user.address}) {current_user.address_detail} (현관:{current_user.entrance_pw})", request_memo=current_user.request_memo, status='결제완료'))
+        new_order = Order(user_id=current_user.id, customer_name=current_user.name, customer_phone=current_user.phone, customer_email=current_user.email, product_details=details, total_price=int(amt), delivery_fee=delivery_fee, tax_free_amount=sum(i.price * i.quantity for i in items if i.tax_type == '면세'), order_id=oid, payment_key=pk, delivery_address=f"({current_user.address}) {current_user.address_detail} (현관:{current_user.entrance_pw})", request_memo=current_user.request_memo, status='결제완료')
+        # 품목 행 저장 (결제 시점 단가 기록)
+        new_order.items = [OrderItem(product_id=i.product_id, category=i.product_category, name=i.product_name, unit_price=i.price, qty=i.quantity) for i in items]
+        db.session.add(new_order)
         
         # 재고 차감
         for i in items:
@@ -2792,6 +2726,7 @@ def payment_success():
         
         Cart.query.filter_by(user_id=current_user.id).delete()
         db.session.commit()
+        invalidate_home_cache()
         
         success_content = f"""
         <div class="max-w-md mx-auto py-24 md:py-32 px-6 text-center">
@@ -2874,21 +2809,124 @@ def admin_bulk_request_delivery():
     if not order_ids:
         return jsonify({"success": False, "message": "선택된 주문이 없습니다."})
 
-    # '결제완료' 상태인 주문들만 찾아서 '배송요청'으로 일괄 변경
+    # '결제완료' 상태인 주문들만 찾아서 '배송요청'으로 일괄 변경 + 배송 전달 대기열 기록 (같은 트랜잭션)
     orders = Order.query.filter(Order.order_id.in_(order_ids), Order.status == '결제완료').all()
     
     count = 0
     for o in orders:
         o.status = '배송요청'
         count += 1
+    if orders:
+        db.session.execute(sa_insert(DeliveryOutbox.__table__).prefix_with('OR IGNORE'),
+                           [{"order_id": o.order_id, "event": '배송요청', "created_at": datetime.now()} for o in orders])
     
     db.session.commit()
+
+    # 이번 요청의 주문만 즉시 배송 작업 생성 (대기열 행을 점유한 뒤 처리하므로 스케줄러와 겹쳐도 한 번만, 실패 시 스케줄러가 재시도)
+    try:
+        if orders: logi_consume_outbox(order_ids=[o.order_id for o in orders])
+    except Exception as e:
+        print(f"⚠️ [Outbox] 배송 작업 즉시 생성 실패 (스케줄러에서 재시도): {e}")
     return jsonify({"success": True, "message": f"{count}건의 배송 요청이 완료되었습니다."})
+
+# 변환 중 이미지 (완료되면 최종 파일로 이동, 커밋 전에 변환이 끝나 교체를 놓친 주소도 여기서 정리)
+PENDING_IMAGE_SVG = ('<svg xmlns="http://www.w3.org/2000/svg" width="800" height="800" viewBox="0 0 800 800">'
+                     '<rect width="800" height="800" fill="#f5f3ef"/><text x="400" y="410" font-size="32" text-anchor="middle" fill="#b8b2a7">이미지 처리 중</text></svg>')
+
+@app.route('/img/pending/<job_id>')
+def pending_image(job_id):
+    st = image_pipeline.status(job_id)
+    if st["status"] == "done":
+        # 주소 교체는 완료 콜백이 담당, 콜백 전에 워커가 죽어 임시 주소가 남은 경우만 보완 (워커당 작업별 1회 확인)
+        checked_key = f"img:pending:{job_id}"
+        if not app_cache.get(checked_key):
+            if pending_image_referenced(request.path): swap_pending_image_url(request.path, st["url"])
+            app_cache.set(checked_key, True, ttl=86400)
+        return redirect(st["url"])
+    svg = PENDING_IMAGE_SVG.replace('이미지 처리 중', '이미지 처리 실패 - 다시 등록해 주세요') if st["status"] == "failed" else PENDING_IMAGE_SVG
+    response = app.response_class(svg, mimetype='image/svg+xml')
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+# 기존 원본 이미지(한글 파일명 포함) 요청 시 리사이즈, 결과는 instance/img_cache 에 보관 (허용 크기만)
+resize_cache = ResizeCache(os.path.join(app.instance_path, 'img_cache'), max_bytes=int(os.getenv('IMG_CACHE_MAX_MB', '512')) * 1024 * 1024)
+
+@app.route('/img/<int:w>x<int:h>/<path:path>')
+def resized_image(w, h, path):
+    if (w, h) not in RESIZE_SIZES: return "허용되지 않은 이미지 크기입니다.", 400
+    src_path = image_store.source_path(f"/static/{path}")
+    if not src_path or not os.path.isfile(src_path): return "이미지를 찾을 수 없습니다.", 404
+    try:
+        cached = resize_cache.get(src_path, w, h)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ [Resize] {path} {w}x{h}: {e}")
+        return "이미지를 변환할 수 없습니다.", 415
+    return send_file(cached, mimetype='image/webp', max_age=RESIZE_MAX_AGE, conditional=True)
+
+@app.route('/api/image_status/<job_id>')
+def image_status(job_id):
+    """업로드 이미지 변환 상태 (status: done/pending/failed/unknown, 완료 시 url)"""
+    return jsonify(image_pipeline.status(job_id))
+
+@app.route('/admin/template_stats')
+@login_required
+def admin_template_stats():
+    """템플릿 컴파일 캐시 현황 (워커 프로세스 단위)"""
+    if not current_user.is_admin:
+        return jsonify({"success": False, "message": "권한이 없습니다."}), 403
+    stats = get_template_stats()
+    stats["pid"] = os.getpid()
+    return jsonify({"success": True, "stats": stats})
+
+def aggregate_order_stats(orders, is_master, my_categories):
+    """주문 탭 집계 엔진: 상품 단가를 한 번에 조회한 뒤 단일 순회로 요약/일별/합계 계산
+    반환: (filtered_orders, summary, daily_stats, stats)"""
+    names = {it.name for o in orders for it in o.items}
+    # 상품명 -> 현재 단가 (동명 상품은 먼저 등록된 상품 기준, 기존 filter_by(name).first() 와 동일)
+    price_map = {}
+    if names:
+        for name, price in db.session.query(Product.name, Product.price).filter(Product.name.in_(names)).order_by(Product.id.desc()).all():
+            price_map[name] = price
+
+    filtered_orders, summary, daily_stats = [], {}, {}
+    stats = {"sales": 0, "delivery": 0, "count": 0, "grand_total": 0}
+    for o in orders:
+        order_date = o.created_at.strftime('%Y-%m-%d')
+        day = daily_stats.setdefault(order_date, {"sales": 0, "count": 0})
+
+        order_show_flag = False
+        current_order_sales = 0  # 매니저별 정산 대상 금액 변수
+        for it in o.items:
+            cat_n = it.category
+            # 권한 확인 (마스터 혹은 해당 카테고리 매니저)
+            if not (is_master or cat_n in my_categories): continue
+            order_show_flag = True
+            cat_sum = summary.setdefault(cat_n, {"product_list": {}, "subtotal": 0})
+            price = price_map.get(it.name)
+            if price is not None:
+                item_price = (price or 0) * it.qty
+                cat_sum["subtotal"] += item_price
+                cat_sum["product_list"][it.name] = cat_sum["product_list"].get(it.name, 0) + it.qty
+                current_order_sales += item_price
+
+        # 권한이 있는 주문 데이터만 통계에 반영
+        if order_show_flag:
+            filtered_orders.append(o)
+            stats["sales"] += current_order_sales
+            stats["count"] += 1
+            day["sales"] += current_order_sales
+            day["count"] += 1
+            if is_master: stats["delivery"] += (o.delivery_fee or 0)
+
+    daily_stats = dict(sorted(daily_stats.items(), reverse=True))
+    stats["grand_total"] = stats["sales"] + stats["delivery"]
+    return filtered_orders, summary, daily_stats, stats
+
 @app.route('/admin')
 @login_required
 def admin_dashboard():
     """관리자 대시보드 - [매출+물류+카테고리+리뷰] 전체 기능 통합 복구본"""
-    categories = Category.query.order_by(Category.order.asc(), Category.id.asc()).all()
+    categories = get_categories()
     managers = [c.manager_email for c in categories if c.manager_email]
     
     if not (current_user.is_admin or current_user.email in managers):
@@ -2913,6 +2951,7 @@ def admin_dashboard():
     if tab == 'products':
         q = Product.query
         if sel_cat != '전체': q = q.filter_by(category=sel_cat)
+        q = q.options(load_only(Product.id, Product.name, Product.description, Product.stock, Product.category))
         products = [p for p in q.order_by(Product.id.desc()).all() if is_master or p.category in my_categories]
      
     elif tab == 'orders':
@@ -2927,58 +2966,13 @@ def admin_dashboard():
             end_dt = now.replace(hour=23, minute=59, second=59)
 
         # 결제취소 제외 주문 필터링
-        all_orders = Order.query.filter(
+        all_orders = Order.query.options(selectinload(Order.items), defer(Order.product_details)).filter(
             Order.created_at >= start_dt, 
             Order.created_at <= end_dt,
             Order.status != '결제취소'
         ).order_by(Order.created_at.desc()).all()
         
-        for o in all_orders:
-            order_date = o.created_at.strftime('%Y-%m-%d')
-            if order_date not in daily_stats:
-                daily_stats[order_date] = {"sales": 0, "count": 0}
-
-            order_show_flag = False
-            current_order_sales = 0  # 매니저별 정산 대상 금액 변수
-            
-            # 주문 상세 텍스트 파싱
-            parts = o.product_details.split(' | ')
-            for part in parts:
-                match = re.search(r'\[(.*?)\] (.*)', part)
-                if match:
-                    cat_n = match.group(1).strip()
-                    items_str = match.group(2).strip()
-                    
-                    # 권한 확인 (마스터 혹은 해당 카테고리 매니저)
-                    if is_master or cat_n in my_categories:
-                        order_show_flag = True
-                        if cat_n not in summary: 
-                            summary[cat_n] = {"product_list": {}, "subtotal": 0}
-                        
-                        for item in items_str.split(', '):
-                            it_match = re.search(r'(.*?)\((\d+)\)', item)
-                            if it_match:
-                                pn = it_match.group(1).strip()
-                                qt = int(it_match.group(2))
-                                # 상품 단가 조회하여 정산금 계산
-                                p_obj = Product.query.filter_by(name=pn).first()
-                                if p_obj:
-                                    item_price = p_obj.price * qt
-                                    summary[cat_n]["subtotal"] += item_price
-                                    summary[cat_n]["product_list"][pn] = summary[cat_n]["product_list"].get(pn, 0) + qt
-                                    current_order_sales += item_price
-
-            # 권한이 있는 주문 데이터만 통계에 반영
-            if order_show_flag:
-                filtered_orders.append(o)
-                stats["sales"] += current_order_sales
-                stats["count"] += 1
-                daily_stats[order_date]["sales"] += current_order_sales
-                daily_stats[order_date]["count"] += 1
-                if is_master: stats["delivery"] += (o.delivery_fee or 0)
-
-        daily_stats = dict(sorted(daily_stats.items(), reverse=True))
-        stats["grand_total"] = stats["sales"] + stats["delivery"]
+        filtered_orders, summary, daily_stats, stats = aggregate_order_stats(all_orders, is_master, my_categories)
             
     elif tab == 'reviews':
         # 리뷰 탭은 예외 처리 없이 단순 조회
@@ -3167,7 +3161,7 @@ def admin_dashboard():
     </td>
     <td class="p-5"><span class="font-medium text-[#0a0a0a]">{{ o.customer_name }}</span><br><span class="text-[#2c2c2c]/50">{{ o.customer_phone }}</span></td>
     <td class="p-5 text-[#2c2c2c]/60 text-[11px]">{{ o.delivery_address }}</td>
-    <td class="p-5 text-[#2c2c2c]/70 text-[11px]">{{ o.product_details }}</td>
+    <td class="p-5 text-[#2c2c2c]/70 text-[11px]">{% for it in o.items %}[{{ it.category }}] {{ it.name }}({{ it.qty }}){% if not loop.last %}, {% endif %}{% else %}{{ o.product_details }}{% endfor %}</td>
     <td class="p-5 text-right">
         {% if o.is_settled %}
             <div class="flex flex-col items-end">
@@ -3845,11 +3839,13 @@ def admin_product_bulk_upload():
             db.session.add(new_p); count += 1
             
         db.session.commit()
+        invalidate_home_cache()
         flash(f"{count}개의 상품이 성공적으로 등록되었습니다."); return redirect('/admin')
     except Exception as e: 
         db.session.rollback()
         flash(f"업로드 실패: {str(e)}"); return redirect('/admin')
         db.session.commit()
+        invalidate_home_cache()
         flash(f"{count}개의 상품이 성공적으로 등록되었습니다."); return redirect('/admin')
     except Exception as e: 
         db.session.rollback()
@@ -3863,6 +3859,7 @@ def admin_review_delete(rid):
     r = Review.query.get_or_404(rid)
     db.session.delete(r)
     db.session.commit()
+    invalidate_home_cache()
     flash("리뷰가 삭제되었습니다.")
     return redirect('/admin?tab=reviews')
 
@@ -3881,7 +3878,7 @@ def admin_product_add():
         detail_files = request.files.getlist('detail_images')
         detail_img_url_str = ",".join(filter(None, [save_uploaded_file(f) for f in detail_files if f.filename != '']))
         new_p = Product(name=request.form['name'], description=request.form['description'], category=cat_name, price=int(request.form['price']), spec=request.form['spec'], origin=request.form['origin'], farmer="DOVE", stock=int(request.form['stock']), image_url=main_img or "", detail_image_url=detail_img_url_str, deadline=datetime.strptime(request.form['deadline'], '%Y-%m-%dT%H:%M') if request.form.get('deadline') else None, badge=request.form['badge'])
-        db.session.add(new_p); db.session.commit(); return redirect('/admin')
+        db.session.add(new_p); db.session.commit(); invalidate_home_cache(); return redirect('/admin')
     return render_template_string(HEADER_HTML + """
     <div class="max-w-xl mx-auto py-16 px-6">
         <h2 class="text-xl font-medium text-[#0a0a0a] mb-10 tracking-wide border-l-4 border-[#c9a962] pl-4">상품 등록</h2>
@@ -3948,6 +3945,7 @@ def admin_product_edit(pid):
             p.detail_image_url = ",".join(filter(None, [save_uploaded_file(f) for f in detail_files if f.filename != '']))
             
         db.session.commit()
+        invalidate_home_cache()
         flash("상품 정보가 성공적으로 수정되었습니다.")
         return redirect('/admin')
 
@@ -3995,7 +3993,7 @@ def admin_product_edit(pid):
 def admin_delete(pid):
     """상품 삭제"""
     p = Product.query.get(pid)
-    if p and check_admin_permission(p.category): db.session.delete(p); db.session.commit()
+    if p and check_admin_permission(p.category): db.session.delete(p); db.session.commit(); invalidate_home_cache()
     return redirect('/admin')
 
 @app.route('/admin/category/add', methods=['POST'])
@@ -4006,7 +4004,7 @@ def admin_category_add():
     last_cat = Category.query.order_by(Category.order.desc()).first()
     next_order = (last_cat.order + 1) if last_cat else 0
     db.session.add(Category(name=request.form['cat_name'], description=request.form.get('description'), tax_type=request.form['tax_type'], manager_email=request.form.get('manager_email'), seller_name=request.form.get('biz_name'), seller_inquiry_link=request.form.get('seller_link'), biz_name=request.form.get('biz_name'), biz_representative=request.form.get('biz_representative'), biz_reg_number=request.form.get('biz_reg_number'), biz_address=request.form.get('biz_address'), biz_contact=request.form.get('biz_contact'), order=next_order))
-    db.session.commit(); return redirect('/admin?tab=categories')
+    db.session.commit(); invalidate_category_cache(); return redirect('/admin?tab=categories')
 
 @app.route('/admin/category/edit/<int:cid>', methods=['GET', 'POST'])
 @login_required
@@ -4018,7 +4016,7 @@ def admin_category_edit(cid):
         cat.name, cat.description, cat.tax_type, cat.manager_email = request.form['cat_name'], request.form['description'], request.form['tax_type'], request.form.get('manager_email')
         cat.biz_name, cat.biz_representative, cat.biz_reg_number, cat.biz_address, cat.biz_contact, cat.seller_inquiry_link = request.form.get('biz_name'), request.form.get('biz_representative'), request.form.get('biz_reg_number'), request.form.get('biz_address'), request.form.get('biz_contact'), request.form.get('seller_link')
         cat.seller_name = cat.biz_name
-        db.session.commit(); return redirect('/admin?tab=categories')
+        db.session.commit(); invalidate_category_cache(); return redirect('/admin?tab=categories')
     return render_template_string(HEADER_HTML + """
     <div class="max-w-xl mx-auto py-16 px-6">
         <h2 class="text-xl font-medium text-[#0a0a0a] mb-10 tracking-wide border-l-4 border-[#c9a962] pl-4">카테고리 수정</h2>
@@ -4053,7 +4051,7 @@ def admin_category_move(cid, direction):
     curr = Category.query.get_or_404(cid)
     if direction == 'up': target = Category.query.filter(Category.order < curr.order).order_by(Category.order.desc()).first()
     else: target = Category.query.filter(Category.order > curr.order).order_by(Category.order.asc()).first()
-    if target: curr.order, target.order = target.order, curr.order; db.session.commit()
+    if target: curr.order, target.order = target.order, curr.order; db.session.commit(); invalidate_category_cache()
     return redirect('/admin?tab=categories')
 
 @app.route('/admin/category/delete/<int:cid>')
@@ -4061,7 +4059,7 @@ def admin_category_move(cid, direction):
 def admin_category_delete(cid):
     """카테고리 삭제"""
     if not current_user.is_admin: return redirect('/')
-    db.session.delete(Category.query.get(cid)); db.session.commit(); return redirect('/admin?tab=categories')
+    db.session.delete(Category.query.get(cid)); db.session.commit(); invalidate_category_cache(); return redirect('/admin?tab=categories')
 
 from urllib.parse import quote
 
@@ -4069,7 +4067,7 @@ from urllib.parse import quote
 @login_required
 def admin_orders_excel():
     """주문 내역 엑셀 다운로드 (정산여부/일시 포함 + 품목 분리 최종 완성본)"""
-    categories = Category.query.all()
+    categories = get_categories()
     my_categories = [c.name for c in categories if c.manager_email == current_user.email]
     
     if not (current_user.is_admin or my_categories):
@@ -4093,7 +4091,7 @@ def admin_orders_excel():
     except:
         pass
 
-    orders = query.order_by(Order.created_at.desc()).all()
+    orders = query.options(selectinload(Order.items)).order_by(Order.created_at.desc()).all()
     
     data = []
     all_product_columns = set()
@@ -4113,24 +4111,14 @@ def admin_orders_excel():
             "정산일시": o.settled_at.strftime('%Y-%m-%d %H:%M') if (getattr(o, 'is_settled', False) and o.settled_at) else "-"
         }
         
-        parts = o.product_details.split(' | ') if o.product_details else []
         row_show_flag = False
         
-        for part in parts:
-            match = re.search(r'\[(.*?)\] (.*)', part)
-            if match:
-                cat_n, items_str = match.groups()
-                if is_master or cat_n in my_categories:
-                    row_show_flag = True
-                    items = items_str.split(', ')
-                    for item in items:
-                        item_match = re.search(r'(.*?)\((\d+)\)', item)
-                        if item_match:
-                            p_name = item_match.group(1).strip()
-                            p_qty = int(item_match.group(2))
-                            col_name = f"[{cat_n}] {p_name}"
-                            row[col_name] = p_qty
-                            all_product_columns.add(col_name)
+        for it in o.items:
+            if is_master or it.category in my_categories:
+                row_show_flag = True
+                col_name = f"[{it.category}] {it.name}"
+                row[col_name] = it.qty
+                all_product_columns.add(col_name)
 
         if row_show_flag:
             data.append(row)
@@ -4317,6 +4305,8 @@ def admin_reseed_clothing():
         Category.query.delete()
         db.session.commit()
         init_db()
+    rebuild_search_index()
+    invalidate_category_cache(); invalidate_home_cache()  # 상품이 모두 바뀌므로 메인 후기 조각까지
     return redirect('/admin')
 # [수정 위치: app.py 파일 가장 마지막 부분]
 
@@ -4350,11 +4340,31 @@ def run_force_initialization():
             
             # SQLite 필수 컬럼 패치 (이미 있으면 통과)
             from sqlalchemy import text
-            alter_queries = ['ALTER TABLE "order" ADD COLUMN is_settled INTEGER DEFAULT 0', 'ALTER TABLE "order" ADD COLUMN settled_at DATETIME']
+            alter_queries = ['ALTER TABLE "order" ADD COLUMN is_settled INTEGER DEFAULT 0', 'ALTER TABLE "order" ADD COLUMN settled_at DATETIME',
+                             'CREATE INDEX IF NOT EXISTS ix_product_category_active_id ON product (category, is_active, id)',
+                             'ALTER TABLE "order" ADD COLUMN updated_at DATETIME',
+                             'UPDATE "order" SET updated_at = created_at WHERE updated_at IS NULL',
+                             'CREATE INDEX IF NOT EXISTS ix_order_updated_at ON "order" (updated_at)',
+                             'ALTER TABLE delivery_outbox ADD COLUMN claimed_at DATETIME']
             for q in alter_queries:
                 try: db.session.execute(text(q)); db.session.commit()
                 except: db.session.rollback()
 
+            # 상품 검색 색인 (FTS5) 준비
+            init_search_index()
+
+            # 주문 품목 테이블 이관 (기존 주문의 product_details 파싱, 1회성)
+            migrated = backfill_order_items()
+            if migrated: print(f"✅ [Migration] 주문 품목 {migrated}건 생성")
+
+            # 배송 DB(delivery bind) 스키마 보정 및 메인 DB 의 기존 배송 데이터 이관 (1회성)
+            moved = logi_init_storage()
+            if moved: print(f"✅ [Migration] 배송 작업 {moved}건 delivery DB 로 이관")
+
+            # 배송 완료 사진 파일 이관 (DB base64 -> static/proof_photos, 1회성)
+            moved = logi_migrate_proof_photos()
+            if moved: print(f"✅ [Migration] 배송 사진 {moved}건 파일 이관")
+
             # 어드민 계정 강제 생성/초기화 (로그인 안되는 문제 해결)
             admin_email = "admin@uncle.com"
             admin = User.query.filter_by(email=admin_email).first()
@@ -4375,6 +4385,8 @@ def run_force_initialization():
 
 # 2. [핵심] 앱 실행 직전에 호출 (Gunicorn이 읽을 수 있게 if문 밖으로 꺼냄)
 run_force_initialization()
+logi_start_scheduler(app)  # 배송 주문 자동 동기화 (LOGI_SYNC_INTERVAL 초, 워커 중 하나만 실행)
+if not app.testing: image_pipeline.resume_incoming()  # 재시작 전에 변환되지 못한 업로드 이어서 처리
 
 # 3. 서버 실행부 (단순하게 유지)
 if __name__ == "__main__":
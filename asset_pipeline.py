@@ -0,0 +1,92 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+
+from flask import abort, request, send_file
+
+try:
+    import brotli  # 선택 의존성 (없으면 .br 변형 없이 gzip 만 제공)
+except ImportError:
+    brotli = None
+
+# --------------------------------------------------------------------------------
+# 정적 자산 빌드 (static/src -> static/dist, 내용 해시 파일명 + .gz/.br 사전 압축 + manifest)
+# --------------------------------------------------------------------------------
+# 공통 CSS/JS 를 HTML 응답마다 인라인으로 보내던 것을 파일로 분리해, 브라우저가 1년간 캐시하게 합니다.
+# 파일 내용이 바뀌면 해시가 바뀌므로 새 주소로 받아갑니다. 빌드는 앱 시작 시 수행되며
+# 결과가 결정적이라 여러 워커가 동시에 빌드해도 같은 파일을 씁니다.
+
+ASSET_MAX_AGE = 31536000
+COMPRESSIBLE_EXTS = ('.css', '.js', '.svg', '.json', '.txt')
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.part"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def build_assets(src_dir, dist_dir):
+    """src_dir 의 파일을 해시 파일명으로 복사하고 압축 변형/manifest 생성, {원래 이름: 해시 이름} 반환"""
+    os.makedirs(dist_dir, exist_ok=True)
+    manifest = {}
+    for name in sorted(os.listdir(src_dir)):
+        src_path = os.path.join(src_dir, name)
+        if not os.path.isfile(src_path): continue
+        with open(src_path, 'rb') as f:
+            data = f.read()
+        stem, ext = os.path.splitext(name)
+        hashed = f"{stem}.{hashlib.sha1(data).hexdigest()[:10]}{ext}"
+        out_path = os.path.join(dist_dir, hashed)
+        if not os.path.exists(out_path):
+            _write_atomic(out_path, data)
+            if ext in COMPRESSIBLE_EXTS:
+                _write_atomic(out_path + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+                if brotli is not None: _write_atomic(out_path + '.br', brotli.compress(data, quality=11))
+        manifest[name] = hashed
+    _write_atomic(os.path.join(dist_dir, 'manifest.json'), json.dumps(manifest, indent=2).encode('utf-8'))
+    return manifest
+
+
+class AssetManifest:
+    def __init__(self, app=None, src_dir=None, dist_dir=None, url_prefix='/assets'):
+        self.manifest = {}
+        self.url_prefix = url_prefix
+        if app is not None: self.init_app(app, src_dir, dist_dir)
+
+    def init_app(self, app, src_dir=None, dist_dir=None):
+        self.src_dir = src_dir or os.path.join(app.static_folder, 'src')
+        self.dist_dir = dist_dir or os.path.join(app.static_folder, 'dist')
+        try:
+            self.manifest = build_assets(self.src_dir, self.dist_dir)
+            print(f"✅ [Assets] 정적 자산 {len(self.manifest)}개 빌드 (brotli {'사용' if brotli else '없음, gzip 만 제공'})")
+        except OSError as e:
+            print(f"⚠️ [Assets] 정적 자산 빌드 실패, 원본 파일 사용: {e}")
+        app.add_template_global(self.asset_url, 'asset_url')
+        app.add_url_rule(f"{self.url_prefix}/<path:filename>", 'asset_file', self.serve)
+
+    def asset_url(self, name):
+        """템플릿용: 원래 파일명 -> 해시 주소 (빌드 결과가 없으면 static/src 원본 주소)"""
+        hashed = self.manifest.get(name)
+        if hashed: return f"{self.url_prefix}/{hashed}"
+        return f"/static/src/{name}"
+
+    def serve(self, filename):
+        """Accept-Encoding 에 맞춰 .br/.gz 사전 압축본 선택, 해시 파일명이므로 immutable 장기 캐시"""
+        if filename not in self.manifest.values(): abort(404)
+        path = os.path.join(self.dist_dir, filename)
+        # q 값 기준 선택 (gzip;q=0 처럼 거부한 인코딩은 제외, 같은 q 면 br 우선)
+        encoding, best_q = None, 0
+        for enc, suffix in (('br', '.br'), ('gzip', '.gz')):
+            q = request.accept_encodings[enc]
+            if q > best_q and os.path.exists(path + suffix): encoding, best_q = enc, q
+        if encoding: path += '.br' if encoding == 'br' else '.gz'
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_file(path, mimetype=mimetype, max_age=ASSET_MAX_AGE, conditional=True, etag=filename + (f'.{encoding}' if encoding else ''))
+        if encoding: response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = f'public, max-age={ASSET_MAX_AGE}, immutable'
+        return response
@@ -1,5 +1,4 @@
 import os
-import sqlite3
 import requests
 import json
 import time
@@ -7,10 +6,22 @@ import hmac
 import hashlib
 import re
 import uuid
+import socket
+import threading
+import base64
+from io import BytesIO
+from urllib.parse import quote
+from collections import namedtuple
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from flask import Blueprint, render_template_string, request, redirect, jsonify, flash, url_for, session
+from flask import Blueprint, request, redirect, jsonify, flash, url_for, session, send_file, send_from_directory, g, current_app, has_request_context
+import pandas as pd
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import text, UniqueConstraint
+from sqlalchemy import text, bindparam, insert, update, select, inspect, column, event, case, and_, or_, func, tuple_, Integer, DateTime, UniqueConstraint
+from sqlalchemy.orm import load_only, deferred, column_property
+from PIL import Image, ImageOps
+from template_registry import render_template_string
+from local_cache import LocalCache
 
 # [핵심] Blueprint 정의 (이름: logi, 주소 접두어: /logi)
 # 이 설정으로 인해 이제 모든 주소는 basam.co.kr/logi/... 가 됩니다.
@@ -47,11 +58,13 @@ def get_kst():
     """한국 표준시(UTC+9) 반환 함수"""
     return datetime.utcnow() + timedelta(hours=9)
 class AdminUser(db_delivery.Model):
+    __bind_key__ = 'delivery'
     id = db_delivery.Column(db_delivery.Integer, primary_key=True)
     username = db_delivery.Column(db_delivery.String(50), unique=True)
     password = db_delivery.Column(db_delivery.String(100))
 
 class Driver(db_delivery.Model):
+    __bind_key__ = 'delivery'
     id = db_delivery.Column(db_delivery.Integer, primary_key=True)
     name = db_delivery.Column(db_delivery.String(50), nullable=False)
     phone = db_delivery.Column(db_delivery.String(20))
@@ -60,23 +73,54 @@ class Driver(db_delivery.Model):
     created_at = db_delivery.Column(db_delivery.DateTime, default=get_kst)
 
 class DeliveryTask(db_delivery.Model):
+    __bind_key__ = 'delivery'
     id = db_delivery.Column(db_delivery.Integer, primary_key=True)
     order_id = db_delivery.Column(db_delivery.String(100))
     customer_name = db_delivery.Column(db_delivery.String(50))
     phone = db_delivery.Column(db_delivery.String(20))
-    address = db_delivery.Column(db_delivery.String(500))
+    address = db_delivery.Column(db_delivery.String(500), nullable=False, default='')  # 목록 정렬/커서 기준이라 NULL 대신 ''
     category = db_delivery.Column(db_delivery.String(100)) 
     memo = db_delivery.Column(db_delivery.String(500))
     product_details = db_delivery.Column(db_delivery.Text)
     driver_id = db_delivery.Column(db_delivery.Integer, nullable=True)
     driver_name = db_delivery.Column(db_delivery.String(50), default="미배정")
     status = db_delivery.Column(db_delivery.String(20), default="대기")
-    photo_data = db_delivery.Column(db_delivery.Text, nullable=True) 
+    photo_data = deferred(db_delivery.Column(db_delivery.Text, nullable=True))  # 과거 base64 사진 (목록 조회 시 로드하지 않음)
+    photo_path = db_delivery.Column(db_delivery.String(300), nullable=True)  # static/proof_photos 기준 파일명 (원본, 썸네일은 _thumb)
     pickup_at = db_delivery.Column(db_delivery.DateTime, nullable=True)
     completed_at = db_delivery.Column(db_delivery.DateTime, nullable=True)
-    __table_args__ = (UniqueConstraint('order_id', 'category', name='_order_cat_v12_uc_bp'),)
+    item_qty = db_delivery.Column(db_delivery.Integer, nullable=False, default=0)  # 입고 시 product_details 에서 추출한 수량 (목록 정렬용)
+    __table_args__ = (UniqueConstraint('order_id', 'category', name='_order_cat_v12_uc_bp'),
+                      db_delivery.Index('ix_delivery_task_board', 'address', 'item_qty', 'id'))
+
+# 사진 유무 표시용 (base64 본문은 읽지 않고 NULL 여부만 조회)
+DeliveryTask.has_photo_data = column_property(DeliveryTask.__table__.c.photo_data.isnot(None))
+
+class DeliveryTaskItem(db_delivery.Model):
+    """배송 작업별 품목 (입고 시 주문 품목/product_details 에서 한 번만 생성)"""
+    __bind_key__ = 'delivery'
+    id = db_delivery.Column(db_delivery.Integer, primary_key=True)
+    task_id = db_delivery.Column(db_delivery.Integer, nullable=False, index=True)
+    category = db_delivery.Column(db_delivery.String(100))
+    name = db_delivery.Column(db_delivery.String(200))
+    qty = db_delivery.Column(db_delivery.Integer, default=0)
+    __table_args__ = (db_delivery.Index('uq_delivery_task_item_name', 'task_id', 'name', unique=True),)
+
+class LogiSyncState(db_delivery.Model):
+    """쇼핑몰 주문 동기화 진행 지점 (워터마크)"""
+    __bind_key__ = 'delivery'
+    id = db_delivery.Column(db_delivery.Integer, primary_key=True)
+    name = db_delivery.Column(db_delivery.String(50), unique=True, nullable=False)
+    last_updated_at = db_delivery.Column(db_delivery.DateTime, nullable=True)  # 마지막으로 반영한 주문 updated_at
+    last_run_at = db_delivery.Column(db_delivery.DateTime, nullable=True)
+    last_count = db_delivery.Column(db_delivery.Integer, default=0)
+    last_duration_ms = db_delivery.Column(db_delivery.Integer, nullable=True)
+    last_error = db_delivery.Column(db_delivery.String(500), nullable=True)
+    lease_owner = db_delivery.Column(db_delivery.String(100), nullable=True)  # 자동 동기화를 맡은 워커 (host:pid)
+    lease_until = db_delivery.Column(db_delivery.DateTime, nullable=True)
 
 class DeliveryLog(db_delivery.Model):
+    __bind_key__ = 'delivery'
     id = db_delivery.Column(db_delivery.Integer, primary_key=True)
     task_id = db_delivery.Column(db_delivery.Integer)
     order_id = db_delivery.Column(db_delivery.String(100))
@@ -92,29 +136,366 @@ class DeliveryLog(db_delivery.Model):
 def get_kst():
     """한국 표준시(UTC+9) 반환 함수"""
     return datetime.utcnow() + timedelta(hours=9)
+# --------------------------------------------------------------------------------
+# 배송 로그 버퍼 (요청 단위로 모아 한 번에 기록)
+# --------------------------------------------------------------------------------
+# 일괄 처리 시 로그 1건마다 commit(fsync) 하던 것을 요청 안에서는 g 에 모아두었다가
+# 작업 변경과 같은 트랜잭션의 commit 직전에 executemany 한 번으로 기록합니다.
+# commit 없이 끝난 요청은 teardown 에서 별도 트랜잭션으로 기록하고, rollback 시에는 함께 버립니다.
+# 테스트 등에서 즉시 기록이 필요하면 app.config['LOGI_LOG_SYNC'] = True
 def logi_add_log(task_id, order_id, status, message):
     # 로그 생성 시 시점을 한국 시간으로 고정
-    log = DeliveryLog(task_id=task_id, order_id=order_id, status=status, message=message, created_at=get_kst())
-    db_delivery.session.add(log)
-    db_delivery.session.commit()
+    row = dict(task_id=task_id, order_id=order_id, status=status, message=message, created_at=get_kst())
+    if not has_request_context() or current_app.config.get('LOGI_LOG_SYNC'):
+        db_delivery.session.add(DeliveryLog(**row))
+        db_delivery.session.commit()
+        return
+    g.setdefault('logi_log_buffer', []).append(row)
+
+def _logi_take_buffered_logs():
+    if not has_request_context(): return []
+    return g.pop('logi_log_buffer', None) or []
+
+@event.listens_for(db_delivery.session, 'before_commit')
+def _logi_flush_logs_on_commit(session):
+    rows = _logi_take_buffered_logs()
+    if rows: session.execute(insert(DeliveryLog.__table__), rows)
+
+@event.listens_for(db_delivery.session, 'after_rollback')
+def _logi_discard_logs_on_rollback(session):
+    _logi_take_buffered_logs()
+
+@logi_bp.teardown_app_request
+def logi_flush_logs(exc=None):
+    rows = _logi_take_buffered_logs()
+    if rows and exc is None:
+        with db_delivery.engines['delivery'].begin() as conn:
+            conn.execute(insert(DeliveryLog.__table__), rows)
 
 def logi_extract_qty(text_data):
     match = re.search(r'\((\d+)\)', text_data)
     return int(match.group(1)) if match else 0
 
-def logi_get_item_summary(tasks):
-    summary = {}
-    for t in tasks:
-        items = re.findall(r'\]\s*(.*?)\((\d+)\)', t.product_details)
-        if not items: items = re.findall(r'(.*?)\((\d+)\)', t.product_details)
-        for name, qty in items:
-            name = name.strip()
-            summary[name] = summary.get(name, 0) + int(qty)
-    return summary
+def logi_fetch_order_items(order_ids):
+    """쇼핑몰 주문 품목 테이블에서 (주문번호, 카테고리, 상품명, 수량) 일괄 조회"""
+    if not order_ids: return []
+    try:
+        stmt = text('SELECT o.order_id, i.category, i.name, i.qty FROM order_item i JOIN "order" o ON o.id = i.order_id WHERE o.order_id IN :ids').bindparams(bindparam('ids', expanding=True))
+        return db_delivery.session.execute(stmt, {"ids": list(set(order_ids))}).fetchall()
+    except Exception:
+        return []
+
+def logi_parse_items(text_data):
+    """구주문 product_details 문자열 -> [(상품명, 수량)]"""
+    items = re.findall(r'\]\s*(.*?)\((\d+)\)', text_data or "")
+    if not items: items = re.findall(r'(.*?)\((\d+)\)', text_data or "")
+    return [(name.strip(), int(qty)) for name, qty in items]
+
+def logi_build_task_items(tasks):
+    """(task_id, order_id, category, product_details) 목록 -> DeliveryTaskItem 행 목록
+    주문 품목 테이블에 행이 있으면 그대로, 없는 구주문만 문자열 파싱"""
+    merged, found = {}, set()
+    by_key = {(order_id, cat): tid for tid, order_id, cat, _ in tasks}
+
+    def add(tid, cat, name, qty):  # 작업당 상품명 1행 (같은 상품이 여러 줄이면 수량 합산)
+        row = merged.setdefault((tid, name), dict(task_id=tid, category=cat or "기타", name=name, qty=0))
+        row['qty'] += int(qty or 0)
+
+    for order_id, cat, name, qty in logi_fetch_order_items([t[1] for t in tasks]):
+        tid = by_key.get((order_id, cat))
+        if tid is None: continue
+        found.add(tid)
+        add(tid, cat, name, qty)
+    for tid, order_id, cat, details in tasks:
+        if tid in found: continue
+        for name, qty in logi_parse_items(details): add(tid, cat, name, qty)
+    return list(merged.values())
+
+def logi_save_task_items(tasks):
+    """품목 행 저장, (task_id, 상품명) 유니크라 같은 작업을 다시 처리해도 합계가 늘지 않음"""
+    rows = logi_build_task_items(tasks)
+    if not rows: return 0
+    return db_delivery.session.execute(insert(DeliveryTaskItem.__table__).prefix_with('OR IGNORE'), rows).rowcount
+
+def logi_ensure_task_item_unique():
+    """기존 delivery_task_item 에 (task_id, 상품명) 유니크 인덱스 추가
+    같은 상품명이 여러 행인 작업은 행을 지우고 주문 데이터로 품목을 다시 만들어 수량 합계를 보존합니다."""
+    bind = {'bind': db_delivery.engines['delivery']}
+    exists = text("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'uq_delivery_task_item_name'")
+    if db_delivery.session.execute(exists, bind_arguments=bind).first(): return 0
+    logi_lock_delivery_db()
+    if db_delivery.session.execute(exists, bind_arguments=bind).first():  # 대기하는 동안 다른 워커가 완료
+        db_delivery.session.rollback()
+        return 0
+    dup_ids = [r[0] for r in db_delivery.session.execute(text('SELECT DISTINCT task_id FROM delivery_task_item GROUP BY task_id, name HAVING COUNT(*) > 1'), bind_arguments=bind)]
+    if dup_ids: DeliveryTaskItem.query.filter(DeliveryTaskItem.task_id.in_(dup_ids)).delete(synchronize_session=False)
+    db_delivery.session.execute(text('CREATE UNIQUE INDEX uq_delivery_task_item_name ON delivery_task_item (task_id, name)'), bind_arguments=bind)
+    for i in range(0, len(dup_ids), 500):
+        tasks = db_delivery.session.query(DeliveryTask.id, DeliveryTask.order_id, DeliveryTask.category, DeliveryTask.product_details) \
+            .filter(DeliveryTask.id.in_(dup_ids[i:i + 500])).all()
+        logi_save_task_items([tuple(t) for t in tasks])
+    db_delivery.session.commit()
+    if dup_ids: print(f"✅ 배송 작업 품목 중복 행 재생성: {len(dup_ids)}건")
+    return len(dup_ids)
+
+def logi_group_task_items(task_ids):
+    """작업 목록(id 리스트 또는 select 서브쿼리)의 품목을 카테고리 > 상품명 > 수량으로 합산 (SUM GROUP BY 1회)"""
+    grouped = {}
+    rows = db_delivery.session.query(DeliveryTaskItem.category, DeliveryTaskItem.name, func.sum(DeliveryTaskItem.qty)) \
+        .filter(DeliveryTaskItem.task_id.in_(task_ids)).group_by(DeliveryTaskItem.category, DeliveryTaskItem.name) \
+        .order_by(DeliveryTaskItem.category, DeliveryTaskItem.name)
+    for cat, name, qty in rows:
+        grouped.setdefault(cat, {})[name] = int(qty or 0)
+    return grouped
+
+def logi_get_item_summary(task_ids):
+    rows = db_delivery.session.query(DeliveryTaskItem.name, func.sum(DeliveryTaskItem.qty)) \
+        .filter(DeliveryTaskItem.task_id.in_(task_ids)).group_by(DeliveryTaskItem.name).order_by(DeliveryTaskItem.name)
+    return {name: int(qty or 0) for name, qty in rows}
+
+def logi_backfill_task_items(batch_size=500):
+    """품목 테이블 도입 전 작업의 품목 행 생성 (완료 표시 행으로 한 번만 실행, 쓰기 잠금 안에서 한 트랜잭션으로)"""
+    if LogiSyncState.query.filter_by(name='task_items_backfill').first(): return 0
+    logi_lock_delivery_db()
+    if LogiSyncState.query.filter_by(name='task_items_backfill').first():  # 대기하는 동안 다른 워커가 완료
+        db_delivery.session.rollback()
+        return 0
+    last_id, filled = 0, 0
+    while True:
+        tasks = db_delivery.session.query(DeliveryTask.id, DeliveryTask.order_id, DeliveryTask.category, DeliveryTask.product_details) \
+            .filter(DeliveryTask.id > last_id, ~DeliveryTask.id.in_(select(DeliveryTaskItem.task_id))) \
+            .order_by(DeliveryTask.id).limit(batch_size).all()
+        if not tasks: break
+        filled += logi_save_task_items([tuple(t) for t in tasks])
+        last_id = tasks[-1].id
+    db_delivery.session.add(LogiSyncState(name='task_items_backfill', last_run_at=datetime.now(), last_count=filled))
+    db_delivery.session.commit()
+    if filled: print(f"✅ 배송 작업 품목 행 생성: {filled}건")
+    return filled
 
-def logi_get_main_db_path():
-    # app.py와 같은 레벨의 instance 폴더 내 DB 경로를 정확히 반환
-    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'direct_trade_mall.db')
+# --------------------------------------------------------------------------------
+# 배송 완료 사진 파일 저장 (DB 에는 파일명만 기록)
+# --------------------------------------------------------------------------------
+PROOF_PHOTO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'proof_photos')
+PROOF_PHOTO_MAX = 1600  # 원본 긴 변 최대 px
+PROOF_THUMB_MAX = 320   # 썸네일 긴 변 최대 px
+
+def logi_save_proof_photo(task, data_url):
+    """캔버스 base64 데이터 URL -> WebP 원본/썸네일 저장 후 파일명 반환"""
+    if not data_url: return None
+    raw = base64.b64decode(data_url.split(',', 1)[1] if data_url.startswith('data:') else data_url)
+    img = ImageOps.exif_transpose(Image.open(BytesIO(raw))).convert('RGB')
+    os.makedirs(PROOF_PHOTO_DIR, exist_ok=True)
+    safe_order = re.sub(r'[^\w-]', '', task.order_id or '')
+    filename = f"proof_{safe_order}_{task.id}_{datetime.now().strftime('%Y%m%d%H%M%S%f')}.webp"
+
+    full = img.copy(); full.thumbnail((PROOF_PHOTO_MAX, PROOF_PHOTO_MAX), Image.Resampling.LANCZOS)
+    full.save(os.path.join(PROOF_PHOTO_DIR, filename), "WEBP", quality=80)
+    img.thumbnail((PROOF_THUMB_MAX, PROOF_THUMB_MAX), Image.Resampling.LANCZOS)
+    img.save(os.path.join(PROOF_PHOTO_DIR, logi_proof_thumb_name(filename)), "WEBP", quality=70)
+    return filename
+
+def logi_proof_thumb_name(filename):
+    return filename[:-len('.webp')] + '_thumb.webp'
+
+PROOF_MIGRATE_LEASE_SECONDS = 300
+
+def logi_migrate_proof_photos(batch_size=50):
+    """DB 에 base64 로 저장된 사진(과거 데이터, 완료 처리 중 파일 저장 실패분)을 파일로 옮기고 photo_data 비우기
+    변환에 실패한 행은 그대로 두어 다음 시작 시 다시 시도합니다.
+    변환은 쓰기 잠금 없이 하므로 'proof_photos' 임대를 잡은 워커 하나만 실행하고(배치마다 연장),
+    파일명은 아직 비어 있는 행에만 조건부 UPDATE 로 기록해 다른 워커가 먼저 채운 행이면 만든 파일을 지웁니다."""
+    pending = lambda last_id: DeliveryTask.query.filter(DeliveryTask.id > last_id, DeliveryTask.photo_data != None, or_(DeliveryTask.photo_path == None, DeliveryTask.photo_path == ''))
+    if not db_delivery.session.query(pending(0).exists()).scalar(): return 0
+    table, owner = DeliveryTask.__table__, f"{socket.gethostname()}:{os.getpid()}:photos"
+    moved, last_id = 0, 0
+    try:
+        while logi_acquire_sync_lease(owner, PROOF_MIGRATE_LEASE_SECONDS, name='proof_photos'):
+            tasks = pending(last_id).order_by(DeliveryTask.id).limit(batch_size).all()
+            if not tasks: break
+            last_id = tasks[-1].id
+            for t in tasks:
+                try:
+                    filename = logi_save_proof_photo(t, t.photo_data)
+                except Exception as e:
+                    print(f"⚠️ [Proof Photo] task {t.id} 변환 실패 (다음 실행 시 재시도): {e}")
+                    continue
+                saved = db_delivery.session.execute(update(table).where(table.c.id == t.id, or_(table.c.photo_path == None, table.c.photo_path == ''))
+                                                    .values(photo_path=filename, photo_data=None)).rowcount
+                db_delivery.session.commit()  # 행마다 commit (변환하는 동안 쓰기 잠금을 잡고 있지 않도록)
+                if saved:
+                    moved += 1
+                else:
+                    for name in (filename, logi_proof_thumb_name(filename)):
+                        try: os.remove(os.path.join(PROOF_PHOTO_DIR, name))
+                        except OSError: pass
+    finally:
+        logi_release_sync_lease(owner, 'proof_photos')
+    return moved
+
+# --------------------------------------------------------------------------------
+# 배송 DB(delivery bind) 스키마 보정 및 메인 DB 데이터 이관
+# --------------------------------------------------------------------------------
+# 배송 모델은 delivery.db 에만 기록해 쇼핑몰 주문/장바구니 쓰기와 SQLite 쓰기 잠금을 나누어 씁니다.
+# 이전 버전이 메인 DB 에 남긴 배송 데이터는 최초 1회 delivery.db 로 복사합니다 (메인 DB 원본은 보존).
+DELIVERY_ALTER_QUERIES = ['ALTER TABLE delivery_task ADD COLUMN photo_path VARCHAR(300)',
+                          'ALTER TABLE delivery_task ADD COLUMN item_qty INTEGER',
+                          'CREATE INDEX IF NOT EXISTS ix_delivery_task_board ON delivery_task (address, item_qty, id)',
+                          'ALTER TABLE logi_sync_state ADD COLUMN last_duration_ms INTEGER',
+                          'ALTER TABLE logi_sync_state ADD COLUMN last_error VARCHAR(500)',
+                          'ALTER TABLE logi_sync_state ADD COLUMN lease_owner VARCHAR(100)',
+                          'ALTER TABLE logi_sync_state ADD COLUMN lease_until DATETIME']
+
+def logi_init_storage():
+    engine = db_delivery.engines['delivery']
+    for q in DELIVERY_ALTER_QUERIES:
+        try:
+            with engine.begin() as conn: conn.execute(text(q))
+        except Exception:
+            pass  # 이미 있는 컬럼
+    moved = logi_migrate_to_delivery_bind()
+    logi_backfill_item_qty()
+    logi_ensure_task_item_unique()
+    logi_backfill_task_items()
+    return moved
+
+def logi_backfill_item_qty(batch_size=500):
+    """item_qty 컬럼 추가 전 작업의 수량 및 빈 주소 채우기 (한 번만 실행되면 이후에는 대상 없음)
+    기존 DB 는 ALTER 로 NOT NULL 을 걸 수 없어, 목록 정렬 컬럼에 NULL 이 남지 않도록 여기서 보정합니다."""
+    filled = db_delivery.session.execute(update(DeliveryTask.__table__).where(DeliveryTask.__table__.c.address == None).values(address='')).rowcount
+    db_delivery.session.commit()
+    while True:
+        rows = db_delivery.session.query(DeliveryTask.id, DeliveryTask.product_details).filter(DeliveryTask.item_qty == None).limit(batch_size).all()
+        if not rows: break
+        db_delivery.session.execute(update(DeliveryTask.__table__).where(DeliveryTask.__table__.c.id == bindparam('tid')).values(item_qty=bindparam('qty')),
+                                    [{"tid": r.id, "qty": logi_extract_qty(r.product_details or "")} for r in rows])
+        db_delivery.session.commit()
+        filled += len(rows)
+    if filled: print(f"✅ 배송 작업 수량 컬럼 채움: {filled}건")
+    return filled
+
+def _logi_copy_rows(main_conn, table, key_cols, remap=None):
+    """메인 DB 테이블 행을 delivery 테이블로 복사 (key_cols 가 같은 행이 이미 있으면 delivery 쪽을 그대로 두고 건너뜀, id 는 새로 발급)
+    remap 에 없는 참조 id 는 다른 행을 가리키지 않도록 NULL 로 둡니다. 반환: {메인 id: delivery id}"""
+    main_cols = {c['name'] for c in inspect(main_conn).get_columns(table.name)}
+    cols = [c.name for c in table.columns if c.name in main_cols and c.name != 'id']
+    stmt = text(f'SELECT id, {", ".join(cols)} FROM {table.name}').columns(column('id', Integer), *[column(c, table.c[c].type) for c in cols])
+    rows = main_conn.execute(stmt).mappings().all()
+    # Core SELECT 는 bind 자동 선택이 되지 않으므로 delivery 엔진을 명시
+    existing = {tuple(r[1:]): r[0] for r in db_delivery.session.execute(select(table.c.id, *[table.c[k] for k in key_cols]), bind_arguments={'bind': db_delivery.engines['delivery']})}
+    mapping = {}
+    for r in rows:
+        values = {c: r[c] for c in cols}
+        for c in cols:  # 예전 DB 의 NULL 은 NOT NULL 컬럼 기본값으로
+            if values[c] is None and not table.c[c].nullable and table.c[c].default is not None: values[c] = table.c[c].default.arg
+        for col, ref in (remap or {}).items():
+            if values.get(col) is not None: values[col] = ref.get(values[col])
+        key = tuple(values.get(k) for k in key_cols)
+        if key not in existing:
+            existing[key] = db_delivery.session.execute(insert(table).values(**values)).inserted_primary_key[0]
+        mapping[r['id']] = existing[key]
+    return mapping
+
+def logi_lock_delivery_db():
+    """delivery DB 쓰기 잠금 (BEGIN IMMEDIATE, 다음 commit/rollback 까지 유지)
+    워커 여러 개가 동시에 시작해도 1회성 이관은 한 워커만 실행하고, 나머지는 여기서 대기 후 완료 여부를 다시 확인합니다."""
+    db_delivery.session.commit()
+    db_delivery.session.execute(text('BEGIN IMMEDIATE'), bind_arguments={'bind': db_delivery.engines['delivery']})
+
+def logi_migrate_to_delivery_bind():
+    main_engine, delivery_engine = db_delivery.engines[None], db_delivery.engines['delivery']
+    if str(main_engine.url) == str(delivery_engine.url): return 0
+    if LogiSyncState.query.filter_by(name='bind_migration').first(): return 0
+    logi_lock_delivery_db()
+    if LogiSyncState.query.filter_by(name='bind_migration').first():  # 대기하는 동안 다른 워커가 이관 완료
+        db_delivery.session.rollback()
+        return 0
+
+    moved = 0
+    with main_engine.connect() as main_conn:
+        main_tables = set(inspect(main_conn).get_table_names())
+        if 'delivery_task' in main_tables:
+            driver_map = _logi_copy_rows(main_conn, Driver.__table__, ['name', 'phone']) if 'driver' in main_tables else {}
+            if 'admin_user' in main_tables: _logi_copy_rows(main_conn, AdminUser.__table__, ['username'])
+            task_map = _logi_copy_rows(main_conn, DeliveryTask.__table__, ['order_id', 'category'], remap={'driver_id': driver_map})
+            # 이력은 고유 키가 없어 (작업, 상태, 시각, 내용)이 같으면 이미 있는 이력으로 보고 건너뜀
+            if 'delivery_log' in main_tables: _logi_copy_rows(main_conn, DeliveryLog.__table__, ['task_id', 'status', 'created_at', 'message'], remap={'task_id': task_map})
+            if 'logi_sync_state' in main_tables: _logi_copy_rows(main_conn, LogiSyncState.__table__, ['name'])
+            moved = len(task_map)
+    db_delivery.session.add(LogiSyncState(name='bind_migration', last_run_at=datetime.now(), last_count=moved))
+    db_delivery.session.commit()
+    return moved
+
+# --------------------------------------------------------------------------------
+# 쇼핑몰 주문 조회 (앱과 같은 SQLAlchemy 기본 엔진/커넥션 풀 사용)
+# --------------------------------------------------------------------------------
+logi_cache = LocalCache(default_ttl=5)
+
+SYNC_ORDER_COLUMNS = 'order_id, status, customer_name, customer_phone, delivery_address, request_memo, product_details, updated_at'
+
+def logi_count_pending_orders():
+    try:
+        return db_delivery.session.execute(text('SELECT COUNT(*) FROM "order" WHERE status = \'배송요청\'')).scalar() or 0
+    except Exception:
+        db_delivery.session.rollback()
+        return 0
+
+# updated_at 은 commit 이 아니라 flush 시각이라, 워터마크가 앞서 간 뒤에 늦게 commit 된 주문이 있을 수 있습니다.
+# 가장 긴 쓰기 트랜잭션보다 넉넉한 구간을 겹쳐 다시 읽습니다 (작업 생성/취소 반영은 멱등).
+SYNC_WATERMARK_OVERLAP = timedelta(minutes=5)
+
+def logi_fetch_changed_orders(since=None):
+    """워터마크(겹침 구간 포함) 이후 변경된 배송요청/결제취소 주문 (since 가 없으면 전체)"""
+    sql = f'SELECT {SYNC_ORDER_COLUMNS} FROM "order" WHERE status IN (\'배송요청\', \'결제취소\')'
+    if since: sql += ' AND updated_at >= :since'
+    stmt = text(sql).columns(updated_at=DateTime)
+    if since: stmt = stmt.bindparams(bindparam('since', type_=DateTime))
+    return db_delivery.session.execute(stmt, {"since": since - SYNC_WATERMARK_OVERLAP} if since else {}).mappings().all()
+
+# --------------------------------------------------------------------------------
+# 관제 현황판 집계 (상태별 건수 GROUP BY 1회 + 카테고리 DISTINCT, 짧은 TTL 캐시)
+# --------------------------------------------------------------------------------
+# 배송 작업이 변경되어 commit 되면 캐시를 바로 비우므로 TTL 은 다른 워커용 안전장치입니다.
+DASHBOARD_STATS_TTL = 30
+LogiDashboardStats = namedtuple('LogiDashboardStats', 'unassigned assigned picking complete_today categories')
+
+def logi_load_dashboard_stats():
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    unassigned = case((and_(DeliveryTask.status == '대기', DeliveryTask.driver_id == None), 1), else_=0)
+    done_today = case((and_(DeliveryTask.status == '완료', DeliveryTask.completed_at >= today), 1), else_=0)
+    counts = {'unassigned': 0, 'complete_today': 0}
+    rows = db_delivery.session.query(DeliveryTask.status, func.count(DeliveryTask.id), func.sum(unassigned), func.sum(done_today)).group_by(DeliveryTask.status)
+    for status, cnt, unassigned_cnt, done_cnt in rows:
+        counts[status] = cnt
+        counts['unassigned'] += unassigned_cnt or 0
+        counts['complete_today'] += done_cnt or 0
+    categories = sorted(c for (c,) in db_delivery.session.query(DeliveryTask.category).distinct() if c)
+    return LogiDashboardStats(counts['unassigned'], counts.get('배정완료', 0), counts.get('픽업', 0), counts['complete_today'], categories)
+
+def logi_get_dashboard_stats():
+    return logi_cache.get(f"dashboard_stats:{datetime.now():%Y%m%d}", logi_load_dashboard_stats, ttl=DASHBOARD_STATS_TTL)
+
+def logi_invalidate_dashboard_stats():
+    logi_cache.invalidate(f"dashboard_stats:{datetime.now():%Y%m%d}", f"picking:{get_kst():%Y-%m-%d}")
+
+# 작업이 바뀐 트랜잭션을 표시해두었다가 commit 이 끝나면 캐시 무효화
+@event.listens_for(db_delivery.session, 'before_flush')
+def _logi_mark_task_changes(session, flush_context, instances):
+    if any(isinstance(o, DeliveryTask) for o in (*session.new, *session.dirty, *session.deleted)):
+        session.info['logi_tasks_changed'] = True
+
+@event.listens_for(db_delivery.session, 'do_orm_execute')
+def _logi_mark_task_bulk_changes(state):
+    if (state.is_insert or state.is_update or state.is_delete) and getattr(getattr(state.statement, 'table', None), 'name', None) == DeliveryTask.__table__.name:
+        state.session.info['logi_tasks_changed'] = True
+
+@event.listens_for(db_delivery.session, 'after_commit')
+def _logi_invalidate_on_commit(session):
+    if session.info.pop('logi_tasks_changed', False): logi_invalidate_dashboard_stats()
+
+@event.listens_for(db_delivery.session, 'after_soft_rollback')
+def _logi_clear_task_changes(session, previous_transaction):
+    session.info.pop('logi_tasks_changed', None)
 
 # --------------------------------------------------------------------------------
 # 5. 관리자 보안 라우트 (로그인/로그아웃)
@@ -156,6 +537,93 @@ def logi_admin_logout():
 # 6. 관리자 메인 대시보드 (복구된 모든 필터링 및 숫자 현황판)
 # --------------------------------------------------------------------------------
 
+# 목록은 주소 > 수량 역순 (같은 값은 id 역순), 키셋 커서로 페이지를 넘깁니다.
+TASK_PAGE_SIZE = 100
+
+LOGI_TASK_ROWS_HTML = """
+                        {% for t in tasks %}
+                        <tr class="{% if t.status == '결제취소' %}bg-red-50{% endif %} hover:bg-slate-50 transition">
+                            <td class="py-3 px-2 text-center w-8">
+                                <input type="checkbox" class="task-check w-4 h-4 rounded border-slate-300 accent-green-600" value="{{t.id}}" data-category="{{ t.category }}">
+                            </td>
+                            <td class="py-3 px-1 text-center w-16 text-center">
+                                <span class="inline-block px-2 py-0.5 rounded-full text-[8px] font-black shadow-sm transform scale-95
+                                {% if t.status == '픽업' %}bg-orange-500 text-white
+                                {% elif t.status == '완료' %}bg-green-600 text-white
+                                {% elif t.status == '배정완료' %}bg-blue-500 text-white
+                                {% else %}bg-slate-200 text-slate-500{% endif %}">
+                                    {{ t.status }}
+                                </span>
+                            </td>
+                            <td class="py-3 px-2">
+                                <div class="font-black text-slate-800 text-[14px] leading-tight mb-0.5 break-keep">{{ t.address }}</div>
+                                <div class="text-[10px] text-slate-400 font-bold mb-1 line-clamp-1">
+                                    {{ t.product_details }} | <span class="text-orange-400">{{ t.customer_name }}</span>
+                                </div>
+                                <div class="flex gap-2 items-center">
+                                    <span class="text-[9px] bg-slate-100 px-1.5 py-0.5 rounded text-slate-500 font-black border border-slate-200">
+                                        <i class="fas fa-truck mr-0.5 text-slate-300"></i>{{ t.driver_name }}
+                                    </span>
+                                   <div class="flex gap-3 items-center">
+    <button onclick="viewTaskLog('{{t.id}}')" class="text-[9px] text-blue-500 font-black flex items-center gap-0.5">
+        <i class="fas fa-history"></i> Log보기
+    </button>
+    
+    {% if t.photo_path or t.has_photo_data %}
+    <button onclick="viewPhoto('{{t.id}}')" class="text-[9px] text-green-600 font-black flex items-center gap-0.5">
+        <i class="fas fa-camera"></i> 사진보기
+    </button>
+    {% endif %}
+</div>
+                                    </button>
+                                </div>
+                                <div id="log-view-{{t.id}}" class="hidden mt-2 p-3 bg-slate-50 rounded-xl text-[9px] text-slate-500 border border-dashed border-slate-200 leading-normal"></div>
+                            </td>
+                            <td class="py-3 px-2 text-right">
+                                <a href="{{ url_for('logi.logi_cancel_assignment', tid=t.id) }}" class="inline-block text-[10px] bg-slate-800 text-white px-2.5 py-1.5 rounded-lg font-black shadow-sm active:scale-90 transition-transform whitespace-nowrap" onclick="return confirm('배정을 해제할까요?')">재배정</a>
+                            </td>
+                        </tr>
+                        {% endfor %}
+"""
+
+def logi_encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(',', ':')).encode()).decode().rstrip('=')
+
+def logi_decode_cursor(cursor):
+    """[주소(str), 수량(int), id(int)] 가 아니면 None (첫 페이지)"""
+    if not cursor: return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        return None
+    if not (isinstance(key, list) and len(key) == 3 and isinstance(key[0], str)
+            and all(isinstance(v, int) and not isinstance(v, bool) for v in key[1:])): return None
+    return key
+
+def logi_filter_tasks(query, st_filter='all', cat_filter='전체', q=''):
+    if st_filter == '미배정': query = query.filter(DeliveryTask.status == '대기', DeliveryTask.driver_id == None)
+    elif st_filter == '배정완료': query = query.filter(DeliveryTask.status == '배정완료')
+    elif st_filter != 'all': query = query.filter(DeliveryTask.status == st_filter)
+    
+    if cat_filter != '전체': query = query.filter(DeliveryTask.category == cat_filter)
+    if q: query = query.filter((DeliveryTask.address.contains(q)) | (DeliveryTask.customer_name.contains(q)))
+    return query
+
+def logi_fetch_task_page(st_filter='all', cat_filter='전체', q='', cursor=None, per_page=TASK_PAGE_SIZE):
+    """필터 조건의 작업 한 페이지와 다음 커서 반환 (정렬은 DB 에서 처리)
+    정렬/커서 비교는 ix_delivery_task_board 와 같은 원본 컬럼으로 해야 인덱스 순서대로 읽고 임시 정렬을 하지 않습니다."""
+    query = logi_filter_tasks(DeliveryTask.query, st_filter, cat_filter, q)
+    key = logi_decode_cursor(cursor)
+    if key:
+        query = query.filter(tuple_(DeliveryTask.address, DeliveryTask.item_qty, DeliveryTask.id) < tuple_(*key))
+    tasks = query.order_by(DeliveryTask.address.desc(), DeliveryTask.item_qty.desc(), DeliveryTask.id.desc()).limit(per_page + 1).all()
+    next_cursor = None
+    if len(tasks) > per_page:
+        tasks = tasks[:per_page]
+        last = tasks[-1]
+        next_cursor = logi_encode_cursor([last.address, last.item_qty, last.id])
+    return tasks, next_cursor
+
 @logi_bp.route('/')
 def logi_admin_dashboard():
     if not session.get('admin_logged_in'): return redirect(url_for('logi.logi_admin_login'))
@@ -164,35 +632,17 @@ def logi_admin_dashboard():
     cat_filter = request.args.get('category', '전체')
     q = request.args.get('q', '')
 
-    query = DeliveryTask.query
-    if st_filter == '미배정': query = query.filter(DeliveryTask.status == '대기', DeliveryTask.driver_id == None)
-    elif st_filter == '배정완료': query = query.filter(DeliveryTask.status == '배정완료')
-    elif st_filter != 'all': query = query.filter_by(status=st_filter)
-    
-    if cat_filter != '전체': query = query.filter_by(category=cat_filter)
-    if q: query = query.filter((DeliveryTask.address.contains(q)) | (DeliveryTask.customer_name.contains(q)))
-    
-    tasks = query.all()
-    tasks.sort(key=lambda x: (x.address or "", logi_extract_qty(x.product_details)), reverse=True)
+    tasks, next_cursor = logi_fetch_task_page(st_filter, cat_filter, q)
 
     # 현황판 수치 계산
-    pending_sync_count = 0
-    try:
-        conn = sqlite3.connect(logi_get_main_db_path())
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM \"order\" WHERE status = '배송요청'")
-        pending_sync_count = cursor.fetchone()[0]
-        conn.close()
-    except: pass
-
-    unassigned_count = DeliveryTask.query.filter(DeliveryTask.status == '대기', DeliveryTask.driver_id == None).count()
-    assigned_count = DeliveryTask.query.filter_by(status='배정완료').count()
-    picking_count = DeliveryTask.query.filter_by(status='픽업').count()
-    complete_today = DeliveryTask.query.filter_by(status='완료').filter(DeliveryTask.completed_at >= datetime.now().replace(hour=0,minute=0,second=0)).count()
-
-    item_sum = logi_get_item_summary(tasks)
+    pending_sync_count = logi_cache.get('pending_sync_count', logi_count_pending_orders, ttl=5)
+    sync_state = LogiSyncState.query.filter_by(name='orders').first()
+
+    stats = logi_get_dashboard_stats()
+    unassigned_count, assigned_count, picking_count, complete_today = stats.unassigned, stats.assigned, stats.picking, stats.complete_today
+
     drivers = Driver.query.all()
-    saved_cats = sorted(list(set([t.category for t in DeliveryTask.query.all() if t.category])))
+    saved_cats = stats.categories
 
     html = """
     <!DOCTYPE html>
@@ -235,6 +685,12 @@ def logi_admin_dashboard():
                 <div class="bg-white p-3 rounded-2xl shadow-sm border border-red-100 text-center">
                     <p class="text-[9px] font-black text-red-400 mb-0.5 uppercase">신규 주문</p>
                     <p class="text-xl font-black text-red-600" id="sync-count-val">{{pending_sync_count}}</p>
+                    {% if sync_state and sync_state.last_run_at %}
+                    <p class="text-[8px] font-bold mt-0.5 {% if sync_state.last_error %}text-red-400{% else %}text-slate-300{% endif %}" title="{{ sync_state.last_error or '' }}">
+                        {% if sync_interval > 0 %}자동 {{ sync_interval }}초 · {% endif %}{{ sync_state.last_run_at.strftime('%H:%M:%S') }}
+                        {% if sync_state.last_error %}실패{% else %}{{ sync_state.last_count or 0 }}건 · {{ sync_state.last_duration_ms or 0 }}ms{% endif %}
+                    </p>
+                    {% endif %}
                 </div>
                 <div class="bg-white p-3 rounded-2xl shadow-sm border border-slate-100 text-center">
                     <p class="text-[9px] font-black text-slate-400 mb-0.5 uppercase">배정 대기</p>
@@ -255,7 +711,10 @@ def logi_admin_dashboard():
             </div> 
 
             <div class="bg-white p-5 rounded-[2rem] border border-blue-50 shadow-sm mb-6">
-                <h3 class="text-[11px] font-black text-blue-500 mb-4 italic flex items-center gap-2"><span class="w-1.5 h-4 bg-blue-500 rounded-full"></span> 카테고리별 품목 합계 및 전체선택</h3>
+                <div class="flex items-center justify-between mb-4">
+                    <h3 class="text-[11px] font-black text-blue-500 italic flex items-center gap-2"><span class="w-1.5 h-4 bg-blue-500 rounded-full"></span> 카테고리별 품목 합계 및 전체선택</h3>
+                    <a href="{{ url_for('logi.logi_picking_export') }}" class="text-[10px] bg-blue-50 text-blue-600 px-3 py-1.5 rounded-lg font-black border border-blue-100 hover:bg-blue-100 transition"><i class="fas fa-file-excel mr-1"></i>오늘 입고 피킹리스트</a>
+                </div>
                 <div class="space-y-4">
                     {% for cat_n, items in item_sum_grouped.items() %}
                     <div class="border-b border-slate-50 pb-3 last:border-0">
@@ -311,51 +770,12 @@ def logi_admin_dashboard():
                         </tr>
                     </thead>
                     <tbody class="divide-y divide-slate-100 bg-white">
-                        {% for t in tasks %}
-                        <tr class="{% if t.status == '결제취소' %}bg-red-50{% endif %} hover:bg-slate-50 transition">
-                            <td class="py-3 px-2 text-center w-8">
-                                <input type="checkbox" class="task-check w-4 h-4 rounded border-slate-300 accent-green-600" value="{{t.id}}" data-category="{{ t.category }}">
-                            </td>
-                            <td class="py-3 px-1 text-center w-16 text-center">
-                                <span class="inline-block px-2 py-0.5 rounded-full text-[8px] font-black shadow-sm transform scale-95
-                                {% if t.status == '픽업' %}bg-orange-500 text-white
-                                {% elif t.status == '완료' %}bg-green-600 text-white
-                                {% elif t.status == '배정완료' %}bg-blue-500 text-white
-                                {% else %}bg-slate-200 text-slate-500{% endif %}">
-                                    {{ t.status }}
-                                </span>
-                            </td>
-                            <td class="py-3 px-2">
-                                <div class="font-black text-slate-800 text-[14px] leading-tight mb-0.5 break-keep">{{ t.address }}</div>
-                                <div class="text-[10px] text-slate-400 font-bold mb-1 line-clamp-1">
-                                    {{ t.product_details }} | <span class="text-orange-400">{{ t.customer_name }}</span>
-                                </div>
-                                <div class="flex gap-2 items-center">
-                                    <span class="text-[9px] bg-slate-100 px-1.5 py-0.5 rounded text-slate-500 font-black border border-slate-200">
-                                        <i class="fas fa-truck mr-0.5 text-slate-300"></i>{{ t.driver_name }}
-                                    </span>
-                                   <div class="flex gap-3 items-center">
-    <button onclick="viewTaskLog('{{t.id}}')" class="text-[9px] text-blue-500 font-black flex items-center gap-0.5">
-        <i class="fas fa-history"></i> Log보기
-    </button>
-    
-    {% if t.photo_data %}
-    <button onclick="viewPhoto('{{t.id}}')" class="text-[9px] text-green-600 font-black flex items-center gap-0.5">
-        <i class="fas fa-camera"></i> 사진보기
-    </button>
-    {% endif %}
-</div>
-                                    </button>
-                                </div>
-                                <div id="log-view-{{t.id}}" class="hidden mt-2 p-3 bg-slate-50 rounded-xl text-[9px] text-slate-500 border border-dashed border-slate-200 leading-normal"></div>
-                            </td>
-                            <td class="py-3 px-2 text-right">
-                                <a href="{{ url_for('logi.logi_cancel_assignment', tid=t.id) }}" class="inline-block text-[10px] bg-slate-800 text-white px-2.5 py-1.5 rounded-lg font-black shadow-sm active:scale-90 transition-transform whitespace-nowrap" onclick="return confirm('배정을 해제할까요?')">재배정</a>
-                            </td>
-                        </tr>
-                        {% endfor %}
+""" + LOGI_TASK_ROWS_HTML + """
                     </tbody>
                 </table>
+                <div id="task-more" class="p-4 text-center {% if not next_cursor %}hidden{% endif %}">
+                    <button onclick="loadMoreTasks()" id="task-more-btn" class="bg-slate-100 text-slate-500 px-6 py-2 rounded-xl font-black text-[11px] hover:bg-slate-200 transition">다음 {{ page_size }}건 더보기</button>
+                </div>
             </div>
         </main>
 
@@ -374,6 +794,21 @@ def logi_admin_dashboard():
                 checkboxes.forEach(cb => { cb.checked = master.checked; });
             }
 
+            let taskCursor = {{ next_cursor|tojson }};
+            async function loadMoreTasks() {
+                if(!taskCursor) return;
+                const btn = document.getElementById('task-more-btn');
+                btn.disabled = true;
+                try {
+                    const params = new URLSearchParams({status: {{ current_status|tojson }}, category: {{ current_cat|tojson }}, q: {{ current_q|tojson }}, cursor: taskCursor});
+                    const res = await fetch('{{ url_for("logi.logi_api_tasks") }}?' + params);
+                    const data = await res.json();
+                    document.querySelector('table tbody').insertAdjacentHTML('beforeend', data.html);
+                    taskCursor = data.next_cursor;
+                    if(!taskCursor) document.getElementById('task-more').classList.add('hidden');
+                } finally { btn.disabled = false; }
+            }
+
             function toggleAll() {
                 const masterChecked = document.getElementById('check-all').checked;
                 const checkboxes = document.querySelectorAll('.task-check');
@@ -429,7 +864,7 @@ def logi_admin_dashboard():
                     body: JSON.stringify(payload) 
                 });
                 const result = await res.json();
-                if(result.success) { alert("처리가 완료되었습니다."); location.reload(); }
+                if(result.success) { alert(`처리가 완료되었습니다. (${result.updated}건 처리` + (result.skipped ? `, 완료건 ${result.skipped}건 제외)` : ')')); location.reload(); }
                 else { alert("오류 발생: " + result.error); }
             }
         </script>
@@ -523,21 +958,17 @@ function closePhoto() {
     </html>
     """
 
-    # [핵심] 카테고리별 요약을 위해 데이터 가공 추가
-    item_sum_grouped = {}
-    for t in tasks:
-        cat = t.category or "기타"
-        if cat not in item_sum_grouped: item_sum_grouped[cat] = {}
-        items = re.findall(r'\]\s*(.*?)\((\d+)\)', t.product_details)
-        if not items: items = re.findall(r'(.*?)\((\d+)\)', t.product_details)
-        for name, qty in items:
-            name = name.strip()
-            item_sum_grouped[cat][name] = item_sum_grouped[cat].get(name, 0) + int(qty)
+    # [핵심] 카테고리별 요약 (현재 페이지가 아닌 필터 전체 기준, 품목 테이블 SUM GROUP BY)
+    item_sum_grouped = logi_group_task_items(logi_filter_tasks(select(DeliveryTask.id), st_filter, cat_filter, q))
 
    # 함수 내에서 정의된 모든 변수(tasks, item_sum_grouped 등)가 자동으로 전달됩니다.
     return render_template_string(html, 
                             tasks=tasks,
+                            next_cursor=next_cursor,
+                            page_size=TASK_PAGE_SIZE,
                             pending_sync_count=pending_sync_count,
+                            sync_state=sync_state,
+                            sync_interval=LOGI_SYNC_INTERVAL,
                             unassigned_count=unassigned_count,
                             assigned_count=assigned_count,
                             picking_count=picking_count,
@@ -546,7 +977,54 @@ function closePhoto() {
                             saved_cats=saved_cats,
                             item_sum_grouped=item_sum_grouped,
                             current_status=st_filter, 
-                            current_cat=cat_filter)
+                            current_cat=cat_filter,
+                            current_q=q)
+
+# --------------------------------------------------------------------------------
+# 일자별 피킹리스트 엑셀 (해당 일자 입고 작업의 품목 합계, 결과 파일은 짧게 캐시)
+# --------------------------------------------------------------------------------
+PICKING_EXPORT_TTL = 300
+
+def logi_build_picking_excel(day):
+    start = datetime.strptime(day, '%Y-%m-%d')
+    received = select(DeliveryLog.task_id).where(DeliveryLog.status == '입고', DeliveryLog.created_at >= start, DeliveryLog.created_at < start + timedelta(days=1))
+    task_ids = select(DeliveryTask.id).where(DeliveryTask.id.in_(received), DeliveryTask.status != '결제취소')
+    rows = [{"카테고리": cat, "상품명": name, "수량": qty} for cat, items in logi_group_task_items(task_ids).items() for name, qty in items.items()]
+    df = pd.DataFrame(rows, columns=["카테고리", "상품명", "수량"])
+    out = BytesIO()
+    with pd.ExcelWriter(out, engine='openpyxl') as w:
+        df.to_excel(w, index=False, sheet_name='피킹리스트')
+        worksheet = w.sheets['피킹리스트']
+        for idx, col in enumerate(df.columns):
+            column_len = max(df[col].astype(str).str.len().max() if len(df) else 0, len(col)) + 5
+            worksheet.column_dimensions[chr(65 + idx)].width = min(column_len, 60)
+    return out.getvalue()
+
+@logi_bp.route('/picking/export')
+def logi_picking_export():
+    if not session.get('admin_logged_in'): return redirect(url_for('logi.logi_admin_login'))
+    day = request.args.get('date') or get_kst().strftime('%Y-%m-%d')
+    try: datetime.strptime(day, '%Y-%m-%d')
+    except ValueError: return "날짜 형식이 올바르지 않습니다. (YYYY-MM-DD)", 400
+    data = logi_cache.get(f"picking:{day}", lambda: logi_build_picking_excel(day), ttl=PICKING_EXPORT_TTL)
+    filename = f"피킹리스트_{day}.xlsx"
+    response = send_file(BytesIO(data), mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', as_attachment=True, download_name=filename)
+    response.headers["Content-Disposition"] = f"attachment; filename={quote(filename)}; filename*=UTF-8''{quote(filename)}"
+    return response
+
+@logi_bp.route('/api/tasks')
+def logi_api_tasks():
+    """관제 목록 다음 페이지 (행 HTML + 작업 데이터 + 다음 커서)"""
+    if not session.get('admin_logged_in'): return jsonify({"error": "로그인이 필요합니다."}), 401
+    tasks, next_cursor = logi_fetch_task_page(request.args.get('status', 'all'), request.args.get('category', '전체'),
+                                              request.args.get('q', ''), request.args.get('cursor'))
+    return jsonify({
+        "tasks": [{"id": t.id, "order_id": t.order_id, "status": t.status, "category": t.category, "address": t.address,
+                   "customer_name": t.customer_name, "product_details": t.product_details, "item_qty": t.item_qty,
+                   "driver_name": t.driver_name, "has_photo": bool(t.photo_path or t.has_photo_data)} for t in tasks],
+        "html": render_template_string(LOGI_TASK_ROWS_HTML, tasks=tasks),
+        "next_cursor": next_cursor,
+    })
 
 # --------------------------------------------------------------------------------
 # 7. 기사용 업무 페이지 (보안 강화 및 PC 자동인증 로직 100% 복구)
@@ -650,8 +1128,8 @@ def logi_driver_work():
             date_summary[d_str] = date_summary.get(d_str, 0) + 1
     
     sorted_date_summary = sorted(date_summary.items(), reverse=True)
-    tasks.sort(key=lambda x: (x.address or "", logi_extract_qty(x.product_details)), reverse=True)
-    item_sum = logi_get_item_summary(tasks) if view_status != 'complete' else {}
+    tasks.sort(key=lambda x: (x.address or "", x.item_qty or 0), reverse=True)
+    item_sum = logi_get_item_summary([t.id for t in tasks]) if view_status != 'complete' and tasks else {}
 
    # [delivery_system.py 내 logi_driver_work 함수 안의 html 변수 부분 수정]
 
@@ -940,74 +1418,283 @@ def logi_driver_work():
 # --------------------------------------------------------------------------------
 @logi_bp.route('/api/photo/<int:tid>')
 def logi_get_photo(tid):
-    task = DeliveryTask.query.get(tid)
-    if task and task.photo_data:
+    task = DeliveryTask.query.options(load_only(DeliveryTask.id, DeliveryTask.photo_path)).get(tid)
+    if task and task.photo_path:
+        return jsonify({"success": True,
+                        "photo": url_for('logi.logi_proof_photo_file', filename=task.photo_path),
+                        "thumb": url_for('logi.logi_proof_photo_file', filename=logi_proof_thumb_name(task.photo_path))})
+    if task and task.photo_data:  # 파일 변환 전 과거 데이터
         return jsonify({"success": True, "photo": task.photo_data})
     return jsonify({"success": False, "error": "사진이 없습니다."})
+
+@logi_bp.route('/proof/<path:filename>')
+def logi_proof_photo_file(filename):
+    # 파일명에 시각이 포함되어 내용이 바뀌지 않으므로 장기 캐시
+    return send_from_directory(PROOF_PHOTO_DIR, filename, max_age=31536000)
 @logi_bp.route('/api/logs/<int:tid>')
 def logi_get_task_logs(tid):
     logs = DeliveryLog.query.filter_by(task_id=tid).order_by(DeliveryLog.created_at.desc()).all()
     return jsonify([{"time": l.created_at.strftime('%m-%d %H:%M'), "msg": l.message} for l in logs])
 
+def logi_apply_order_rows(rows):
+    """주문 행(SYNC_ORDER_COLUMNS) -> 결제취소 반영 + 배송요청 신규 작업/로그/품목 생성, 입고 건수 반환 (commit 은 호출측)
+    이미 있는 (주문번호, 카테고리) 작업은 건너뛰므로 같은 주문을 여러 번 넘겨도 결과는 한 번 처리한 것과 같습니다."""
+    # [복구] 결제취소 상태 동기화 (변경된 주문만)
+    canceled_ids = [r['order_id'] for r in rows if r['status'] == '결제취소']
+    if canceled_ids: DeliveryTask.query.filter(DeliveryTask.order_id.in_(canceled_ids)).update({DeliveryTask.status: '결제취소'}, synchronize_session=False)
+
+    # [복구] 배송요청 신규 입고 (카테고리 블록별 작업, 기존 작업은 한 번에 조회해 제외)
+    candidates = {}
+    for row in rows:
+        if row['status'] != '배송요청': continue
+        for block in (row['product_details'] or '').split(' | '):
+            match = re.search(r'\[(.*?)\]', block)
+            if match:
+                cat = match.group(1).strip()
+                candidates.setdefault((row['order_id'], cat), dict(order_id=row['order_id'], customer_name=row['customer_name'], phone=row['customer_phone'], address=row['delivery_address'] or '', memo=row['request_memo'], category=cat, product_details=block.strip(), item_qty=logi_extract_qty(block), status='대기'))
+    count = 0
+    if candidates:
+        order_ids = list({k[0] for k in candidates})
+        existing = set(db_delivery.session.query(DeliveryTask.order_id, DeliveryTask.category).filter(DeliveryTask.order_id.in_(order_ids)).all())
+        new_rows = [v for k, v in candidates.items() if k not in existing]
+        if new_rows:
+            # 실제로 INSERT 된 행만 RETURNING 으로 받아 로그/품목 생성 (동시에 같은 주문을 처리해도 무시된 쪽은 아무것도 만들지 않음)
+            table = DeliveryTask.__table__
+            created = db_delivery.session.execute(insert(table).prefix_with('OR IGNORE').returning(table.c.id, table.c.order_id, table.c.category), new_rows).fetchall()
+            if not created: return 0
+            now = get_kst()
+            db_delivery.session.execute(insert(DeliveryLog.__table__), [dict(task_id=t.id, order_id=t.order_id, status='입고', message='배송시스템에 신규 주문 입고됨', created_at=now) for t in created])
+            logi_save_task_items([(t.id, t.order_id, t.category, candidates[(t.order_id, t.category)]['product_details']) for t in created])
+            count = len(created)
+    return count
+
+def logi_run_sync():
+    """워터마크 이후 변경된 주문만 읽어 신규 입고/결제취소 반영 후 입고 건수 반환
+    (수동 동기화 버튼과 자동 동기화 스케줄러가 함께 사용, 실행 시간/건수/오류를 상태 행에 기록)"""
+    started = time.perf_counter()
+    try:
+        state = LogiSyncState.query.filter_by(name='orders').first()
+        if not state:
+            state = LogiSyncState(name='orders'); db_delivery.session.add(state)
+        # 겹침 구간의 주문은 다시 읽어도 INSERT OR IGNORE / 상태 갱신이 멱등
+        rows = logi_fetch_changed_orders(state.last_updated_at)
+        count = logi_apply_order_rows(rows)
+
+        latest = max((r['updated_at'] for r in rows if r['updated_at']), default=None)
+        if latest: state.last_updated_at = latest
+        state.last_run_at, state.last_count = datetime.now(), count
+        state.last_duration_ms, state.last_error = int((time.perf_counter() - started) * 1000), None
+        db_delivery.session.commit(); logi_cache.invalidate('pending_sync_count')
+        return count
+    except Exception as e:
+        db_delivery.session.rollback()
+        try:
+            with db_delivery.engines['delivery'].begin() as conn:
+                conn.execute(update(LogiSyncState.__table__).where(LogiSyncState.__table__.c.name == 'orders')
+                             .values(last_run_at=datetime.now(), last_duration_ms=int((time.perf_counter() - started) * 1000), last_error=str(e)[:500]))
+        except Exception:
+            pass  # 오류 기록 실패는 원래 오류를 가리지 않도록 무시
+        raise
+
 @logi_bp.route('/sync')
 def logi_sync():
-    path = logi_get_main_db_path()
     try:
-        conn = sqlite3.connect(path); conn.row_factory = sqlite3.Row; cursor = conn.cursor()
-        # [복구] 결제취소 상태 동기화
-        cursor.execute("SELECT order_id FROM \"order\" WHERE status = '결제취소'")
-        canceled_ids = [r['order_id'] for r in cursor.fetchall()]
-        if canceled_ids: DeliveryTask.query.filter(DeliveryTask.order_id.in_(canceled_ids)).update({DeliveryTask.status: '결제취소'}, synchronize_session=False)
-        
-        # [복구] 배송요청 신규 입고
-        cursor.execute("SELECT * FROM \"order\" WHERE status = '배송요청'")
-        count = 0
-        for row in cursor.fetchall():
-            for block in row['product_details'].split(' | '):
-                match = re.search(r'\[(.*?)\]', block)
-                if match:
-                    cat = match.group(1).strip()
-                    exists = DeliveryTask.query.filter_by(order_id=row['order_id'], category=cat).first()
-                    if not exists:
-                        nt = DeliveryTask(order_id=row['order_id'], customer_name=row['customer_name'], phone=row['customer_phone'], address=row['delivery_address'], memo=row['request_memo'], category=cat, product_details=block.strip(), status='대기')
-                        db_delivery.session.add(nt); db_delivery.session.commit()
-                        logi_add_log(nt.id, nt.order_id, '입고', '배송시스템에 신규 주문 입고됨')
-                        count += 1
-        db_delivery.session.commit(); conn.close(); return jsonify({"success": True, "synced_count": count})
-    except Exception as e: return jsonify({"success": False, "error": str(e)})
+        # 스케줄러와 같은 실행 임대를 잡아, 자동 동기화가 도는 중이면 겹쳐 실행하지 않음
+        with logi_sync_run_lease(f"{socket.gethostname()}:{os.getpid()}:manual") as acquired:
+            if not acquired: return jsonify({"success": False, "error": "자동 동기화가 실행 중입니다. 잠시 후 다시 시도해 주세요."})
+            return jsonify({"success": True, "synced_count": logi_consume_outbox() + logi_run_sync()})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+# --------------------------------------------------------------------------------
+# 배송 전달 대기열(delivery_outbox) 처리 - 쇼핑몰이 배송요청과 같은 트랜잭션에 기록한 주문만 읽음
+# --------------------------------------------------------------------------------
+# 주문 테이블을 훑지 않고 미처리 대기열 행만 읽어 작업을 만듭니다.
+# 대기열 행은 처리 전에 claimed_at 을 조건부 UPDATE ... RETURNING 으로 찍어 점유하므로
+# 요청/스케줄러/수동 동기화가 동시에 돌아도 같은 행을 두 번 처리하지 않습니다.
+# processed_at 은 배송 작업이 delivery DB 에 commit 된 뒤에만 기록하고, 실패하면 점유를 되돌립니다.
+# 점유 후 프로세스가 죽으면 OUTBOX_CLAIM_SECONDS 가 지난 뒤 다른 워커가 다시 점유해 처리합니다 (작업 생성은 중복 무시).
+OUTBOX_BATCH_SIZE = 500
+OUTBOX_CLAIM_SECONDS = 300
+
+def logi_claim_outbox(limit=OUTBOX_BATCH_SIZE, order_ids=None):
+    """미처리이면서 점유되지 않은(또는 점유가 만료된) 대기열 행을 점유하고 (id, order_id) 목록 반환 (별도 트랜잭션으로 즉시 commit)"""
+    now = datetime.now()
+    cond = 'processed_at IS NULL AND (claimed_at IS NULL OR claimed_at < :expired)'
+    sub = f'SELECT id FROM delivery_outbox WHERE {cond}'
+    params = {"now": now, "expired": now - timedelta(seconds=OUTBOX_CLAIM_SECONDS), "limit": limit}
+    binds = [bindparam('now', type_=DateTime), bindparam('expired', type_=DateTime)]
+    if order_ids:
+        sub += ' AND order_id IN :order_ids'
+        params["order_ids"] = list(order_ids); binds.append(bindparam('order_ids', expanding=True))
+    stmt = text(f'UPDATE delivery_outbox SET claimed_at = :now WHERE id IN ({sub} ORDER BY id LIMIT :limit) AND {cond} RETURNING id, order_id').bindparams(*binds)
+    with db_delivery.engines[None].begin() as conn:
+        return conn.execute(stmt, params).fetchall()
+
+def logi_finish_outbox(ids):
+    """배송 작업 commit 후 처리 완료 기록"""
+    with db_delivery.engines[None].begin() as conn:
+        conn.execute(text('UPDATE delivery_outbox SET processed_at = :now WHERE id IN :ids')
+                     .bindparams(bindparam('now', type_=DateTime), bindparam('ids', expanding=True)), {"now": datetime.now(), "ids": list(ids)})
+
+def logi_release_outbox(ids):
+    with db_delivery.engines[None].begin() as conn:
+        conn.execute(text('UPDATE delivery_outbox SET claimed_at = NULL WHERE id IN :ids').bindparams(bindparam('ids', expanding=True)), {"ids": list(ids)})
+
+def logi_consume_outbox(limit=OUTBOX_BATCH_SIZE, order_ids=None):
+    """미처리 대기열 -> 배송 작업 생성, 입고 건수 반환 (order_ids 를 주면 해당 주문의 대기열만)"""
+    started = time.perf_counter()
+    pending = logi_claim_outbox(limit, order_ids)
+    if not pending: return 0
+    try:
+        stmt = text(f'SELECT {SYNC_ORDER_COLUMNS} FROM "order" WHERE order_id IN :ids').columns(updated_at=DateTime).bindparams(bindparam('ids', expanding=True))
+        rows = db_delivery.session.execute(stmt, {"ids": list({p.order_id for p in pending})}).mappings().all()
+        count = logi_apply_order_rows(rows)
+        state = LogiSyncState.query.filter_by(name='outbox').first()
+        if not state:
+            state = LogiSyncState(name='outbox'); db_delivery.session.add(state)
+        state.last_run_at, state.last_count, state.last_duration_ms = datetime.now(), count, int((time.perf_counter() - started) * 1000)
+        db_delivery.session.commit(); logi_cache.invalidate('pending_sync_count')
+    except Exception:
+        db_delivery.session.rollback()
+        logi_release_outbox([p.id for p in pending])
+        raise
+    # 여기서 실패해도 점유 만료 후 다시 처리되고, 이미 만든 작업은 중복 무시됨
+    logi_finish_outbox([p.id for p in pending])
+    return count
+
+# --------------------------------------------------------------------------------
+# 자동 동기화 스케줄러 (워커마다 스레드를 띄우되 DB 임대(lease)를 잡은 워커 하나만 실행)
+# --------------------------------------------------------------------------------
+# 임대는 logi_sync_state 의 'scheduler' 행을 조건부 UPDATE 로 갱신하는 방식이라 별도 락 서버가 필요 없습니다.
+# 담당 워커가 죽으면 임대 만료(주기의 3배) 후 다른 워커가 이어받습니다. LOGI_SYNC_INTERVAL=0 이면 끔.
+# 실제 동기화 실행은 'sync_run' 행 임대로 한 번 더 묶어 수동 동기화 버튼과 겹치지 않게 하고,
+# 실행 중에는 별도 스레드가 임대를 계속 연장하므로 오래 걸리는 동기화도 도중에 임대를 잃지 않습니다.
+# 매 주기에는 전달 대기열만 처리하고, 대기열을 거치지 않은 주문 대비 워터마크 동기화는 LOGI_SYNC_FULL_EVERY 주기마다 실행합니다.
+LOGI_SYNC_INTERVAL = int(os.getenv('LOGI_SYNC_INTERVAL', '60'))
+LOGI_SYNC_FULL_EVERY = int(os.getenv('LOGI_SYNC_FULL_EVERY', '10'))
+SYNC_RUN_LEASE_SECONDS = 60
+_logi_scheduler = {"thread": None}
+
+def logi_acquire_sync_lease(owner, seconds, name='scheduler', engine=None):
+    """임대가 비었거나 만료되었거나 이미 내 것이면 연장하고 True"""
+    table, now = LogiSyncState.__table__, datetime.now()
+    with (engine or db_delivery.engines['delivery']).begin() as conn:
+        conn.execute(insert(table).prefix_with('OR IGNORE'), {"name": name})
+        result = conn.execute(update(table).where(table.c.name == name, or_(table.c.lease_until == None, table.c.lease_until < now, table.c.lease_owner == owner))
+                              .values(lease_owner=owner, lease_until=now + timedelta(seconds=seconds)))
+        return result.rowcount == 1
+
+def logi_release_sync_lease(owner, name, engine=None):
+    table = LogiSyncState.__table__
+    with (engine or db_delivery.engines['delivery']).begin() as conn:
+        conn.execute(update(table).where(table.c.name == name, table.c.lease_owner == owner).values(lease_owner=None, lease_until=None))
+
+@contextmanager
+def logi_sync_run_lease(owner, seconds=SYNC_RUN_LEASE_SECONDS):
+    """동기화 실행 임대 (with 블록 동안 주기적으로 연장, 못 잡으면 False 를 넘김)"""
+    engine = db_delivery.engines['delivery']
+    if not logi_acquire_sync_lease(owner, seconds, 'sync_run', engine):
+        yield False
+        return
+    done = threading.Event()
+
+    def renew():
+        while not done.wait(seconds / 3):
+            try:
+                logi_acquire_sync_lease(owner, seconds, 'sync_run', engine)
+            except Exception as e:
+                print(f"⚠️ [LogiScheduler] 동기화 임대 연장 실패: {e}")
+
+    renewer = threading.Thread(target=renew, name='logi-sync-lease', daemon=True)
+    renewer.start()
+    try:
+        yield True
+    finally:
+        done.set(); renewer.join()
+        logi_release_sync_lease(owner, 'sync_run', engine)
+
+def _logi_scheduler_loop(app, interval):
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    tick = 0
+    while True:
+        time.sleep(interval)
+        try:
+            with app.app_context():
+                if not logi_acquire_sync_lease(owner, interval * 3): continue
+                with logi_sync_run_lease(owner) as acquired:
+                    if not acquired: continue  # 수동 동기화 실행 중
+                    tick += 1
+                    count = logi_consume_outbox()
+                    if LOGI_SYNC_FULL_EVERY > 0 and tick % LOGI_SYNC_FULL_EVERY == 0: count += logi_run_sync()
+                if count: print(f"✅ [LogiScheduler] 신규 배송건 {count}건 자동 입고")
+        except Exception as e:
+            print(f"⚠️ [LogiScheduler] 자동 동기화 실패: {e}")
+
+def logi_start_scheduler(app, interval=None):
+    """워커 프로세스당 한 번 자동 동기화 스레드 시작 (gunicorn --preload 사용 시 fork 이후 호출 필요)"""
+    interval = LOGI_SYNC_INTERVAL if interval is None else interval
+    if interval <= 0 or app.config.get('TESTING'): return None
+    thread = _logi_scheduler["thread"]
+    if thread is not None and thread.is_alive(): return thread
+    thread = threading.Thread(target=_logi_scheduler_loop, args=(app, interval), name='logi-sync-scheduler', daemon=True)
+    thread.start()
+    _logi_scheduler["thread"] = thread
+    print(f"✅ [LogiScheduler] 자동 동기화 시작 ({interval}초 주기)")
+    return thread
+
+def logi_bulk_update(ids, values, allowed_status=None, blocked_status=None):
+    """선택 작업을 UPDATE ... WHERE id IN (...) RETURNING 한 번으로 변경 (상태 조건 불일치 건은 제외)
+    결과는 실제로 변경된 행 기준이고, 변경되지 않은 id 만 존재 여부를 한 번 더 조회합니다.
+    반환: ({id: 'updated'|'skipped'|'not_found'}, 변경된 (id, order_id) 목록)"""
+    conds = [DeliveryTask.id.in_(ids)]
+    if allowed_status: conds.append(DeliveryTask.status.in_(allowed_status))
+    if blocked_status: conds.append(DeliveryTask.status.notin_(blocked_status))
+    stmt = update(DeliveryTask).where(*conds).values(values).returning(DeliveryTask.id, DeliveryTask.order_id)
+    updated = [(r.id, r.order_id) for r in db_delivery.session.execute(stmt, execution_options={"synchronize_session": False})]
+
+    changed = {tid for tid, _ in updated}
+    rest = [tid for tid in ids if tid not in changed]
+    existing = {tid for (tid,) in db_delivery.session.query(DeliveryTask.id).filter(DeliveryTask.id.in_(rest))} if rest else set()
+    results = {tid: 'updated' if tid in changed else 'skipped' if tid in existing else 'not_found' for tid in ids}
+    return results, updated
+
+def logi_bulk_response(results):
+    counts = {k: list(results.values()).count(k) for k in ('updated', 'skipped', 'not_found')}
+    return jsonify({"success": True, "results": results, **counts})
 
 @logi_bp.route('/bulk/execute', methods=['POST'])
 def logi_bulk_execute():
     try:
         data = request.json
-        ids = data.get('task_ids', []) # JS에서 보낸 [10, 11, 12...] 리스트를 받음
+        ids = [int(i) for i in data.get('task_ids', [])] # JS에서 보낸 [10, 11, 12...] 리스트를 받음
         action = data.get('action')
         
         if not ids:
             return jsonify({"success": False, "error": "선택된 주문이 없습니다."})
 
-        # DB에서 선택된 모든 Task를 한 번에 가져옵니다.
-        tasks = DeliveryTask.query.filter(DeliveryTask.id.in_(ids)).all()
-        
-        for t in tasks:
-            if action == 'assign':
-                d_id = data.get('driver_id')
-                driver = Driver.query.get(d_id)
-                if driver:
-                    # 보류/대기 상관없이 모두 강제 배정
-                    t.driver_id, t.driver_name, t.status = driver.id, driver.name, '배정완료'
-                    logi_add_log(t.id, t.order_id, '배정', f'관리자가 [{driver.name}] 기사 일괄 배정')
-            
-            elif action == 'hold':
-                t.status = '보류'
-                logi_add_log(t.id, t.order_id, '보류', '관리자 일괄 보류 처리')
-                
-            elif action == 'delete':
-                db_delivery.session.delete(t)
-        
-        # ⚠️ 루프가 다 끝난 후 '한 번에' 저장(Commit) 합니다.
+        if action == 'assign':
+            driver = Driver.query.get(data.get('driver_id'))
+            if not driver: return jsonify({"success": False, "error": "기사를 찾을 수 없습니다."})
+            # 보류/대기 상관없이 모두 배정 (배송 완료 건만 제외)
+            results, updated = logi_bulk_update(ids, {DeliveryTask.driver_id: driver.id, DeliveryTask.driver_name: driver.name, DeliveryTask.status: '배정완료'}, blocked_status=['완료'])
+            for tid, order_id in updated: logi_add_log(tid, order_id, '배정', f'관리자가 [{driver.name}] 기사 일괄 배정')
+
+        elif action == 'hold':
+            results, updated = logi_bulk_update(ids, {DeliveryTask.status: '보류'}, blocked_status=['완료'])
+            for tid, order_id in updated: logi_add_log(tid, order_id, '보류', '관리자 일괄 보류 처리')
+
+        elif action == 'delete':
+            existing = {tid for (tid,) in db_delivery.session.query(DeliveryTask.id).filter(DeliveryTask.id.in_(ids))}
+            DeliveryTask.query.filter(DeliveryTask.id.in_(ids)).delete(synchronize_session=False)
+            DeliveryTaskItem.query.filter(DeliveryTaskItem.task_id.in_(ids)).delete(synchronize_session=False)
+            results = {tid: 'updated' if tid in existing else 'not_found' for tid in ids}
+
+        else:
+            return jsonify({"success": False, "error": "알 수 없는 작업입니다."})
+
         db_delivery.session.commit()
-        return jsonify({"success": True})
+        return logi_bulk_response(results)
 
     except Exception as e:
         db_delivery.session.rollback()
@@ -1015,13 +1702,15 @@ def logi_bulk_execute():
 
 @logi_bp.route('/bulk/pickup', methods=['POST'])
 def logi_bulk_pickup():
-    data = request.json
-    for tid in data.get('task_ids'):
-        t = DeliveryTask.query.get(tid)
-        if t and t.status in ['배정완료', '대기']: 
-            t.status, t.pickup_at = '픽업', datetime.now()
-            logi_add_log(t.id, t.order_id, '픽업', '일괄 상차 완료 처리')
-    db_delivery.session.commit(); return jsonify({"success": True})
+    data = request.get_json(silent=True) or {}
+    try:
+        ids = [int(i) for i in data.get('task_ids') or []]
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "error": "잘못된 작업 번호가 포함되어 있습니다."}), 400
+    if not ids: return jsonify({"success": False, "error": "선택된 주문이 없습니다."})
+    results, updated = logi_bulk_update(ids, {DeliveryTask.status: '픽업', DeliveryTask.pickup_at: datetime.now()}, allowed_status=['배정완료', '대기'])
+    for tid, order_id in updated: logi_add_log(tid, order_id, '픽업', '일괄 상차 완료 처리')
+    db_delivery.session.commit(); return logi_bulk_response(results)
 
 @logi_bp.route('/update_status/<int:tid>/<string:new_status>')
 def logi_update_task_status(tid, new_status):
@@ -1038,7 +1727,12 @@ def logi_update_task_status(tid, new_status):
 def logi_complete_action(tid):
     t = DeliveryTask.query.get(tid); d = request.json
     if t:
-        t.status, t.completed_at, t.photo_data = '완료', datetime.now(), d.get('photo')
+        t.status, t.completed_at = '완료', datetime.now()
+        try:
+            t.photo_path = logi_save_proof_photo(t, d.get('photo'))
+        except Exception as e:
+            print(f"⚠️ [Proof Photo] 파일 저장 실패, DB 에 임시 보관: {e}")
+            t.photo_data = d.get('photo')
         logi_add_log(t.id, t.order_id, '완료', '기사 배송 완료 및 안내 전송')
         db_delivery.session.commit()
         return jsonify({"success": True, "customer": t.customer_name, "phone": t.phone})
@@ -0,0 +1,396 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from io import BytesIO
+from urllib.parse import unquote
+
+from PIL import Image, ImageOps
+
+from local_cache import LocalCache
+
+# --------------------------------------------------------------------------------
+# 업로드 이미지 처리 파이프라인 (프로세스 풀에서 회전 보정/크롭/WebP 변환)
+# --------------------------------------------------------------------------------
+# 요청 안에서는 원본 바이트만 _incoming 폴더에 저장하고 임시 주소(/img/pending/<작업ID>)를 바로 돌려줍니다.
+# 변환은 CPU 코어 수만큼의 프로세스에서 병렬로 처리되고, 끝나면 on_complete 콜백으로 DB 의 임시 주소를
+# 최종 주소로 바꿉니다. 진행 상태는 파일 존재 여부로 판단하므로 다른 워커가 받은 작업도 조회할 수 있습니다.
+# 실패한 작업은 _incoming/<작업ID>.failed 에 오류를 남기고, 재시작으로 처리되지 못한 원본은 시작 시 다시 변환합니다.
+# 이미지가 아닌/깨진 파일은 요청 안에서 바로 검사해 InvalidImageError 로 거절합니다.
+# IMAGE_PIPELINE_SYNC=1 (또는 submit(sync=True)) 이면 요청 안에서 바로 변환 후 최종 주소를 반환합니다.
+
+PENDING_PREFIX = '/img/pending/'
+ORPHAN_MIN_AGE = 300  # 이보다 오래 남은 _incoming 원본은 처리하던 워커가 사라진 것으로 보고 다시 변환 (초)
+
+
+class InvalidImageError(ValueError):
+    """업로드 파일을 이미지로 읽을 수 없음"""
+
+# --------------------------------------------------------------------------------
+# 해상도별 파생 이미지 (thumb/card/detail) - 내용 해시 파일명 + 원본별 사이드카 JSON
+# --------------------------------------------------------------------------------
+# static/derived/<원본키>_<폭>.<내용해시>.webp 로 저장하고, static/derived/<원본키>.json 에 {폭: 주소} 를 기록합니다.
+# 원본키는 원본 주소의 해시라 한글 파일명도 안전하고, 파일명에 내용 해시가 들어가 장기 캐시가 가능합니다.
+DERIVATIVE_WIDTHS = {"thumb": 200, "card": 400, "detail": 800}
+DERIVED_SUBDIR = 'derived'
+DERIVATIVE_EXTS = ('.jpg', '.jpeg', '.png', '.webp')
+DERIVED_MAX_AGE = 31536000  # 파일명에 내용 해시가 있어 내용이 바뀌면 주소도 바뀜
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.part"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def make_derivatives(src_path, src_url, derived_dir, derived_url, widths=tuple(DERIVATIVE_WIDTHS.values())):
+    """(프로세스 풀에서도 실행) 원본 -> 폭별 WebP 파생본 + 사이드카 기록, {폭: 주소} 반환
+    원본보다 큰 폭은 만들지 않고 원본 폭으로 대신합니다."""
+    key = hashlib.sha1(src_url.encode('utf-8')).hexdigest()[:16]
+    img = ImageOps.exif_transpose(Image.open(src_path))
+    if img.mode not in ('RGB', 'RGBA'): img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+    variants = {}
+    for w in sorted({min(w, img.width) for w in widths}):
+        im = img if w == img.width else img.resize((w, max(1, round(img.height * w / img.width))), Image.Resampling.LANCZOS)
+        buf = BytesIO()
+        im.save(buf, "WEBP", quality=80)
+        data = buf.getvalue()
+        name = f"{key}_{w}.{hashlib.sha1(data).hexdigest()[:10]}.webp"
+        path = os.path.join(derived_dir, name)
+        if not os.path.exists(path): _write_atomic(path, data)
+        variants[str(w)] = f"{derived_url}/{name}"
+    sidecar = {"src": src_url, "mtime": os.stat(src_path).st_mtime, "variants": variants}
+    _write_atomic(os.path.join(derived_dir, f"{key}.json"), json.dumps(sidecar, ensure_ascii=False).encode('utf-8'))
+    return variants
+
+
+class DerivativeStore:
+    """/static/... 주소 -> 파생 이미지 조회/생성 (조회 결과는 워커 메모리에 캐시)"""
+
+    def __init__(self, static_dir, static_url='/static'):
+        self.static_dir = os.path.abspath(static_dir)
+        self.static_url = static_url.rstrip('/')
+        self.derived_dir = os.path.join(self.static_dir, DERIVED_SUBDIR)
+        self.derived_url = f"{self.static_url}/{DERIVED_SUBDIR}"
+        self._cache = LocalCache(default_ttl=600)  # 주소 -> (원본 mtime, {폭: 주소})
+        self._lock = threading.Lock()
+        self._rebuilding = set()
+        os.makedirs(self.derived_dir, exist_ok=True)
+
+    def source_path(self, url):
+        """로컬 static 원본 경로 (외부 주소/경로 이탈/지원하지 않는 확장자는 None)"""
+        if not url or not url.startswith(self.static_url + '/') or url.startswith(self.derived_url + '/'): return None
+        path = os.path.abspath(os.path.join(self.static_dir, unquote(url[len(self.static_url) + 1:].split('?')[0])))
+        if not path.startswith(self.static_dir + os.sep) or not path.lower().endswith(DERIVATIVE_EXTS): return None
+        return path
+
+    def _sidecar_path(self, url):
+        return os.path.join(self.derived_dir, hashlib.sha1(url.encode('utf-8')).hexdigest()[:16] + '.json')
+
+    def _load(self, url):
+        try:
+            with open(self._sidecar_path(url), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, url):
+        path, sidecar = self.source_path(url), self._load(url)
+        try:
+            return bool(path and sidecar and sidecar.get("mtime") == os.stat(path).st_mtime)
+        except OSError:
+            return False
+
+    def variants(self, url):
+        """{폭(str): 주소}, 파생본이 없거나 원본이 바뀌어 낡았으면 빈 dict (없음도 짧게 캐시해 디스크 조회 반복 방지)
+        원본 mtime 은 매번 확인하고, 사이드카와 다르면 원본만 쓰면서 백그라운드에서 다시 만듭니다."""
+        path = self.source_path(url)
+        if not path: return {}
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return {}
+        cached = self._cache.get(url)
+        if cached is None or cached[0] != mtime:
+            sidecar = self._load(url)
+            if sidecar and sidecar.get("mtime") != mtime:
+                self._rebuild_later(url)
+                sidecar = None
+            cached = (mtime, sidecar["variants"] if sidecar else {})
+            self._cache.set(url, cached, ttl=600 if cached[1] else 30)
+        return cached[1]
+
+    def build(self, url):
+        path = self.source_path(url)
+        if not path: return {}
+        found = make_derivatives(path, url, self.derived_dir, self.derived_url)
+        self._cache.set(url, (os.stat(path).st_mtime, found))
+        return found
+
+    def _rebuild_later(self, url):
+        with self._lock:
+            if url in self._rebuilding: return
+            self._rebuilding.add(url)
+
+        def run():
+            try:
+                self.build(url)
+            except Exception as e:
+                print(f"⚠️ [Images] 파생본 재생성 실패 {url}: {e}")
+            finally:
+                with self._lock: self._rebuilding.discard(url)
+
+        threading.Thread(target=run, name='derivative-rebuild', daemon=True).start()
+
+    def srcset(self, url):
+        return ", ".join(f"{u} {w}w" for w, u in sorted(self.variants(url).items(), key=lambda kv: int(kv[0])))
+
+
+def process_image(src_path, dest_path, size, dest_url=None, derived_dir=None, derived_url=None):
+    """(프로세스 풀에서 실행) 원본 -> EXIF 회전 보정 -> 중앙 크롭 -> WebP 저장 후 원본 삭제 (+ 파생본 생성)"""
+    img = Image.open(src_path)
+    img = ImageOps.exif_transpose(img)
+    img = ImageOps.fit(img, size, Image.Resampling.LANCZOS)
+    tmp_path = dest_path + '.part'
+    img.save(tmp_path, "WEBP", quality=85)
+    if derived_dir:
+        # 최종 파일이 보이기 전에 파생본부터 만들어 두어야 완료 직후 화면에서도 srcset 이 적용됨
+        os.replace(tmp_path, dest_path + '.src.webp')
+        make_derivatives(dest_path + '.src.webp', dest_url, derived_dir, derived_url)
+        tmp_path = dest_path + '.src.webp'
+    os.replace(tmp_path, dest_path)  # 완성된 파일만 보이도록 교체
+    os.remove(src_path)
+    return dest_path
+
+
+class ImagePipeline:
+    def __init__(self, upload_dir, url_prefix='/static/uploads', max_workers=None, sync=False, size=(800, 800), derivatives=None):
+        self.upload_dir = upload_dir
+        self.derivatives = derivatives  # DerivativeStore (있으면 변환과 함께 해상도별 파생본 생성)
+        self.incoming_dir = os.path.join(upload_dir, '_incoming')
+        self.url_prefix = url_prefix
+        self.max_workers = max_workers or int(os.getenv('IMAGE_WORKERS', '0')) or os.cpu_count() or 2
+        self.sync = sync
+        self.size = size
+        self._executor = None
+        self._lock = threading.Lock()
+        self._callbacks = []
+        os.makedirs(self.incoming_dir, exist_ok=True)
+
+    def on_complete(self, callback):
+        """callback(임시 주소, 최종 주소) 등록 (변환 완료 시 풀 결과 스레드에서 호출)"""
+        self._callbacks.append(callback)
+        return callback
+
+    def _get_executor(self):
+        # 첫 업로드 시 생성 (gunicorn 워커 fork 이후). spawn/forkserver 는 자식에서 __main__ 을 다시 import 해
+        # python app.py 실행 시 초기화 코드가 워커마다 재실행되므로, 가능한 환경에서는 fork 사용
+        with self._lock:
+            if self._executor is None:
+                methods = multiprocessing.get_all_start_methods()
+                ctx = multiprocessing.get_context('fork' if 'fork' in methods else methods[0])
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx)
+            return self._executor
+
+    def _paths(self, job_id):
+        return os.path.join(self.incoming_dir, f"{job_id}.src"), os.path.join(self.upload_dir, f"{job_id}.webp")
+
+    def _failed_path(self, job_id):
+        return os.path.join(self.incoming_dir, f"{job_id}.failed")
+
+    def final_url(self, job_id):
+        return f"{self.url_prefix}/{job_id}.webp"
+
+    def _derivative_args(self, job_id):
+        if not self.derivatives: return ()
+        return (self.final_url(job_id), self.derivatives.derived_dir, self.derivatives.derived_url)
+
+    def build_derivatives(self, urls):
+        """기존 이미지들의 파생본을 프로세스 풀에서 병렬 생성, (성공 수, 실패 목록) 반환"""
+        store, futures, failed = self.derivatives, {}, []
+        for url in urls:
+            futures[url] = self._get_executor().submit(make_derivatives, store.source_path(url), url, store.derived_dir, store.derived_url)
+        for url, future in futures.items():
+            try: future.result()
+            except Exception as e: failed.append((url, str(e)))
+        return len(futures) - len(failed), failed
+
+    def submit(self, file, sync=False):
+        """업로드 파일 접수 -> (비동기) 임시 주소 / (동기) 최종 주소 반환"""
+        job_id = f"uncle_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        src_path, dest_path = self._paths(job_id)
+        file.save(src_path)
+        try:
+            with Image.open(src_path) as img: img.verify()
+        except Exception as e:
+            os.remove(src_path)
+            raise InvalidImageError(f"이미지 파일을 읽을 수 없습니다: {getattr(file, 'filename', '')}") from e
+        args = (src_path, dest_path, self.size) + self._derivative_args(job_id)
+        if sync or self.sync:
+            process_image(*args)
+            return self.final_url(job_id)
+        try:
+            future = self._get_executor().submit(process_image, *args)
+        except Exception as e:
+            # 풀을 띄울 수 없는 환경이면 요청 안에서 처리
+            print(f"⚠️ [ImagePipeline] 프로세스 풀 사용 불가, 동기 처리: {e}")
+            process_image(*args)
+            return self.final_url(job_id)
+        future.add_done_callback(lambda f: self._on_done(job_id, f))
+        return PENDING_PREFIX + job_id
+
+    def _on_done(self, job_id, future):
+        self._finish(job_id, future.exception())
+
+    def _finish(self, job_id, error):
+        if error is not None:
+            # 다른 워커의 상태 조회에서도 보이도록 파일로 기록하고 원본은 정리
+            _write_atomic(self._failed_path(job_id), str(error).encode('utf-8'))
+            src_path = self._paths(job_id)[0]
+            if os.path.exists(src_path): os.remove(src_path)
+            print(f"❌ [ImagePipeline] 이미지 변환 실패 {job_id}: {error}")
+            return
+        for callback in self._callbacks:
+            try:
+                callback(PENDING_PREFIX + job_id, self.final_url(job_id))
+            except Exception as e:
+                print(f"⚠️ [ImagePipeline] 완료 콜백 오류 {job_id}: {e}")
+
+    def status(self, job_id):
+        """작업 상태: done(최종 주소 포함) / pending / failed / unknown"""
+        if not job_id.startswith('uncle_') or os.sep in job_id or '/' in job_id:
+            return {"status": "unknown"}
+        src_path, dest_path = self._paths(job_id)
+        if os.path.exists(dest_path):
+            return {"status": "done", "url": self.final_url(job_id)}
+        try:
+            with open(self._failed_path(job_id), encoding='utf-8') as f:
+                return {"status": "failed", "error": f.read()}
+        except OSError:
+            pass
+        if os.path.exists(src_path):
+            return {"status": "pending"}
+        return {"status": "unknown"}
+
+    def resume_incoming(self, min_age=ORPHAN_MIN_AGE):
+        """처리 도중 워커가 재시작되어 남은 _incoming 원본을 백그라운드 스레드에서 다시 변환 (시작 시 호출)"""
+        thread = threading.Thread(target=self._resume_orphans, args=(min_age,), name='image-pipeline-resume', daemon=True)
+        thread.start()
+        return thread
+
+    def _resume_orphans(self, min_age):
+        now = time.time()
+        for name in sorted(os.listdir(self.incoming_dir)):
+            if not name.endswith('.src'): continue
+            job_id = name[:-len('.src')]
+            src_path, dest_path = self._paths(job_id)
+            claim_path = os.path.join(self.incoming_dir, f"{job_id}.resume")
+            try:
+                if now - os.stat(src_path).st_mtime < min_age: continue
+                if os.path.exists(claim_path) and now - os.stat(claim_path).st_mtime >= min_age: os.remove(claim_path)  # 재처리 중 죽은 워커의 점유
+                os.close(os.open(claim_path, os.O_CREAT | os.O_EXCL))  # 여러 워커가 동시에 시작해도 한 곳만 처리
+            except OSError:
+                continue
+            print(f"🔄 [ImagePipeline] 미처리 업로드 재변환 {job_id}")
+            error = None
+            try:
+                if os.path.exists(dest_path): os.remove(src_path)  # 변환은 끝났지만 원본 정리/주소 교체 전에 죽은 경우
+                else: process_image(src_path, dest_path, self.size, *self._derivative_args(job_id))
+            except Exception as e:
+                error = e
+            self._finish(job_id, error)
+            os.remove(claim_path)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+# --------------------------------------------------------------------------------
+# 요청 시 리사이즈 (/img/<w>x<h>/<경로>) 디스크 캐시 - 허용 크기만, 용량 초과 시 오래 안 쓴 파일부터 삭제
+# --------------------------------------------------------------------------------
+# 캐시 키는 (원본 경로, 원본 mtime, 크기) 해시라 원본이 바뀌면 새 파일이 만들어지고 예전 파일은 LRU 로 정리됩니다.
+# 적중 시 파일 atime 을 직접 갱신해 최근 사용 시각으로 씁니다 (워커 간 공유 기준, mtime 은 ETag 유지를 위해 그대로).
+RESIZE_SIZES = {(100, 120), (200, 200), (400, 400), (400, 500), (600, 800), (800, 800)}
+RESIZE_MAX_AGE = 3600  # 주소에 버전이 없어 원본 교체가 반영되도록 짧게, 이후에는 ETag 재검증(304)
+
+
+class ResizeCache:
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024, sizes=RESIZE_SIZES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.sizes = sizes
+        self._approx_bytes = None  # 이 워커가 추정하는 캐시 총 용량 (초과 추정 시에만 디렉터리 재계산)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get(self, src_path, width, height):
+        """캐시 파일 경로 반환 (없으면 생성), 허용되지 않은 크기는 ValueError"""
+        if (width, height) not in self.sizes: raise ValueError(f"허용되지 않은 크기: {width}x{height}")
+        mtime = os.stat(src_path).st_mtime_ns
+        key = hashlib.sha1(f"{src_path}|{mtime}|{width}x{height}".encode('utf-8')).hexdigest()
+        path = os.path.join(self.cache_dir, key[:2], f"{key}.webp")
+        if os.path.exists(path):
+            try: os.utime(path, ns=(time.time_ns(), os.stat(path).st_mtime_ns))
+            except OSError: pass
+            return path
+        with self._key_lock(key):  # 같은 이미지 동시 요청 시 한 번만 변환
+            if not os.path.exists(path):
+                img = ImageOps.exif_transpose(Image.open(src_path))
+                if img.mode not in ('RGB', 'RGBA'): img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+                img = ImageOps.fit(img, (width, height), Image.Resampling.LANCZOS)
+                buf = BytesIO()
+                img.save(buf, "WEBP", quality=80)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                _write_atomic(path, buf.getvalue())
+                self._added(len(buf.getvalue()))
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return path
+
+    def _scan(self):
+        files = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if not name.endswith('.webp'): continue
+                p = os.path.join(root, name)
+                try:
+                    st = os.stat(p)
+                    files.append((st.st_atime, st.st_size, p))
+                except OSError:
+                    pass
+        return files
+
+    def _added(self, nbytes):
+        with self._lock:
+            if self._approx_bytes is None: self._approx_bytes = sum(f[1] for f in self._scan())
+            self._approx_bytes += nbytes
+            if self._approx_bytes <= self.max_bytes: return
+        self.evict()
+
+    def evict(self, target_ratio=0.9):
+        """총 용량이 max_bytes 의 target_ratio 이하가 될 때까지 오래 안 쓴 파일부터 삭제, 삭제 수 반환"""
+        files = sorted(self._scan())
+        total, removed = sum(f[1] for f in files), 0
+        for _, size, p in files:
+            if total <= self.max_bytes * target_ratio: break
+            try:
+                os.remove(p)
+                total -= size; removed += 1
+            except OSError:
+                pass
+        with self._lock:
+            self._approx_bytes = total
+        return removed
@@ -0,0 +1,70 @@
+import os
+import threading
+import time
+
+# --------------------------------------------------------------------------------
+# 워커 프로세스 로컬 캐시 (TTL + 파일 마커 기반 무효화)
+# --------------------------------------------------------------------------------
+# 카테고리/메인 화면처럼 자주 읽고 드물게 바뀌는 데이터를 워커 메모리에 보관합니다.
+# gunicorn 멀티 워커 환경에서는 한 워커의 invalidate() 가 다른 워커에 전달되지 않으므로,
+# marker_path 를 지정하면 마커 파일의 수정시각(mtime)을 갱신하고 각 워커가 조회 시 비교합니다.
+
+
+class LocalCache:
+    def __init__(self, default_ttl=300, marker_path=None):
+        self.default_ttl = default_ttl
+        self.marker_path = marker_path
+        self._data = {}  # key -> (만료시각, 값)
+        self._lock = threading.Lock()
+        self._marker_seen = self._read_marker()
+
+    def _read_marker(self):
+        if not self.marker_path:
+            return None
+        try:
+            return os.stat(self.marker_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _check_marker(self):
+        """다른 워커에서 무효화했다면 로컬 데이터 전체 폐기"""
+        marker = self._read_marker()
+        if marker != self._marker_seen:
+            self._data.clear()
+            self._marker_seen = marker
+
+    def get(self, key, loader=None, ttl=None):
+        """캐시 조회, 없거나 만료되었으면 loader() 결과를 저장 후 반환"""
+        now = time.monotonic()
+        with self._lock:
+            self._check_marker()
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+        if loader is None:
+            return None
+        value = loader()
+        with self._lock:
+            self._data[key] = (now + (ttl if ttl is not None else self.default_ttl), value)
+        return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + (ttl if ttl is not None else self.default_ttl), value)
+
+    def invalidate(self, *keys):
+        """지정 키(없으면 전체) 삭제 후 마커 갱신으로 다른 워커에도 알림"""
+        with self._lock:
+            if keys:
+                for key in keys:
+                    self._data.pop(key, None)
+            else:
+                self._data.clear()
+            if self.marker_path:
+                try:
+                    os.makedirs(os.path.dirname(self.marker_path), exist_ok=True)
+                    with open(self.marker_path, 'a'):
+                        os.utime(self.marker_path, None)
+                except OSError:
+                    pass
+                self._marker_seen = self._read_marker()
@@ -0,0 +1,65 @@
+import os
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# --------------------------------------------------------------------------------
+# 요청 단위 쿼리 프로파일러 (QUERY_PROFILE=1 일 때만 동작)
+# --------------------------------------------------------------------------------
+# 요청마다 실행된 쿼리 수/소요시간과 ORM 으로 읽어들인 객체 수/대략적인 바이트를 로그로 남깁니다.
+# 바이트는 로드된 객체의 컬럼 값 길이 합계로 추정한 값이며, 무거운 컬럼이 목록 화면에서
+# 읽히고 있는지 확인하는 용도입니다.
+
+_installed = {"done": False}
+
+
+def _value_size(value):
+    if value is None: return 0
+    if isinstance(value, (str, bytes)): return len(value)
+    return 8
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'query_profile' in g:
+        conn.info.setdefault('query_profile_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not (has_request_context() and 'query_profile' in g): return
+    started = conn.info.get('query_profile_started')
+    if not started: return
+    prof = g.query_profile
+    prof["queries"] += 1
+    prof["seconds"] += time.perf_counter() - started.pop()
+
+
+def _on_load(target, context):
+    if not (has_request_context() and 'query_profile' in g): return
+    prof = g.query_profile
+    prof["objects"] += 1
+    prof["bytes"] += sum(_value_size(v) for k, v in target.__dict__.items() if not k.startswith('_'))
+
+
+def init_query_profiler(app, db):
+    """QUERY_PROFILE 환경변수가 켜져 있으면 엔진/ORM 이벤트와 요청 훅 등록"""
+    if os.getenv("QUERY_PROFILE", "0") not in ("1", "true", "True"): return
+    if not _installed["done"]:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(db.Model, "load", _on_load, propagate=True)
+        _installed["done"] = True
+
+    @app.before_request
+    def _query_profile_start():
+        g.query_profile = {"queries": 0, "seconds": 0.0, "objects": 0, "bytes": 0, "started": time.perf_counter()}
+
+    @app.after_request
+    def _query_profile_report(response):
+        prof = g.pop('query_profile', None)
+        if prof:
+            total_ms = (time.perf_counter() - prof["started"]) * 1000
+            print(f"📊 [QueryProfile] {request.method} {request.path} queries={prof['queries']} "
+                  f"db={prof['seconds'] * 1000:.1f}ms total={total_ms:.1f}ms objects={prof['objects']} bytes={prof['bytes'] / 1024:.1f}KB")
+        return response
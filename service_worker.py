@@ -0,0 +1,129 @@
+import hashlib
+import json
+
+# --------------------------------------------------------------------------------
+# 서비스 워커 생성 (앱 시작 시 버전 포함 스크립트를 만들어 /sw.js 로 제공)
+# --------------------------------------------------------------------------------
+# 경로별 캐시 전략
+#   - 장바구니/주문/결제/관리자/로그인 등: network-only (가격/재고가 오래된 화면으로 보이지 않도록)
+#   - 메인/상품/카테고리/검색 화면: stale-while-revalidate (캐시로 즉시 표시 후 백그라운드 갱신)
+#     화면에 장바구니 수량/로그인 메뉴가 들어 있으므로, 같은 사이트로의 POST 등 변경 요청이나
+#     장바구니/주문/결제/로그인 화면으로 이동하면 화면 캐시를 비워 다음 화면은 서버에서 새로 받습니다.
+#   - 상품/후기 이미지: cache-first + 개수 제한 LRU
+#   - 요청 시 리사이즈(/img/<w>x<h>/): 주소에 버전이 없어 stale-while-revalidate (원본 교체가 다음 방문에 반영)
+#   - /assets (해시 파일명): cache-first
+# 버전은 스크립트 내용 + 사전 캐시 목록(해시된 자산 주소 포함)의 해시라, 배포로 자산이 바뀌면
+# 브라우저가 새 서비스 워커를 받고 activate 단계에서 이전 버전 캐시를 모두 지웁니다.
+
+SW_CONFIG_DEFAULTS = {
+    "network_only": ["/cart", "/order", "/payment", "/admin", "/logi", "/login", "/logout", "/register", "/mypage", "/review", "/api/", "/img/pending/"],
+    "swr_pages": ["/product/", "/category/", "/search"],
+    "invalidate_pages": ["/cart", "/order", "/payment", "/login", "/logout", "/register", "/mypage", "/review"],
+    "image_prefixes": ["/static/uploads/", "/static/product_images/", "/static/derived/", "/static/logo/"],
+    "revalidate_images": ["/img/"],
+    "asset_prefixes": ["/assets/"],
+    "max_images": 300,
+    "max_pages": 60,
+}
+
+SW_TEMPLATE = r"""// 자동 생성 파일 (service_worker.py) - 직접 수정하지 마세요
+const CONFIG = __SW_CONFIG__;
+const VERSION = CONFIG.version;
+const PRECACHE = 'dove-precache-' + VERSION;
+const PAGES = 'dove-pages-' + VERSION;
+const IMAGES = 'dove-images-' + VERSION;
+const CURRENT = [PRECACHE, PAGES, IMAGES];
+
+const startsWithAny = (path, prefixes) => prefixes.some(p => path === p || path.startsWith(p));
+
+self.addEventListener('install', (event) => {
+  event.waitUntil(
+    caches.open(PRECACHE).then(cache => cache.addAll(CONFIG.precache)).then(() => self.skipWaiting())
+  );
+});
+
+// 이전 버전 캐시(및 예전 basam-v1) 정리
+self.addEventListener('activate', (event) => {
+  event.waitUntil(
+    caches.keys()
+      .then(keys => Promise.all(keys.filter(k => !CURRENT.includes(k)).map(k => caches.delete(k))))
+      .then(() => self.clients.claim())
+  );
+});
+
+// 개수 제한: 오래 사용하지 않은 항목(앞쪽)부터 삭제
+async function trimCache(name, maxEntries) {
+  const cache = await caches.open(name);
+  const keys = await cache.keys();
+  for (let i = 0; i < keys.length - maxEntries; i++) await cache.delete(keys[i]);
+}
+
+async function cacheFirst(request, cacheName, maxEntries) {
+  const cache = await caches.open(cacheName);
+  const cached = await cache.match(request);
+  if (cached) {
+    if (maxEntries) { await cache.delete(request); await cache.put(request, cached.clone()); }  // 최근 사용으로 이동
+    return cached;
+  }
+  const response = await fetch(request);
+  if (response.ok && response.type === 'basic') {
+    await cache.put(request, response.clone());
+    if (maxEntries) trimCache(cacheName, maxEntries);
+  }
+  return response;
+}
+
+// 화면 캐시를 비울 때마다 증가 (비우기 전에 시작된 백그라운드 갱신이 이전 상태 화면을 다시 넣지 않도록)
+let pagesGeneration = 0;
+function invalidatePages() {
+  pagesGeneration++;
+  return caches.delete(PAGES);
+}
+
+async function staleWhileRevalidate(event, cacheName, maxEntries) {
+  const generation = pagesGeneration;
+  const cache = await caches.open(cacheName);
+  const cached = await cache.match(event.request);
+  const network = fetch(event.request).then(async response => {
+    if (response.ok && response.type === 'basic' && !response.redirected && generation === pagesGeneration) {
+      await cache.put(event.request, response.clone());
+      trimCache(cacheName, maxEntries);
+    }
+    return response;
+  });
+  if (cached) {
+    event.waitUntil(network.catch(() => null));
+    return cached;
+  }
+  return network;
+}
+
+self.addEventListener('fetch', (event) => {
+  const request = event.request;
+  const url = new URL(request.url);
+  if (url.origin !== self.location.origin) return;
+  const path = url.pathname;
+
+  // 장바구니 담기/로그인 등 상태가 바뀌는 요청이면 사용자별 화면(장바구니 수량, 로그인 메뉴) 캐시 삭제 후 네트워크로
+  if (request.method !== 'GET' || startsWithAny(path, CONFIG.invalidate_pages)) event.waitUntil(invalidatePages());
+  if (request.method !== 'GET' || startsWithAny(path, CONFIG.network_only)) return;
+
+  if (startsWithAny(path, CONFIG.asset_prefixes)) { event.respondWith(cacheFirst(request, PRECACHE)); return; }
+  if (startsWithAny(path, CONFIG.revalidate_images)) { event.respondWith(staleWhileRevalidate(event, IMAGES, CONFIG.max_images)); return; }
+  if (request.destination === 'image' || startsWithAny(path, CONFIG.image_prefixes)) {
+    event.respondWith(cacheFirst(request, IMAGES, CONFIG.max_images));
+    return;
+  }
+  if (request.mode === 'navigate' && (path === '/' || startsWithAny(path, CONFIG.swr_pages))) {
+    event.respondWith(staleWhileRevalidate(event, PAGES, CONFIG.max_pages));
+  }
+});
+"""
+
+
+def build_service_worker(precache, extra_version='', **overrides):
+    """(버전, 스크립트) 반환, precache 는 설치 시 미리 받아둘 주소 목록"""
+    config = dict(SW_CONFIG_DEFAULTS, precache=list(precache), **overrides)
+    version = hashlib.sha1((SW_TEMPLATE + json.dumps(config, sort_keys=True) + extra_version).encode('utf-8')).hexdigest()[:10]
+    config["version"] = version
+    return version, SW_TEMPLATE.replace('__SW_CONFIG__', json.dumps(config, ensure_ascii=False))
@@ -0,0 +1,246 @@
+// 공통 푸터 스크립트 (사이드바, 주소 검색, 약관 모달)
+        function toggleSidebar() {
+            const sidebar = document.getElementById('sidebar');
+            const overlay = document.getElementById('sidebar-overlay');
+            sidebar.classList.toggle('open');
+            overlay.classList.toggle('show');
+        }
+
+        const UNCLE_TERMS = {
+    'terms': {
+        'title': 'DOVE 서비스 이용약관',
+        'content': `
+            <b>제1조 (목적)</b><br>
+            본 약관은 (주)DOVE(이하 “회사”)이 제공하는 구매대행 및 물류·배송 관리 서비스의 이용과 관련하여 회사와 이용자 간의 권리, 의무 및 책임사항을 규정함을 목적으로 합니다.<br><br>
+            <b>제2조 (서비스의 성격 및 정의)</b><br>
+            ① 회사는 이용자의 요청에 따라 상품을 대신 구매하고, 결제, 배송 관리, 고객 응대, 환불 처리 등 거래 전반을 회사가 직접 관리·운영하는 구매대행 서비스를 제공합니다.<br>
+            ② 본 서비스는 <b>통신판매중개업(오픈마켓)이 아니며</b>, 회사가 거래 및 운영의 주체로서 서비스를 제공합니다.<br><br>
+            <b>제4조 (회사의 역할 및 책임)</b><br>
+            회사는 구매대행 과정에서 발생하는 주문, 결제, 배송, 환불 등 거래 전반에 대해 관계 법령에 따라 책임을 부담합니다.`
+    },
+    'privacy': {
+        'title': '개인정보처리방침',
+        'content': '<b>개인정보 수집 및 이용</b><br>수집항목: 이름, 연락처, 주소, 결제정보<br>이용목적: 상품 구매대행 및 송도 지역 직영 배송 서비스 제공<br>보관기간: 관련 법령에 따른 보존 기간 종료 후 즉시 파기'
+    },
+            'privacy': {
+                'title': '개인정보처리방침',
+                'content': '<b>개인정보의 수집 및 이용</b><br>DOVE는 주문 처리, 상품 배송, 고객 상담을 위해 필수적인 개인정보를 수집하며, 관계 법령에 따라 안전하게 보호합니다.'
+            },
+            'agency': {
+                'title': '서비스 이용 안내',
+                'content': '<b>서비스 지역:</b> 인천광역시 연수구 송도동 일대 (인천대입구역 중심 동선)<br><b>운영 시간:</b> 평일 오전 9시 ~ 오후 6시<br><b>배송 원칙:</b> 신속하고 정확한 근거리 직접 배송'
+            },
+            'e_commerce': {
+                'title': '전자상거래 이용자 유의사항',
+                'content': '<b>거래 형태:</b> 본 서비스는 물류 인프라를 활용한 통합 유통 모델입니다.<br><b>환불 및 취소:</b> 상품 특성(신선식품 등)에 따라 환불이 제한될 수 있으며, 취소 시 이미 발생한 배송 비용이 청구될 수 있습니다.'
+            }
+        };
+
+        function openUncleModal(type) {
+            const data = UNCLE_TERMS[type];
+            if(!data) return;
+            document.getElementById('term-title').innerText = data.title;
+            document.getElementById('term-modal-body').innerHTML = data.content;
+            document.getElementById('term-modal').style.display = 'flex';
+            document.body.style.overflow = 'hidden';
+        }
+
+        function closeUncleModal() {
+            document.getElementById('term-modal').style.display = 'none';
+            document.body.style.overflow = 'auto';
+        }
+
+        async function addToCart(productId) {
+            try {
+                const response = await fetch(`/cart/add/${productId}`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' }
+                });
+                if (response.redirected) { window.location.href = response.url; return; }
+                const result = await response.json();
+                if (result.success) {
+                    showToast("장바구니에 상품을 담았습니다! 🧺");
+                    const badge = document.getElementById('cart-count-badge');
+                    if(badge) badge.innerText = result.cart_count;
+                    if(window.location.pathname === '/cart') location.reload();
+                } else { 
+                    showToast(result.message || "추가 실패");
+                }
+            } catch (error) { 
+                console.error('Error:', error); 
+                showToast("일시적인 오류가 발생했습니다.");
+            }
+        }
+
+        async function minusFromCart(productId) {
+            try {
+                const response = await fetch(`/cart/minus/${productId}`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' }
+                });
+                const result = await response.json();
+                if (result.success) {
+                    const badge = document.getElementById('cart-count-badge');
+                    if(badge) badge.innerText = result.cart_count;
+                    location.reload(); 
+                } else { alert(result.message); }
+            } catch (error) { console.error('Error:', error); }
+        }
+
+        function showToast(msg) {
+            const t = document.getElementById("toast");
+            if(!t) return;
+            t.innerText = msg;
+            t.className = "show";
+            setTimeout(() => { t.className = t.className.replace("show", ""); }, 2500);
+        }
+
+        function updateCountdowns() {
+            const timers = document.querySelectorAll('.countdown-timer');
+            const now = new Date().getTime();
+            timers.forEach(timer => {
+                if(!timer.dataset.deadline) { timer.innerText = "📅 상시판매"; return; }
+                const deadline = new Date(timer.dataset.deadline).getTime();
+                const diff = deadline - now;
+                if (diff <= 0) {
+                    timer.innerText = "판매마감";
+                    const card = timer.closest('.product-card');
+                    if (card && !card.classList.contains('sold-out')) { card.classList.add('sold-out'); }
+                } else {
+                    const h = Math.floor(diff / (1000 * 60 * 60));
+                    const m = Math.floor((diff % (1000 * 60 * 60)) / (1000 * 60));
+                    const s = Math.floor((diff % (1000 * 60)) / 1000);
+                    timer.innerText = `📦 ${h.toString().padStart(2, '0')}:${m.toString().padStart(2, '0')}:${s.toString().padStart(2, '0')} 남음`;
+                }
+            });
+        }
+        setInterval(updateCountdowns, 1000);
+        updateCountdowns();
+        
+        function execDaumPostcode() {
+            new daum.Postcode({
+                oncomplete: function(data) {
+                    document.getElementById('address').value = data.address;
+                    document.getElementById('address_detail').focus();
+                }
+            }).open();
+        }
+        
+
+function openUncleModal(type) {
+  const title = document.getElementById('uncleModalTitle');
+  const content = document.getElementById('uncleModalContent');
+
+  const data = {
+    terms: {
+      title: '이용약관',
+      content: `
+      <p><strong>제1조 (목적)</strong><br>
+      본 약관은 (주)DOVE(이하 "회사")이 제공하는 구매대행 및 배송 중개 서비스의 이용과 관련하여
+      회사와 이용자 간의 권리, 의무 및 책임사항을 규정함을 목적으로 합니다.</p>
+
+      <p><strong>제2조 (서비스의 정의)</strong><br>
+      회사는 상품을 직접 판매하지 않으며,
+      소비자의 요청에 따라 판매자(산지, 도매처 등)와 소비자를 연결하는
+      구매대행 및 배송 중개 서비스를 제공합니다.</p>
+
+      <p><strong>제3조 (서비스 이용 계약)</strong><br>
+      이용자는 본 약관에 동의함으로써 서비스 이용 계약이 성립되며,
+      결제 완료 시 구매대행 서비스 이용에 동의한 것으로 간주합니다.</p>
+
+      <p><strong>제4조 (책임의 구분)</strong><br>
+      상품의 품질, 원산지, 유통기한, 하자에 대한 책임은 판매자에게 있으며,
+      회사는 주문 접수, 결제 처리, 배송 중개 및 고객 응대에 대한 책임을 집니다.</p>
+
+      <p><strong>제5조 (면책 조항)</strong><br>
+      천재지변, 배송사 사정, 판매자 사정 등 회사의 합리적인 통제 범위를 벗어난 사유로
+      발생한 손해에 대하여 회사는 책임을 지지 않습니다.</p>
+      `
+    },
+
+    privacy: {
+      title: '개인정보처리방침',
+      content: `
+      <p><strong>1. 개인정보 수집 항목</strong><br>
+      회사는 서비스 제공을 위해 다음과 같은 개인정보를 수집합니다.<br>
+      - 필수항목: 이름, 휴대전화번호, 배송지 주소, 결제 정보</p>
+
+      <p><strong>2. 개인정보 이용 목적</strong><br>
+      수집된 개인정보는 다음 목적에 한하여 이용됩니다.<br>
+      - 주문 처리 및 배송<br>
+      - 고객 상담 및 민원 처리<br>
+      - 결제 및 환불 처리</p>
+
+      <p><strong>3. 개인정보 보관 및 이용 기간</strong><br>
+      개인정보는 수집 및 이용 목적 달성 시까지 보관하며,
+      관계 법령에 따라 일정 기간 보관 후 안전하게 파기합니다.</p>
+
+      <p><strong>4. 개인정보 제3자 제공</strong><br>
+      회사는 배송 및 주문 처리를 위해 판매자 및 배송업체에 한해
+      최소한의 개인정보를 제공합니다.</p>
+
+      <p><strong>5. 개인정보 보호</strong><br>
+      회사는 개인정보 보호를 위해 기술적·관리적 보호 조치를 취하고 있습니다.</p>
+      `
+    },
+
+    agency: {
+      title: '이용안내',
+      content: `
+      <p><strong>서비스 안내</strong><br>
+      DOVE는 상품을 직접 보유하거나 판매하지 않는
+      구매대행 및 배송 중개 플랫폼입니다.</p>
+
+      <p><strong>주문 절차</strong><br>
+      ① 이용자가 상품 선택 및 결제<br>
+      ② 회사가 판매자에게 구매 요청<br>
+      ③ 판매자가 상품 준비<br>
+      ④ 배송을 통해 고객에게 전달</p>
+
+      <p><strong>결제 안내</strong><br>
+      결제 금액은 상품 대금과 배송비로 구성되며,
+      구매대행 수수료는 별도로 청구되지 않습니다.</p>
+
+      <p><strong>유의사항</strong><br>
+      상품 정보는 판매자가 제공하며,
+      실제 상품은 이미지와 다소 차이가 있을 수 있습니다.</p>
+      `
+    },
+
+    e_commerce: {
+      title: '전자상거래 유의사항',
+      content: `
+      <p><strong>1. 청약 철회 및 환불</strong><br>
+      일반 상품의 경우 전자상거래법에 따라
+      상품 수령 후 7일 이내 청약 철회가 가능합니다.</p>
+
+      <p><strong>2. 농산물 및 신선식품</strong><br>
+      농산물·신선식품은 특성상 단순 변심에 의한
+      환불이 제한될 수 있습니다.</p>
+
+      <p><strong>3. 환불 가능 사유</strong><br>
+      - 상품 하자<br>
+      - 오배송<br>
+      - 상품 훼손</p>
+
+      <p><strong>4. 환불 절차</strong><br>
+      고객센터 접수 후 확인 절차를 거쳐
+      결제 수단으로 환불 처리됩니다.</p>
+
+      <p><strong>5. 분쟁 처리</strong><br>
+      분쟁 발생 시 전자상거래 관련 법령 및
+      소비자 분쟁 해결 기준을 따릅니다.</p>
+      `
+    }
+  };
+
+  title.innerText = data[type].title;
+  content.innerHTML = data[type].content;
+  document.getElementById('uncleModal').classList.remove('hidden');
+  document.getElementById('uncleModal').classList.add('flex');
+}
+
+function closeUncleModal() {
+  document.getElementById('uncleModal').classList.add('hidden');
+  document.getElementById('uncleModal').classList.remove('flex');
+}
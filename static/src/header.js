@@ -0,0 +1,75 @@
+// 공통 헤더 스크립트 (자동 로그아웃 타이머, 토스트, PWA 설치 안내)
+    // Flask에서 설정한 세션 타임아웃 시간 (초 단위, 예: 30분 = 1800초)
+    const SESSION_TIMEOUT = 30 * 60; 
+    const WARNING_TIME = 60; // 로그아웃 60초 전에 경고창 표시
+    
+    let warningTimer;
+    let countdownInterval;
+
+    function startLogoutTimer() {
+        // 1. 기존 타이머가 있다면 제거
+        clearTimeout(warningTimer);
+        
+        // 2. 경고창을 띄울 시간 계산 (전체 시간 - 60초)
+        warningTimer = setTimeout(() => {
+            showLogoutWarning();
+        }, (SESSION_TIMEOUT - WARNING_TIME) * 1000);
+    }
+
+    function showLogoutWarning() {
+        const modal = document.getElementById('logout-warning-modal');
+        const timerDisplay = document.getElementById('logout-timer');
+        let timeLeft = WARNING_TIME;
+
+        modal.classList.remove('hidden');
+        
+        // 1초마다 숫자를 깎는 카운트다운 시작
+        countdownInterval = setInterval(() => {
+            timeLeft -= 1;
+            timerDisplay.innerText = timeLeft;
+            
+            if (timeLeft <= 0) {
+                clearInterval(countdownInterval);
+                location.href = '/logout'; // 0초가 되면 로그아웃 실행
+            }
+        }, 1000);
+    }
+
+    function extendSession() {
+        // 서버에 가벼운 요청을 보내 세션을 연장시킵니다 (가장 간단한 방법)
+        fetch('/').then(() => {
+            // 경고창 숨기기 및 타이머 리셋
+            document.getElementById('logout-warning-modal').classList.add('hidden');
+            clearInterval(countdownInterval);
+            startLogoutTimer(); 
+            showToast("로그인 시간이 연장되었습니다. 😊");
+        });
+    }
+
+    // 사용자가 로그인한 상태일 때만 타이머 작동 (body data-auth 는 서버에서 렌더링)
+    if (document.body.dataset.auth === '1') startLogoutTimer();
+    let deferredPrompt;
+    window.addEventListener('beforeinstallprompt', (e) => {
+        e.preventDefault();
+        deferredPrompt = e;
+        // 버튼이 있는 바를 화면에 표시
+        const installBar = document.getElementById('pwa-install-bar');
+        if (installBar) installBar.classList.remove('hidden');
+    });
+
+    function triggerPWAInstall() {
+        const installBar = document.getElementById('pwa-install-bar');
+        if (!deferredPrompt) return;
+        deferredPrompt.prompt();
+        deferredPrompt.userChoice.then((choiceResult) => {
+            if (choiceResult.outcome === 'accepted') {
+                if (installBar) installBar.classList.add('hidden');
+            }
+            deferredPrompt = null;
+        });
+    }
+
+    function hideInstallBar() {
+        const installBar = document.getElementById('pwa-install-bar');
+        if (installBar) installBar.classList.add('hidden');
+    }
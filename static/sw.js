@@ -1,26 +1,9 @@
-const CACHE_NAME = 'basam-v1';
-const urlsToCache = [
-  '/',
-  '/static/logo/side1.jpg'
-];
+// 예전 경로(/static/sw.js)로 등록된 서비스 워커 정리용
+// 새 서비스 워커는 /sw.js (루트 범위) 에서 앱 시작 시 생성됩니다. (service_worker.py)
+self.addEventListener('install', () => self.skipWaiting());
 
-// 서비스 워커 설치 및 캐싱
-self.addEventListener('install', (event) => {
+self.addEventListener('activate', (event) => {
   event.waitUntil(
-    caches.open(CACHE_NAME)
-      .then((cache) => {
-        console.log('Opened cache');
-        return cache.addAll(urlsToCache);
-      })
+    caches.delete('basam-v1').then(() => self.registration.unregister())
   );
 });
-
-// 네트워크 요청 처리 (앱처럼 빠르게 반응)
-self.addEventListener('fetch', (event) => {
-  event.respondWith(
-    caches.match(event.request)
-      .then((response) => {
-        return response || fetch(event.request);
-      })
-  );
-});
\ No newline at end of file
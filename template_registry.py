@@ -0,0 +1,66 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, render_template
+
+# --------------------------------------------------------------------------------
+# 컴파일된 Jinja 템플릿 레지스트리
+# --------------------------------------------------------------------------------
+# 모든 화면이 render_template_string(HEADER_HTML + content + FOOTER_HTML, ...) 형태라
+# 매 요청마다 헤더/푸터(수백 줄)까지 다시 파싱/컴파일하던 문제를 해결합니다.
+# 템플릿 원문의 해시를 키로, 워커 프로세스당 한 번만 컴파일한 Template 객체를 재사용합니다.
+
+TEMPLATE_CACHE_MAX = 256  # f-string 으로 매번 달라지는 화면(장바구니 등)이 있어 개수 제한
+
+_template_cache = OrderedDict()  # key -> (Template, 컴파일 소요시간)
+_template_lock = threading.Lock()
+_template_stats = {"hits": 0, "misses": 0, "evictions": 0, "compile_seconds": 0.0, "saved_seconds": 0.0}
+
+
+def get_compiled_template(source):
+    """템플릿 원문 해시로 캐시를 조회하고, 없으면 컴파일 후 등록"""
+    key = hashlib.sha1(source.encode('utf-8')).hexdigest()
+    with _template_lock:
+        entry = _template_cache.get(key)
+        if entry is not None:
+            _template_cache.move_to_end(key)
+            _template_stats["hits"] += 1
+            _template_stats["saved_seconds"] += entry[1]
+            return entry[0]
+
+    started = time.perf_counter()
+    template = current_app.jinja_env.from_string(source)
+    elapsed = time.perf_counter() - started
+
+    with _template_lock:
+        _template_cache[key] = (template, elapsed)
+        _template_stats["misses"] += 1
+        _template_stats["compile_seconds"] += elapsed
+        while len(_template_cache) > TEMPLATE_CACHE_MAX:
+            _template_cache.popitem(last=False)
+            _template_stats["evictions"] += 1
+    return template
+
+
+def render_template_string(source, **context):
+    """flask.render_template_string 대체 (컨텍스트 프로세서/시그널 동작은 동일)"""
+    return render_template(get_compiled_template(source), **context)
+
+
+def get_template_stats():
+    """캐시 적중/미스 및 절약된 컴파일 시간 통계"""
+    with _template_lock:
+        stats = dict(_template_stats)
+        stats["cached_templates"] = len(_template_cache)
+    total = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / total, 4) if total else 0.0
+    stats["compile_ms"] = round(stats.pop("compile_seconds") * 1000, 2)
+    stats["saved_ms"] = round(stats.pop("saved_seconds") * 1000, 2)
+    return stats
+
+
+def clear_template_cache():
+    with _template_lock:
+        _template_cache.clear()